@@ -5,12 +5,13 @@ a = Analysis(
     ['live_predictor.py'],
     pathex=[],
     binaries=[],
-    datas=[('data/winprob_model.joblib', 'data')],
-    hiddenimports=['sklearn.ensemble', 'sklearn.tree', 'sklearn.utils._weight_vector', 'tkinter', 'pandas', 'numpy', 'joblib'],
+    datas=[('data/winprob_model_compact.npz', 'data')],
+    hiddenimports=['tkinter', 'numpy'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=['matplotlib', 'IPython', 'jupyter', 'notebook', 'distutils'],
+    excludes=['matplotlib', 'IPython', 'jupyter', 'notebook', 'distutils',
+              'pandas', 'sklearn', 'scipy', 'joblib', 'model', 'feature_engineer', 'data_loader'],
     noarchive=False,
     optimize=0,
 )
@@ -3,18 +3,12 @@ import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
-from data_loader import DataLoader
-from feature_engineer import DefaultFeatureEngineer
+from feature_store import load_features
 from team_feature_engineer import TeamLevelFeatureEngineer
 
 def analyze_feature_importance():
-    print("Loading data...")
-    loader = DataLoader("data")
-    match_stats, team_stats, match_tbl, summoner_match = loader.load_match_stats()
-
-    print("Engineering features (Reliable + Scaled)...")
-    engineer = DefaultFeatureEngineer()
-    X_full, y = engineer.fit_transform(match_stats, team_stats, summoner_match, match_tbl)
+    print("Loading data (Reliable + Scaled features)...")
+    X_full, y = load_features("data")
     
     # Start with all features
     current_features = list(X_full.columns)
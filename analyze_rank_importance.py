@@ -27,21 +27,23 @@ def analyze_ranks(include_unranked=True):
     if include_unranked:
         ranks_to_process.append("unranked")
 
+    # Parse the CSVs once; every rank window below is a cheap slice of this
+    print("Loading data...")
+    dataset = DataLoader("data").load_dataset()
+
     for rank in ranks_to_process:
         print(f"\n=== Processing Rank: {rank.upper()} ===")
         try:
-            loader = DataLoader("data")
-
             if rank == "unranked":
                 # all ranks combined
-                match_stats, team_stats, match_tbl, summoner_match = loader.load_match_stats(rank_ids=None)
+                match_stats, team_stats, match_tbl, summoner_match = dataset.window(rank_ids=None)
                 rank_label = "All"
             else:
                 rank_id = RANK_MAP[rank]
                 min_rank = max(1, rank_id - 1)
                 max_rank = min(10, rank_id + 1)
                 rank_ids = list(range(min_rank, max_rank + 1))
-                match_stats, team_stats, match_tbl, summoner_match = loader.load_match_stats(rank_ids=rank_ids)
+                match_stats, team_stats, match_tbl, summoner_match = dataset.window(rank_ids=rank_ids)
                 rank_label = rank.capitalize()
 
             # Save dataset info
@@ -0,0 +1,214 @@
+"""
+asyncio client for the League Live Client Data API.
+
+LiveClientAPI makes blocking requests one after another (is_game_running,
+then allgamedata). AsyncLiveClient instead keeps a few HTTP/1.1 keep-alive
+connections open to the local API and fetches only what a tick needs, all
+at once:
+
+    /eventdata?eventID=N   events since the last one seen (ObjectiveTracker)
+    /playerlist            players, scores and items
+    /gamestats             game clock
+    /activeplayername      once per game
+
+The responses are merged into the allgamedata layout, so features come from
+the same LiveClientAPI.extract_features. A tick takes as long as the slowest
+endpoint instead of the sum of all of them.
+
+Only the standard library is used for HTTP (asyncio streams + ssl); the
+local API serves a self-signed certificate, so it is not verified.
+"""
+import asyncio
+import json
+import ssl
+from live_client import LiveClientAPI
+from live_state import roster_key
+
+LIVE_CLIENT_HOST = "127.0.0.1"
+LIVE_CLIENT_PORT = 2999
+API_PREFIX = "/liveclientdata"
+
+
+class LiveClientError(Exception):
+    """
+    A live client request failed.
+
+    Attributes:
+        status: HTTP status of the response, or None if the API could not
+            be reached (no client running)
+    """
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+def _unverified_ssl_context():
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE  # Local API uses self-signed cert
+    return context
+
+
+class AsyncLiveClient:
+    """
+    Live client data over persistent connections, endpoints fetched concurrently.
+
+    Connections belong to the event loop they were opened on: run every call
+    on the same loop (LiveWinRatePredictor keeps one on its update thread).
+
+    Args:
+        api: LiveClientAPI whose extract_features (and per-game state) is used
+        host, port: live client address
+        use_ssl: False for a plain-HTTP endpoint (tests)
+        timeout: seconds per request, connect included
+        max_idle: keep-alive connections kept open between ticks
+    """
+
+    def __init__(self, api=None, host=LIVE_CLIENT_HOST, port=LIVE_CLIENT_PORT,
+                 use_ssl=True, timeout=2.0, max_idle=4):
+        self.api = api if api is not None else LiveClientAPI()
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._ssl = _unverified_ssl_context() if use_ssl else None
+        self._idle = []              # open (reader, writer) pairs
+        self.active_player = None    # /activeplayername of the current game
+        self.connections_opened = 0
+        self.requests_sent = 0
+
+    # ----------------------------
+    # HTTP
+    # ----------------------------
+
+    async def _connect(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self._ssl)
+        self.connections_opened += 1
+        return reader, writer
+
+    def _close(self, conn):
+        conn[1].close()
+
+    async def _request(self, conn, path):
+        """One GET on an open connection: (status, body, connection reusable)"""
+        reader, writer = conn
+        writer.write(
+            f"GET {API_PREFIX}{path} HTTP/1.1\r\n"
+            f"Host: {self.host}:{self.port}\r\n"
+            "Accept: application/json\r\n"
+            "Connection: keep-alive\r\n\r\n".encode("ascii")
+        )
+        await writer.drain()
+        self.requests_sent += 1
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed by the live client")
+        status = int(status_line.split(None, 2)[1])
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        keep_alive = headers.get("connection", "").lower() != "close"
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            body = bytearray()
+            while True:
+                size = int((await reader.readline()).split(b";", 1)[0], 16)
+                if size == 0:
+                    # Skip trailers
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                body += await reader.readexactly(size)
+                await reader.readexactly(2)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            # Body runs to the end of the connection
+            body = await reader.read()
+            keep_alive = False
+        return status, bytes(body), keep_alive
+
+    async def fetch_json(self, path):
+        """GET a live client endpoint (path after /liveclientdata) and decode it"""
+        for attempt in (0, 1):
+            reused = bool(self._idle)
+            try:
+                conn = self._idle.pop() if reused else await asyncio.wait_for(self._connect(), self.timeout)
+            except (OSError, asyncio.TimeoutError) as e:
+                raise LiveClientError(f"Live client not reachable: {e!r}")
+            try:
+                status, body, keep_alive = await asyncio.wait_for(self._request(conn, path), self.timeout)
+            except (OSError, asyncio.IncompleteReadError, ValueError, IndexError, asyncio.TimeoutError) as e:
+                self._close(conn)
+                if reused and attempt == 0:
+                    continue  # the idle connection had gone stale, retry on a new one
+                raise LiveClientError(f"Request to {path} failed: {e!r}")
+
+            if keep_alive and len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+            else:
+                self._close(conn)
+            if status != 200:
+                raise LiveClientError(f"{path} returned HTTP {status}", status)
+            try:
+                return json.loads(body)
+            except ValueError as e:
+                raise LiveClientError(f"{path} returned invalid JSON: {e}", status)
+
+    async def fetch_many(self, paths):
+        """Fetch several endpoints concurrently; raises the first failure"""
+        results = await asyncio.gather(*(self.fetch_json(p) for p in paths), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return results
+
+    async def close(self):
+        while self._idle:
+            reader, writer = self._idle.pop()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (OSError, ssl.SSLError):
+                pass
+
+    # ----------------------------
+    # GAME DATA
+    # ----------------------------
+
+    async def fetch_game_data(self):
+        """
+        Current game in the allgamedata layout, with "events" holding only the
+        events after the last one folded into api.objectives.
+        """
+        objectives = self.api.objectives
+        paths = [f"/eventdata?eventID={objectives.last_event_id + 1}", "/playerlist", "/gamestats"]
+        if self.active_player is None:
+            paths.append("/activeplayername")
+        results = await self.fetch_many(paths)
+        events, players, stats = results[:3]
+        if len(results) > 3:
+            self.active_player = results[3]
+
+        partial = objectives.last_event_id >= 0 or len(results) == 3
+        if partial and objectives.is_new_game(roster_key(players), stats.get("gameTime", 0)):
+            # A new game: its events from the start and its active player
+            events, self.active_player = await self.fetch_many(["/eventdata?eventID=0", "/activeplayername"])
+
+        return {
+            "activePlayer": {"summonerName": self.active_player},
+            "allPlayers": players,
+            "events": events,
+            "gameData": stats,
+        }
+
+    async def fetch_features(self):
+        """Features of the current game (same dict as LiveClientAPI.extract_features)"""
+        return self.api.extract_features(await self.fetch_game_data())
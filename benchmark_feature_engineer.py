@@ -0,0 +1,105 @@
+"""
+Time and peak-memory comparison of DefaultFeatureEngineer.fit_transform
+against the previous merge-everything-first pipeline, on synthetic data.
+
+Usage:
+    python benchmark_feature_engineer.py                 # 1,000,000 matches
+    python benchmark_feature_engineer.py --matches 100000
+    python benchmark_feature_engineer.py --jobs 8         # also time 8 worker processes
+"""
+import argparse
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from feature_engineer import DefaultFeatureEngineer, blue_side_mask, BLUE_CHAMP_COLS
+from synthetic_data import make_synthetic_tables
+
+
+class MergeFirstFeatureEngineer(DefaultFeatureEngineer):
+    """The previous pipeline: join every team/match column onto each player row, then group"""
+
+    def aggregate_players(self, match_stats, team_stats, summoner_match):
+        match_stats = match_stats.merge(
+            summoner_match[['SummonerMatchId','MatchFk','ChampionFk']],
+            left_on='SummonerMatchFk', right_on='SummonerMatchId',
+            how='left'
+        )
+        match_stats = match_stats.merge(
+            team_stats[['TeamID','MatchFk','B1Champ','B2Champ','B3Champ','B4Champ','B5Champ',
+                        'R1Champ','R2Champ','R3Champ','R4Champ','R5Champ',
+                        'BlueBaronKills','BlueDragonKills','BlueTowerKills','BlueKills',
+                        'RedBaronKills','RedDragonKills','RedTowerKills','RedKills',
+                        'BlueWin','RedWin']],
+            left_on='MatchFk', right_on='MatchFk', how='left'
+        )
+        match_stats = match_stats.merge(
+            self._match_tbl[['MatchId', 'GameDuration']],
+            left_on='MatchFk', right_on='MatchId',
+            how='left'
+        )
+        is_blue = blue_side_mask(match_stats['ChampionFk'].to_numpy(), match_stats[BLUE_CHAMP_COLS].to_numpy())
+        match_stats['Team'] = np.where(is_blue, 'BLUE', 'RED')
+        return match_stats.groupby(['MatchFk','Team']).agg({
+            'kills':'sum', 'deaths':'sum', 'assists':'sum', 'TotalGold':'sum',
+            'MinionsKilled':'sum', 'DragonKills':'sum', 'BaronKills':'sum',
+            'visionScore':'sum', 'SummonerMatchFk': 'count'
+        }).reset_index()
+
+    def fit_transform(self, match_stats, team_stats, summoner_match, match_tbl):
+        self._match_tbl = match_tbl
+        return super().fit_transform(match_stats, team_stats, summoner_match, match_tbl)
+
+
+def measure(engineer, tables):
+    match_stats, team_stats, match_tbl, summoner_match = tables
+
+    start = time.perf_counter()
+    X, y = engineer.fit_transform(match_stats, team_stats, summoner_match, match_tbl)
+    elapsed = time.perf_counter() - start
+
+    # Separate run for memory: tracing slows allocations down
+    tracemalloc.start()
+    engineer.fit_transform(match_stats, team_stats, summoner_match, match_tbl)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return X, y, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--matches", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jobs", type=int, default=0,
+                        help="also time the partitioned mode with this many processes (-1 = all cores)")
+    args = parser.parse_args()
+
+    print(f"Generating {args.matches:,} synthetic matches...")
+    tables = make_synthetic_tables(args.matches, seed=args.seed)
+    print(f"Player rows: {len(tables[0]):,}\n")
+
+    X_old, y_old, t_old, mem_old = measure(MergeFirstFeatureEngineer(), tables)
+    X_new, y_new, t_new, mem_new = measure(DefaultFeatureEngineer(), tables)
+
+    pd.testing.assert_frame_equal(X_old, X_new)
+    pd.testing.assert_series_equal(y_old, y_new)
+
+    print(f"{'Pipeline':<28} {'Time':>9} {'Peak memory':>13}")
+    print(f"{'merge-then-aggregate (old)':<28} {t_old:>8.2f}s {mem_old / 1e6:>10.1f} MB")
+    print(f"{'aggregate-then-join (new)':<28} {t_new:>8.2f}s {mem_new / 1e6:>10.1f} MB")
+    print(f"\nSpeedup: {t_old / t_new:.2f}x, peak memory: {mem_new / mem_old:.0%} of old")
+    print("Outputs identical: OK")
+
+    if args.jobs:
+        match_stats, team_stats, match_tbl, summoner_match = tables
+        start = time.perf_counter()
+        X_par, y_par = DefaultFeatureEngineer(n_jobs=args.jobs).fit_transform(
+            match_stats, team_stats, summoner_match, match_tbl)
+        t_par = time.perf_counter() - start
+        pd.testing.assert_frame_equal(X_new, X_par)
+        pd.testing.assert_series_equal(y_new, y_par)
+        print(f"\nPartitioned ({args.jobs} jobs): {t_par:.2f}s ({t_new / t_par:.2f}x serial), output identical: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Latency of WinProbabilityInterface.predict against the previous
+DataFrame + predict_proba path, on random live-game states.
+
+Usage:
+    python benchmark_predict.py                # 2000 calls per path
+    python benchmark_predict.py --calls 10000
+    python benchmark_predict.py --anytime 0.01   # also time early-exit evaluation
+
+Also times predict_batch on the same states.
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from interface import WinProbabilityInterface, FEATURES
+from derived_features import DERIVED_FEATURE_NAMES
+
+
+def dataframe_predict(interface, **kwargs):
+    """The previous predict(): dict -> one-row DataFrame -> predict_proba -> calibration"""
+    data = {f: kwargs.get(f, 0) for f in FEATURES if f not in DERIVED_FEATURE_NAMES}
+    data.update(interface._calculate_derived_features(**kwargs))
+    df = pd.DataFrame([data])
+    df = df[FEATURES]
+    raw_prob = interface.model.predict(df)[0]
+    return max(0.0, min(1.0, interface._calibrate(raw_prob)))
+
+
+def random_states(n, seed=0):
+    rng = np.random.default_rng(seed)
+    for _ in range(n):
+        yield dict(
+            kill_diff=int(rng.integers(-15, 16)), assist_diff=int(rng.integers(-25, 26)),
+            gold_diff=int(rng.normal(0, 4000)), cs_diff=int(rng.integers(-80, 81)),
+            ward_score_diff=float(rng.normal(0, 10)), level_diff=int(rng.integers(-5, 6)),
+            dragon_diff=int(rng.integers(-3, 4)), baron_diff=int(rng.integers(-1, 2)),
+            tower_diff=int(rng.integers(-6, 7)), herald_diff=int(rng.integers(-1, 2)),
+            inhib_diff=int(rng.integers(-2, 3)), game_duration=int(rng.integers(0, 2700)),
+        )
+
+
+def measure(fn, states):
+    """Per-call latencies in microseconds, and the results"""
+    times, results = [], []
+    for kwargs in states:
+        start = time.perf_counter()
+        results.append(fn(**kwargs))
+        times.append(time.perf_counter() - start)
+    return np.array(times) * 1e6, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--anytime", type=float, default=None,
+                        help="also time predict() with this anytime tolerance")
+    args = parser.parse_args()
+
+    interface = WinProbabilityInterface()
+    states = list(random_states(args.calls))
+
+    # Warm up both paths (joblib pools, lazy tree caches)
+    for kwargs in states[:20]:
+        dataframe_predict(interface, **kwargs)
+        interface.predict(**kwargs)
+
+    t_old, p_old = measure(lambda **kw: dataframe_predict(interface, **kw), states)
+    t_new, p_new = measure(interface.predict, states)
+    assert p_old == p_new, "fast path disagrees with the DataFrame path"
+
+    print(f"{'Path':<24} {'p50':>10} {'p99':>10} {'mean':>10}")
+    for name, t in (("DataFrame (old)", t_old), ("vector fast path", t_new)):
+        print(f"{name:<24} {np.percentile(t, 50):>8.1f}us {np.percentile(t, 99):>8.1f}us {t.mean():>8.1f}us")
+    print(f"\np50 speedup: {np.percentile(t_old, 50) / np.percentile(t_new, 50):.1f}x")
+    print(f"Predictions identical on {len(states)} states: OK")
+
+    frame = pd.DataFrame(states)
+    start = time.perf_counter()
+    interface.predict_batch(frame)
+    elapsed = time.perf_counter() - start
+    print(f"\npredict_batch: {len(frame)} states in {elapsed * 1e3:.1f} ms "
+          f"({elapsed / len(frame) * 1e6:.2f}us per state)")
+
+    if args.anytime is not None:
+        model = interface.model
+        raw_full = model.predict_rows(interface.feature_block(frame))
+        model.anytime_tolerance = args.anytime
+        t_any, _ = measure(interface.predict, states)
+        raw_any = np.array([model.predict_row(row) for row in interface.feature_block(frame).astype(np.float32)])
+        model.anytime_tolerance = None
+        errors = np.abs(raw_any - raw_full)
+        print(f"\nAnytime (tolerance {args.anytime}): p50 {np.percentile(t_any, 50):.1f}us, "
+              f"p99 {np.percentile(t_any, 99):.1f}us")
+        print(f"  {model.anytime_summary()}")
+        print(f"  raw probability error: max {errors.max():.4f}, "
+              f"{np.mean(errors > args.anytime):.1%} of states above tolerance")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,11 @@ import sys
 from data_loader import DataLoader
 from feature_engineer import DefaultFeatureEngineer
 from model import RandomForestWinModel, MODEL_PATH
+from compact_forest import export, COMPACT_MODEL_PATH
+from model_schema import build_schema, schema_for_export, training_data_info
+
+# Training-only packages: the exe runs on NumPy (compact_forest.CompactWinModel)
+TRAINING_ONLY_MODULES = ['pandas', 'sklearn', 'scipy', 'joblib', 'model', 'feature_engineer', 'data_loader']
 
 RANK_MAP = {
     'iron': 1,
@@ -59,6 +64,8 @@ def retrain_model(target_rank):
         model = RandomForestWinModel(MODEL_PATH)
         model.train(X, y)
         model.save()
+        schema = build_schema(X.columns, X.dtypes, model.calibration, training_data_info(X, "data", rank_ids))
+        export(model.model, COMPACT_MODEL_PATH, schema=schema)
         print("[OK] Model retrained and saved!")
         return True
         
@@ -66,6 +73,30 @@ def retrain_model(target_rank):
         print(f"Error during training: {e}")
         return False
 
+def export_runtime_model():
+    """
+    Make sure the NumPy-only model the exe loads matches the joblib model.
+
+    An export newer than the joblib model (written by main.py or
+    retrain_model, with the training-data fingerprint) is kept as is.
+    Otherwise the model is exported with the fingerprint of all-rank data
+    (what main.py trains on), or without one if that data cannot be read.
+    """
+    if (os.path.exists(COMPACT_MODEL_PATH) and os.path.exists(MODEL_PATH)
+            and os.path.getmtime(COMPACT_MODEL_PATH) >= os.path.getmtime(MODEL_PATH)):
+        print(f"[OK] Runtime model {COMPACT_MODEL_PATH} is up to date")
+        return True
+    model = RandomForestWinModel(MODEL_PATH)
+    if not model.load():
+        print(f"Model not found at {MODEL_PATH}")
+        return False
+    schema = schema_for_export(model, "data", rank_ids=None)
+    export(model.model, COMPACT_MODEL_PATH, schema=schema)
+    print(f"[OK] Exported runtime model to {COMPACT_MODEL_PATH} "
+          f"({os.path.getsize(COMPACT_MODEL_PATH) / 1024:.1f} KB"
+          f"{'' if schema is not None else ', no training-data fingerprint'})")
+    return True
+
 def build_exe():
     """Build the executable using PyInstaller"""
     
@@ -85,6 +116,10 @@ def build_exe():
     else:
         print("Using existing model (trained on all ranks).")
     
+    if not export_runtime_model():
+        print("Failed to export the runtime model. Aborting build.")
+        return
+    
     # Check if PyInstaller is installed
     try:
         import PyInstaller
@@ -121,24 +156,20 @@ def build_exe():
         # Add version info to make exe look legitimate
         "--version-file=version_info.txt",  # We'll create this file
         
-        # Include the model
-        "--add-data=data/winprob_model.joblib;data",
+        # Include the model (NumPy-only export, see compact_forest.py)
+        f"--add-data={COMPACT_MODEL_PATH};data",
         
         # Exclude unused modules to reduce size
         "--exclude-module=matplotlib",
-        # "--exclude-module=scipy",  # Required by sklearn!
         "--exclude-module=IPython",
         "--exclude-module=jupyter",
         "--exclude-module=notebook",
         "--exclude-module=distutils",
+        # Inference-only runtime: training stack stays out of the exe
+        *[f"--exclude-module={name}" for name in TRAINING_ONLY_MODULES],
         
-        "--hidden-import=sklearn.ensemble",
-        "--hidden-import=sklearn.tree",
-        "--hidden-import=sklearn.utils._weight_vector",
         "--hidden-import=tkinter",
-        "--hidden-import=pandas",
         "--hidden-import=numpy",
-        "--hidden-import=joblib",
         "live_predictor.py"
     ]
     
@@ -160,7 +191,7 @@ def build_exe():
         if rank_input:
             print(f"\nNOTE: This version is optimized for {rank_input.capitalize()} (+/- 1 rank)!")
             
-        print("\nNote: The .exe is ~70MB due to bundled Python libraries")
+        print("\nNote: The .exe bundles Python, NumPy and requests only (no pandas/scikit-learn)")
         
     except subprocess.CalledProcessError as e:
         print(f"\n[X] Build failed: {e}")
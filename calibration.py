@@ -0,0 +1,151 @@
+"""
+Fitted calibration: a monotone lookup table from raw forest probability to
+the displayed win probability.
+
+Fitted at training time on the held-out split:
+
+    1. isotonic regression of the outcome on the raw probability
+       (monotone, so more advantage never shows as less)
+    2. the baseline - the raw probability of an even game (every difference
+       0), measured on the trained model - is pinned to exactly 50%, and each
+       side of the fitted curve is rescaled to [0, 0.5] / [0.5, 1]
+    3. the curve is sampled at quantiles of the raw probabilities
+
+At inference the table is applied with linear interpolation between knots,
+with np.interp for arrays or a bisect for a single value (same result).
+Needs NumPy only at inference; fitting uses sklearn.
+"""
+from bisect import bisect_right
+import numpy as np
+from derived_features import DerivedFeatures
+
+CALIBRATION_KNOTS = 64
+
+
+class CalibrationError(ValueError):
+    """The held-out games cannot support a fitted calibration"""
+
+
+class CalibrationTable:
+    """
+    Piecewise-linear monotone map from raw to calibrated probability.
+
+    Args:
+        raw: strictly increasing knots in [0, 1]
+        calibrated: non-decreasing values in [0, 1] at those knots
+        baseline_raw: raw probability of an even game (maps to 0.5)
+    """
+
+    def __init__(self, raw, calibrated, baseline_raw):
+        self.raw = np.asarray(raw, dtype=np.float64)
+        self.calibrated = np.asarray(calibrated, dtype=np.float64)
+        self.baseline_raw = float(baseline_raw)
+        if self.raw.ndim != 1 or self.raw.shape != self.calibrated.shape or len(self.raw) < 2:
+            raise ValueError("Calibration table needs matching knot arrays with at least 2 knots")
+        if not (np.all(np.diff(self.raw) > 0) and np.all(np.diff(self.calibrated) >= 0)):
+            raise ValueError("Calibration table must be monotone")
+        if self.raw[0] < 0 or self.raw[-1] > 1 or self.calibrated[0] < 0 or self.calibrated[-1] > 1:
+            raise ValueError("Calibration table values must lie in [0, 1]")
+        if not 0.0 < self.baseline_raw < 1.0:
+            raise ValueError("Calibration baseline must lie in (0, 1)")
+        self._raw_list = self.raw.tolist()
+        self._calibrated_list = self.calibrated.tolist()
+
+    def one(self, raw_prob):
+        """Calibrated probability for one raw probability (same as batch())"""
+        xs, ys = self._raw_list, self._calibrated_list
+        i = bisect_right(xs, raw_prob)
+        if i == 0:
+            return ys[0]
+        if i == len(xs):
+            return ys[-1]
+        # np.interp's formula, so both paths agree
+        slope = (ys[i] - ys[i - 1]) / (xs[i] - xs[i - 1])
+        return slope * (raw_prob - xs[i - 1]) + ys[i - 1]
+
+    def batch(self, raw_probs):
+        """Calibrated probabilities for an array of raw probabilities"""
+        return np.interp(np.asarray(raw_probs, dtype=np.float64), self.raw, self.calibrated)
+
+    def to_dict(self):
+        """Form stored in the model schema (model_schema.py)"""
+        return {'kind': 'table', 'baseline_raw': self.baseline_raw,
+                'raw': self._raw_list, 'calibrated': self._calibrated_list}
+
+    @classmethod
+    def from_dict(cls, calibration):
+        return cls(calibration['raw'], calibration['calibrated'], calibration['baseline_raw'])
+
+
+def even_game_baseline(model, feature_names, durations):
+    """
+    Raw probability of an even game: every base difference 0, averaged over
+    the given game durations.
+
+    Args:
+        model: object with predict_rows(X) (RandomForestWinModel)
+        feature_names: model column order
+        durations: game_duration values to average over (e.g. held-out games)
+    """
+    feature_names = list(feature_names)
+    block = np.zeros((len(durations), len(feature_names)))
+    if 'game_duration' in feature_names:
+        block[:, feature_names.index('game_duration')] = durations
+    DerivedFeatures(feature_names).fill_block(block)
+    return float(np.mean(model.predict_rows(block.astype(np.float32))))
+
+
+def fit_calibration(raw_probs, y, baseline_raw, n_knots=CALIBRATION_KNOTS):
+    """
+    Fit a CalibrationTable on held-out raw probabilities and outcomes.
+
+    Args:
+        raw_probs: raw model probabilities of the held-out rows
+        y: their outcomes (1 = blue win)
+        baseline_raw: raw probability pinned to 50% (see even_game_baseline)
+    """
+    from sklearn.isotonic import IsotonicRegression
+
+    raw_probs = np.asarray(raw_probs, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    isotonic = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds='clip').fit(raw_probs, y)
+
+    knots = np.unique(np.concatenate([
+        [0.0, baseline_raw, 1.0],
+        np.quantile(raw_probs, np.linspace(0.0, 1.0, n_knots)),
+    ]))
+    fitted = isotonic.predict(knots)
+    center = float(isotonic.predict([baseline_raw])[0])
+    if not 0.0 < center < 1.0:
+        raise CalibrationError(f"Held-out outcomes at the baseline are all {'wins' if center else 'losses'}")
+
+    # Pin the baseline to 50% and rescale each side to keep the curve monotone
+    calibrated = np.where(knots < baseline_raw,
+                          fitted * (0.5 / center),
+                          0.5 + (fitted - center) * (0.5 / (1.0 - center)))
+    calibrated = np.maximum.accumulate(np.clip(calibrated, 0.0, 1.0))
+    return CalibrationTable(knots, calibrated, baseline_raw)
+
+
+def fit_for_model(model, X_val, y_val, n_knots=CALIBRATION_KNOTS):
+    """
+    Calibration for a trained model from its held-out split.
+
+    Returns:
+        the table as a dict, ready for model_schema.build_schema(calibration=...).
+        If the held-out games cannot be fitted (e.g. a small rank-filtered set
+        that is all wins or all losses around an even game), the hand-tuned
+        model_schema.DEFAULT_CALIBRATION instead
+    """
+    from model_schema import DEFAULT_CALIBRATION
+
+    feature_names = list(X_val.columns)
+    durations = (X_val['game_duration'].to_numpy(dtype=np.float64)
+                 if 'game_duration' in feature_names else np.zeros(1))
+    baseline_raw = even_game_baseline(model, feature_names, durations)
+    raw_probs = model.predict_rows(X_val.to_numpy(dtype=np.float32))
+    try:
+        return fit_calibration(raw_probs, y_val, baseline_raw, n_knots).to_dict()
+    except CalibrationError as e:
+        print(f"Warning: cannot fit calibration ({e}); using the default power curve")
+        return dict(DEFAULT_CALIBRATION)
@@ -0,0 +1,336 @@
+"""
+Compact, inference-only forest artifact.
+
+The joblib model stores every sklearn tree with float64 thresholds, impurity,
+sample counts and per-class values for every node, none of which prediction
+needs. The compact artifact keeps only what FlatForest walks, in small types:
+
+    feature     uint8   split feature (n_features marks a leaf)
+    threshold   uint16  index into a float32 codebook of the distinct
+                        thresholds (lossless), or float32 directly
+    left        uint16  left child, relative to the tree's root (right = left + 1)
+    value       uint16  leaf class-1 fraction in 1/65535 steps, or float32
+    missing     bits    missing_go_to_left, only when the model has any
+
+The metadata carries the model's feature schema (model_schema.py): feature
+order and dtypes, derived-feature formulas, calibration parameters and the
+training-data fingerprint.
+
+Optionally, subtrees whose leaves all lie within prune_tolerance of each other
+are collapsed into a single leaf holding the subtree's own (training-weighted)
+value. That moves each tree's output by at most prune_tolerance, so the
+forest's average moves by at most that much too.
+
+Usage:
+    python compact_forest.py [--prune TOL] [--leaf-dtype uint16|float32]
+        # export data/winprob_model.joblib -> data/winprob_model_compact.npz
+        # with the fingerprint of the all-rank data in data/ (main.py's
+        # training set); without one if that data cannot be loaded
+"""
+import os
+import json
+import numpy as np
+from flat_forest import FlatForest
+from model_schema import build_schema
+
+COMPACT_FORMAT_VERSION = 1
+LEAF_LEVELS = 65535
+COMPACT_MODEL_PATH = "data/winprob_model_compact.npz"
+
+
+def prune_redundant(forest, tolerance):
+    """
+    Copy of a FlatForest with near-constant subtrees collapsed into leaves.
+
+    An internal node becomes a leaf when max - min of the leaf values below it
+    is <= tolerance; its own value (the training-weighted average of those
+    leaves) is kept. Unreachable nodes are dropped and the trees renumbered
+    breadth-first, so the result is a regular FlatForest.
+    """
+    n = len(forest.value)
+    is_leaf = forest.feature == forest.n_features
+    lo = forest.value.copy()
+    hi = forest.value.copy()
+    # Children always come after their parent (breadth-first order)
+    for node in range(n - 1, -1, -1):
+        if not is_leaf[node]:
+            left, right = forest.left[node], forest.right[node]
+            lo[node] = min(lo[left], lo[right])
+            hi[node] = max(hi[left], hi[right])
+    collapse = ~is_leaf & (hi - lo <= tolerance)
+
+    features, thresholds, lefts, missing, values, roots = [], [], [], [], [], []
+    depth = 0
+    offset = 0
+    for root in forest.roots:
+        # Breadth-first walk that stops at leaves and collapsed nodes
+        order = [root]
+        levels = [0]
+        for i, node in enumerate(order):
+            if not (is_leaf[node] or collapse[node]):
+                order += [forest.left[node], forest.right[node]]
+                levels += [levels[i] + 1, levels[i] + 1]
+        order = np.array(order, dtype=np.intp)
+        new_id = {node: i + offset for i, node in enumerate(order.tolist())}
+        leaf = is_leaf[order] | collapse[order]
+
+        features.append(np.where(leaf, forest.n_features, forest.feature[order]))
+        thresholds.append(np.where(leaf, np.float32(np.inf), forest.threshold[order]))
+        lefts.append(np.array([i + offset if leaf[i] else new_id[forest.left[node]]
+                               for i, node in enumerate(order.tolist())], dtype=np.intp))
+        missing.append(forest.missing_left[order] & ~leaf)
+        values.append(forest.value[order])
+        roots.append(offset)
+        offset += len(order)
+        depth = max(depth, max(levels))
+
+    feature = np.concatenate(features)
+    left = np.concatenate(lefts)
+    return FlatForest(
+        feature=feature,
+        threshold=np.concatenate(thresholds),
+        left=left,
+        right=np.where(feature == forest.n_features, left, left + 1),
+        missing_left=np.concatenate(missing),
+        value=np.concatenate(values),
+        roots=roots,
+        max_depth=depth,
+        n_features=forest.n_features,
+    )
+
+
+def save_compact(forest, path, feature_names=None, leaf_dtype='uint16', prune_tolerance=0.0, schema=None):
+    """
+    Write a FlatForest as a compact artifact (see module docstring).
+
+    Args:
+        feature_names: model column order, stored for the loader to check
+        schema: feature schema (model_schema.build_schema); must list the
+            same features as feature_names
+        leaf_dtype: 'uint16' (error <= 0.5/65535 per leaf) or 'float32'
+        prune_tolerance: recorded in the metadata; prune with prune_redundant() first
+    """
+    if leaf_dtype not in ('uint16', 'float32'):
+        raise ValueError(f"Unsupported leaf dtype: {leaf_dtype}")
+    if forest.n_features > np.iinfo(np.uint8).max:
+        raise ValueError("Too many features for the compact format")
+    if schema is not None and [f['name'] for f in schema['features']] != list(feature_names or []):
+        raise ValueError("Schema features do not match feature_names")
+
+    is_leaf = forest.feature == forest.n_features
+    tree_ids = np.repeat(np.arange(forest.n_trees), np.diff(forest._tree_ends))
+    local_left = forest.left - forest.roots[tree_ids]
+    if local_left.max() > np.iinfo(np.uint16).max:
+        raise ValueError("Tree too large for the compact format")
+
+    arrays = {
+        'feature': forest.feature.astype(np.uint8),
+        # Leaves point to themselves; store 0 so the array compresses well
+        'left': np.where(is_leaf, 0, local_left).astype(np.uint16),
+        'roots': forest.roots.astype(np.int32),
+    }
+    # Thresholds: a float32 codebook when the distinct values fit in uint16
+    codebook, codes = np.unique(np.where(is_leaf, np.float32(np.inf), forest.threshold), return_inverse=True)
+    if len(codebook) <= np.iinfo(np.uint16).max + 1:
+        arrays['threshold_codebook'] = codebook.astype(np.float32)
+        arrays['threshold_codes'] = codes.astype(np.uint16)
+    else:
+        arrays['threshold'] = forest.threshold
+    # Only leaf values are ever read
+    leaf_values = np.where(is_leaf, forest.value, 0.0)
+    if leaf_dtype == 'uint16':
+        arrays['value'] = np.round(leaf_values * LEAF_LEVELS).astype(np.uint16)
+    else:
+        arrays['value'] = leaf_values.astype(np.float32)
+    if forest._has_missing:
+        arrays['missing_left'] = np.packbits(forest.missing_left)
+
+    meta = {
+        'version': COMPACT_FORMAT_VERSION,
+        'n_features': forest.n_features,
+        'max_depth': forest.max_depth,
+        'n_nodes': len(forest.value),
+        'leaf_dtype': leaf_dtype,
+        'prune_tolerance': prune_tolerance,
+        'feature_names': list(feature_names) if feature_names is not None else None,
+        'schema': schema,
+    }
+    np.savez_compressed(path, meta=json.dumps(meta), **arrays)
+
+
+def load_compact(path):
+    """
+    Read a compact artifact.
+
+    Returns:
+        (FlatForest, metadata dict)
+    """
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data['meta']))
+        if meta['version'] != COMPACT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported compact forest version in {path}")
+        n_features = meta['n_features']
+        n_nodes = meta['n_nodes']
+        feature = data['feature'].astype(np.intp)
+        roots = data['roots'].astype(np.intp)
+        if 'threshold_codes' in data:
+            threshold = data['threshold_codebook'][data['threshold_codes']]
+        else:
+            threshold = data['threshold']
+        value = data['value'].astype(np.float64)
+        if meta['leaf_dtype'] == 'uint16':
+            value /= LEAF_LEVELS
+        if 'missing_left' in data:
+            missing_left = np.unpackbits(data['missing_left'], count=n_nodes).astype(bool)
+        else:
+            missing_left = np.zeros(n_nodes, dtype=bool)
+        local_left = data['left'].astype(np.intp)
+
+    is_leaf = feature == n_features
+    tree_ids = np.repeat(np.arange(len(roots)), np.diff(np.append(roots, n_nodes)))
+    left = np.where(is_leaf, np.arange(n_nodes), local_left + roots[tree_ids])
+    forest = FlatForest(
+        feature=feature,
+        threshold=threshold,
+        left=left,
+        right=np.where(is_leaf, left, left + 1),
+        missing_left=missing_left,
+        value=value,
+        roots=roots,
+        max_depth=meta['max_depth'],
+        n_features=n_features,
+    )
+    return forest, meta
+
+
+def export(sklearn_forest, path, prune_tolerance=0.0, leaf_dtype='uint16', schema=None):
+    """
+    Flatten, optionally prune and save a fitted RandomForestClassifier.
+
+    Without a schema, one is built from the forest's feature names with the
+    current derived-feature registry and the forest's fitted calibration
+    (default calibration if it has none).
+
+    Returns:
+        (full FlatForest, FlatForest as loaded back from path) for fidelity_report
+    """
+    forest = FlatForest.from_sklearn(sklearn_forest)
+    compact = prune_redundant(forest, prune_tolerance) if prune_tolerance > 0 else forest
+    feature_names = getattr(sklearn_forest, 'feature_names_in_', None)
+    if feature_names is not None:
+        feature_names = [str(name) for name in feature_names]
+        if schema is None:
+            schema = build_schema(feature_names, calibration=getattr(sklearn_forest, 'calibration_', None))
+    save_compact(compact, path, feature_names, leaf_dtype, prune_tolerance, schema)
+    return forest, load_compact(path)[0]
+
+
+class CompactWinModel:
+    """
+    Prediction-only model backed by a compact artifact.
+
+    Needs NumPy only (no sklearn, pandas or joblib), so it is what the
+    live overlay runtime loads.
+    """
+
+    def __init__(self, model_path):
+        self.model_path = model_path
+        self.forest = None
+        self.meta = None
+
+        # Optional early exit for predict_row, as RandomForestWinModel
+        self.anytime_tolerance = None
+        self.anytime_batch_size = 16
+        self.anytime_stats = {'predictions': 0, 'trees_used': 0, 'trees_total': 0, 'last_trees_used': 0}
+
+    def load(self):
+        if os.path.exists(self.model_path):
+            self.forest, self.meta = load_compact(self.model_path)
+            return True
+        return False
+
+    @property
+    def feature_names(self):
+        return self.meta['feature_names']
+
+    @property
+    def schema(self):
+        return self.meta.get('schema')
+
+    def predict_rows(self, X):
+        if self.forest is None:
+            raise ValueError("Compact model not loaded.")
+        return self.forest.predict_proba(X)
+
+    def predict_row(self, x):
+        """Blue win probability for one float32 vector; stops early with anytime_tolerance set"""
+        if self.forest is None:
+            raise ValueError("Compact model not loaded.")
+        if self.anytime_tolerance is None:
+            return self.forest.predict_one(x)
+
+        proba, used = self.forest.predict_one_anytime(x, self.anytime_tolerance, self.anytime_batch_size)
+        stats = self.anytime_stats
+        stats['predictions'] += 1
+        stats['trees_used'] += used
+        stats['trees_total'] += self.forest.n_trees
+        stats['last_trees_used'] = used
+        return proba
+
+
+def fidelity_report(compact, reference, X):
+    """
+    How far the compact forest's raw probabilities are from the reference's.
+
+    Args:
+        compact, reference: FlatForest (or anything with predict_proba(X))
+        X: (n, features) rows to compare on
+    """
+    expected = reference.predict_proba(X)
+    actual = compact.predict_proba(X)
+    errors = np.abs(actual - expected)
+    return {
+        'mean_abs_error': float(errors.mean()),
+        'max_abs_error': float(errors.max()),
+        'same_side_of_0.5': float(np.mean((actual > 0.5) == (expected > 0.5))),
+        'nodes_kept': len(compact.value) / len(reference.value),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import pandas as pd
+    from model import RandomForestWinModel, MODEL_PATH
+    from model_schema import schema_for_export
+    import time
+    from benchmark_predict import random_states
+    from interface import WinProbabilityInterface
+
+    parser = argparse.ArgumentParser(description="Export the forest as a compact artifact")
+    parser.add_argument("--prune", type=float, default=0.0, metavar="TOL",
+                        help="collapse subtrees whose leaves differ by at most TOL (default: no pruning)")
+    parser.add_argument("--leaf-dtype", choices=["uint16", "float32"], default="uint16")
+    parser.add_argument("--rank-ids", type=int, nargs="+", default=None, metavar="ID",
+                        help="RankFk values the model was trained on, for its fingerprint (default: all ranks)")
+    args = parser.parse_args()
+
+    model = RandomForestWinModel(MODEL_PATH)
+    start = time.perf_counter()
+    if not model.load():
+        raise SystemExit(f"Model not found at {MODEL_PATH}")
+    joblib_seconds = time.perf_counter() - start
+    # Fingerprint of the training data, when the source tables can be read
+    schema = schema_for_export(model, rank_ids=args.rank_ids)
+    forest, _ = export(model.model, COMPACT_MODEL_PATH, args.prune, args.leaf_dtype, schema)
+    start = time.perf_counter()
+    loaded, _ = load_compact(COMPACT_MODEL_PATH)
+    compact_seconds = time.perf_counter() - start
+
+    print(f"{os.path.getsize(MODEL_PATH) / 1024:.1f} KB joblib -> "
+          f"{os.path.getsize(COMPACT_MODEL_PATH) / 1024:.1f} KB compact ({COMPACT_MODEL_PATH})")
+    print(f"{len(forest.value)} -> {len(loaded.value)} nodes, depth {forest.max_depth} -> {loaded.max_depth}")
+    print(f"Load time: {joblib_seconds * 1000:.1f} ms joblib -> {compact_seconds * 1000:.1f} ms compact")
+    X = WinProbabilityInterface().feature_block(pd.DataFrame(list(random_states(20000, seed=0)))).astype(np.float32)
+    print("\nFidelity on 20,000 random game states (raw forest probability):")
+    for key, value in fidelity_report(loaded, forest, X).items():
+        print(f"  {key:20s} {value:.3g}")
@@ -1,32 +1,350 @@
-import os
-import pandas as pd
-
-class DataLoader:
-    def __init__(self, data_dir: str):
-        self.data_dir = data_dir
-
-    def load_match_stats(self, rank_ids=None):
-        match_stats = pd.read_csv(os.path.join(self.data_dir, 'MatchStatsTbl.csv'))
-        team_stats  = pd.read_csv(os.path.join(self.data_dir, 'TeamMatchTbl.csv'))
-        match_tbl   = pd.read_csv(os.path.join(self.data_dir, 'MatchTbl.csv'))
-        summoner_match = pd.read_csv(os.path.join(self.data_dir, 'SummonerMatchTbl.csv'))
-        
-        # Filter for Classic games only (Summoner's Rift 5v5)
-        if 'QueueType' in match_tbl.columns:
-            print(f"Total matches before filtering: {len(match_tbl)}")
-            match_tbl = match_tbl[match_tbl['QueueType'] == 'CLASSIC']
-            
-            # Filter by Rank if specified
-            if rank_ids is not None:
-                print(f"Filtering for Rank IDs: {rank_ids}")
-                match_tbl = match_tbl[match_tbl['RankFk'].isin(rank_ids)]
-                
-            print(f"Classic matches after filtering: {len(match_tbl)}")
-            
-            # Filter other tables to only include matches in match_tbl
-            valid_match_ids = match_tbl['MatchId'].unique()
-            team_stats = team_stats[team_stats['MatchFk'].isin(valid_match_ids)]
-            summoner_match = summoner_match[summoner_match['MatchFk'].isin(valid_match_ids)]
-            match_stats = match_stats[match_stats['SummonerMatchFk'].isin(summoner_match['SummonerMatchId'])]
-        
-        return match_stats, team_stats, match_tbl, summoner_match
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from table_cache import TableCache, file_sha1
+
+# Declared column types for the four match tables. Ids fit in int32, counts
+# in int8/int16 and repeated strings become categoricals. Columns that are
+# not listed keep the dtype pandas infers. Patch stays float64: float32 reads
+# 14.23 back as 14.229999..., which breaks equality filters and group-bys.
+TABLE_SCHEMAS = {
+    'MatchTbl': {
+        'MatchId': 'int32', 'Patch': 'float64', 'QueueType': 'category',
+        'RankFk': 'int8', 'GameDuration': 'int16',
+    },
+    'TeamMatchTbl': {
+        'TeamID': 'int32', 'MatchFk': 'int32',
+        **{f'{side}{i}Champ': 'int16' for side in 'BR' for i in range(1, 6)},
+        **{f'{side}{stat}': 'int8' for side in ('Blue', 'Red')
+           for stat in ('BaronKills', 'RiftHeraldKills', 'DragonKills', 'TowerKills', 'Win')},
+        'BlueKills': 'int16', 'RedKills': 'int16',
+    },
+    'SummonerMatchTbl': {
+        'SummonerMatchId': 'int32', 'SummonerFk': 'int32', 'MatchFk': 'int32', 'ChampionFk': 'int16',
+    },
+    'MatchStatsTbl': {
+        'MatchStatsId': 'int32', 'SummonerMatchFk': 'int32',
+        'MinionsKilled': 'int16', 'DmgDealt': 'int32', 'DmgTaken': 'int32', 'TurretDmgDealt': 'int32',
+        'TotalGold': 'int32', 'Lane': 'category', 'Win': 'int8',
+        **{f'item{i}': 'int32' for i in range(1, 7)},
+        'PrimaryKeyStone': 'int16', 'SecondaryKeyStone': 'int16',
+        'SummonerSpell1': 'int16', 'SummonerSpell2': 'int16',
+        'CurrentMasteryPoints': 'int32', 'EnemyChampionFk': 'int16',
+        'DragonKills': 'int8', 'BaronKills': 'int8',
+        'kills': 'int8', 'deaths': 'int8', 'assists': 'int8', 'visionScore': 'int16',
+    },
+}
+
+TABLE_NAMES = ['MatchStatsTbl', 'TeamMatchTbl', 'MatchTbl', 'SummonerMatchTbl']
+
+# Rows parsed per chunk; only one chunk is ever held at pandas' default widths
+READ_CHUNK_ROWS = 500_000
+
+_INT_WIDTHS = [np.dtype(t) for t in ('int8', 'int16', 'int32', 'int64')]
+
+
+def _apply_dtype(series, dtype):
+    """
+    Cast one column to its declared dtype without losing data.
+
+    read_csv silently wraps integers that overflow a requested dtype, so ints
+    are range-checked here and widened to the next size that fits. Integer
+    columns with missing values become float32 (float64 if too large).
+    """
+    if dtype == 'category':
+        return series.astype('category')
+    if not pd.api.types.is_numeric_dtype(series.dtype):
+        return series
+
+    dtype = np.dtype(dtype)
+    if dtype.kind == 'f':
+        return series.astype(dtype)
+
+    values = series.to_numpy()
+    if len(values) == 0:
+        return series.astype(dtype)
+    if values.dtype.kind == 'f' and (np.isnan(values).any() or (values != np.floor(values)).any()):
+        finite = values[~np.isnan(values)]
+        if len(finite) and np.abs(finite).max() > 2 ** 24:
+            return series
+        return series.astype(np.float32)
+
+    lo, hi = values.min(), values.max()
+    for candidate in _INT_WIDTHS[_INT_WIDTHS.index(dtype):]:
+        info = np.iinfo(candidate)
+        if info.min <= lo and hi <= info.max:
+            return series.astype(candidate)
+    return series
+
+
+def _concat_chunks(chunks):
+    """Concatenate parsed chunks, merging per-chunk categoricals"""
+    if len(chunks) == 1:
+        return chunks[0]
+    data = {}
+    for col in chunks[0].columns:
+        parts = [chunk[col] for chunk in chunks]
+        if all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+            data[col] = union_categoricals(parts, sort_categories=True)
+        else:
+            data[col] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(data)
+
+
+def iter_table_csv(path, schema=None, chunksize=None):
+    """Yield the chunks of a CSV with the declared schema applied"""
+    schema = schema or {}
+    chunksize = chunksize or READ_CHUNK_ROWS
+    categories = {col: 'category' for col, dtype in schema.items() if dtype == 'category'}
+    for chunk in pd.read_csv(path, dtype=categories, chunksize=chunksize):
+        for col, dtype in schema.items():
+            if col in chunk.columns:
+                chunk[col] = _apply_dtype(chunk[col], dtype)
+        yield chunk
+
+
+def read_table_csv(path, schema=None, chunksize=None):
+    """Read a CSV with the declared schema applied chunk by chunk"""
+    chunks = list(iter_table_csv(path, schema, chunksize))
+    if not chunks:
+        return pd.read_csv(path)
+    return _concat_chunks(chunks)
+
+
+def schema_key(name):
+    """Cache key for a table: changes whenever its declared schema changes"""
+    text = json.dumps(TABLE_SCHEMAS.get(name, {}), sort_keys=True)
+    return 'schema-' + hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]
+
+
+class DataLoader:
+    def __init__(self, data_dir: str, use_cache: bool = True, cache_dir: str = None):
+        self.data_dir = data_dir
+        # Parsed tables are cached as columnar binaries (data/.cache) and
+        # rebuilt automatically whenever the source CSV changes
+        self.cache = TableCache(cache_dir or os.path.join(data_dir, '.cache')) if use_cache else None
+
+    def _table_path(self, name):
+        return os.path.join(self.data_dir, f'{name}.csv')
+
+    def _table_columns(self, name):
+        path = self._table_path(name)
+        if self.cache is not None and self.cache.is_valid(name, path, schema_key(name)):
+            return self.cache.columns(name)
+        return list(pd.read_csv(path, nrows=0).columns)
+
+    def _scan_table(self, name, row_filter=None, filter_columns=None):
+        """
+        Read one table, keeping only the rows where row_filter(df) is True.
+
+        From a valid cache only filter_columns are read in full; the other
+        columns are read for the surviving rows only. Otherwise the CSV is
+        streamed in chunks, each chunk is filtered before the next one is
+        parsed, and the full table is written to the cache along the way.
+
+        Returns:
+            (df, total_rows) where total_rows is the unfiltered row count
+        """
+        path = self._table_path(name)
+        key = schema_key(name)
+
+        if self.cache is not None and self.cache.is_valid(name, path, key):
+            if row_filter is None:
+                df = self.cache.load(name)
+                return df, len(df)
+            head = self.cache.load(name, columns=filter_columns)
+            mask = np.asarray(row_filter(head), dtype=bool)
+            return self.cache.load(name, rows=mask), len(head)
+
+        writer = self.cache.writer(name, path, key) if self.cache is not None else None
+        kept = []
+        total = 0
+        for chunk in iter_table_csv(path, TABLE_SCHEMAS.get(name)):
+            total += len(chunk)
+            if writer is not None:
+                try:
+                    writer.append(chunk)
+                except OSError as e:
+                    print(f"Warning: could not write cache for {name}: {e}")
+                    writer.abort()
+                    writer = None
+            if row_filter is not None:
+                chunk = chunk[np.asarray(row_filter(chunk), dtype=bool)]
+            kept.append(chunk)
+
+        if writer is not None:
+            try:
+                writer.close()
+            except (OSError, ValueError) as e:
+                print(f"Warning: could not write cache for {name}: {e}")
+                writer.abort()
+
+        if not kept:
+            return pd.read_csv(path), 0
+        return _concat_chunks(kept).reset_index(drop=True), total
+
+    def _read_table(self, name):
+        return self._scan_table(name)[0]
+
+    def fingerprint(self):
+        """
+        Content hash of the four source tables and their declared schemas.
+
+        Reuses the SHA-1 stored in a valid cache entry, so it only reads a CSV
+        in full when that table is not cached yet.
+        """
+        sha1 = hashlib.sha1()
+        for name in TABLE_NAMES:
+            path = self._table_path(name)
+            key = schema_key(name)
+            if self.cache is not None and self.cache.is_valid(name, path, key):
+                source = self.cache.source_sha1(name)
+            else:
+                source = file_sha1(path)
+            sha1.update(f"{name}:{source}:{key};".encode('utf-8'))
+        return sha1.hexdigest()
+
+    def load_match_stats(self, rank_ids=None):
+        # Without a QueueType column nothing is filtered
+        if 'QueueType' not in self._table_columns('MatchTbl'):
+            return (self._read_table('MatchStatsTbl'), self._read_table('TeamMatchTbl'),
+                    self._read_table('MatchTbl'), self._read_table('SummonerMatchTbl'))
+
+        # Filters are pushed down into the reads: MatchTbl is filtered first, then
+        # each child table is streamed keeping only rows whose foreign key survived.
+        # Memory scales with the selected matches instead of the whole dump.
+        def match_filter(df):
+            # Filter for Classic games only (Summoner's Rift 5v5)
+            mask = df['QueueType'] == 'CLASSIC'
+            # Filter by Rank if specified
+            if rank_ids is not None:
+                mask &= df['RankFk'].isin(rank_ids)
+            return mask
+
+        match_tbl, total_matches = self._scan_table('MatchTbl', match_filter, ['QueueType', 'RankFk'])
+        print(f"Total matches before filtering: {total_matches}")
+        if rank_ids is not None:
+            print(f"Filtering for Rank IDs: {rank_ids}")
+        print(f"Classic matches after filtering: {len(match_tbl)}")
+
+        # Filter other tables to only include matches in match_tbl
+        valid_match_ids = match_tbl['MatchId'].unique()
+        team_stats, _ = self._scan_table(
+            'TeamMatchTbl', lambda df: df['MatchFk'].isin(valid_match_ids), ['MatchFk'])
+        summoner_match, _ = self._scan_table(
+            'SummonerMatchTbl', lambda df: df['MatchFk'].isin(valid_match_ids), ['MatchFk'])
+        valid_summoner_ids = summoner_match['SummonerMatchId'].unique()
+        match_stats, _ = self._scan_table(
+            'MatchStatsTbl', lambda df: df['SummonerMatchFk'].isin(valid_summoner_ids), ['SummonerMatchFk'])
+
+        return match_stats, team_stats, match_tbl, summoner_match
+
+    def load_dataset(self):
+        """Load all four tables once as a MatchDataset for repeated rank-window slicing"""
+        return MatchDataset(
+            self._read_table('MatchStatsTbl'),
+            self._read_table('TeamMatchTbl'),
+            self._read_table('MatchTbl'),
+            self._read_table('SummonerMatchTbl'),
+        )
+
+
+class MatchDataset:
+    """
+    The four match tables held in memory, ordered for cheap rank-window slicing.
+
+    MatchTbl is sorted by (QueueType, RankFk) and every child table is sorted
+    to follow the same match order, so the rows of any contiguous rank range
+    within one queue form a single contiguous block in all four tables.
+    window() then returns positional slices instead of re-reading and
+    re-filtering the CSVs.
+    """
+
+    def __init__(self, match_stats, team_stats, match_tbl, summoner_match):
+        self.by_queue = 'QueueType' in match_tbl.columns
+        if self.by_queue:
+            match_tbl = match_tbl.sort_values(['QueueType', 'RankFk', 'MatchId'], kind='stable')
+        self.match_tbl = match_tbl.reset_index(drop=True)
+
+        # Position of every child row's parent in the sorted parent table
+        match_pos = pd.Index(self.match_tbl['MatchId'])
+        self.team_stats, self._team_pos = self._align(team_stats, match_pos.get_indexer(team_stats['MatchFk']))
+        self.summoner_match, self._summoner_pos = self._align(
+            summoner_match, match_pos.get_indexer(summoner_match['MatchFk']))
+        summoner_pos = pd.Index(self.summoner_match['SummonerMatchId'])
+        self.match_stats, self._stats_pos = self._align(
+            match_stats, summoner_pos.get_indexer(match_stats['SummonerMatchFk']))
+
+        # Contiguous match-position range of every (QueueType, RankFk) group
+        self.groups = {}
+        if self.by_queue and len(self.match_tbl):
+            queue = self.match_tbl['QueueType'].to_numpy()
+            rank = self.match_tbl['RankFk'].to_numpy()
+            change = np.flatnonzero((queue[1:] != queue[:-1]) | (rank[1:] != rank[:-1])) + 1
+            starts = np.r_[0, change]
+            ends = np.r_[change, len(self.match_tbl)]
+            for lo, hi in zip(starts, ends):
+                self.groups[(queue[lo], rank[lo])] = (lo, hi)
+
+    @staticmethod
+    def _align(df, parent_pos):
+        """Drop orphan rows and sort df by parent position; returns (df, sorted positions)"""
+        keep = parent_pos >= 0
+        order = np.argsort(parent_pos[keep], kind='stable')
+        df = df[keep].iloc[order].reset_index(drop=True)
+        return df, parent_pos[keep][order]
+
+    def _match_ranges(self, queue_type, rank_ids):
+        """Sorted, merged (lo, hi) match-position ranges for the requested window"""
+        if not self.by_queue:
+            # Same as load_match_stats: no QueueType column means no filtering
+            return [(0, len(self.match_tbl))]
+
+        ranges = [bounds for (queue, rank), bounds in self.groups.items()
+                  if queue == queue_type and (rank_ids is None or rank in rank_ids)]
+
+        merged = []
+        for lo, hi in sorted(ranges):
+            if merged and merged[-1][1] == lo:
+                merged[-1] = (merged[-1][0], hi)
+            else:
+                merged.append((lo, hi))
+        return merged
+
+    def _child_slice(self, df, positions, ranges):
+        bounds = [(np.searchsorted(positions, lo, 'left'), np.searchsorted(positions, hi, 'left'))
+                  for lo, hi in ranges]
+        return self._take(df, bounds)
+
+    @staticmethod
+    def _take(df, bounds):
+        if len(bounds) == 1:
+            lo, hi = bounds[0]
+            return df.iloc[lo:hi]
+        if not bounds:
+            return df.iloc[0:0]
+        return pd.concat([df.iloc[lo:hi] for lo, hi in bounds])
+
+    def window(self, rank_ids=None, queue_type='CLASSIC'):
+        """
+        Return (match_stats, team_stats, match_tbl, summoner_match) for one rank window.
+
+        Same rows as DataLoader.load_match_stats(rank_ids). A contiguous range
+        of rank ids (e.g. [3, 4, 5]) is served as zero-copy slices; a gapped
+        selection falls back to concatenating one slice per range.
+        """
+        ranges = self._match_ranges(queue_type, rank_ids)
+        match_tbl = self._take(self.match_tbl, ranges)
+        team_stats = self._child_slice(self.team_stats, self._team_pos, ranges)
+        summoner_match = self._child_slice(self.summoner_match, self._summoner_pos, ranges)
+
+        # match_stats follows summoner_match order, so map the match ranges through it
+        summoner_bounds = [(np.searchsorted(self._summoner_pos, lo, 'left'),
+                            np.searchsorted(self._summoner_pos, hi, 'left')) for lo, hi in ranges]
+        match_stats = self._child_slice(self.match_stats, self._stats_pos, summoner_bounds)
+
+        print(f"Matches in window (queue={queue_type}, ranks={rank_ids}): {len(match_tbl)}")
+        return match_stats, team_stats, match_tbl, summoner_match
@@ -0,0 +1,160 @@
+"""
+Derived interaction features, defined once for training and inference.
+
+Each feature is a sum of terms over base features (or earlier derived
+features). The registry is compiled into straight-line Python functions, so
+the same expression runs on
+
+    - a DataFrame        (column-wise, used by DefaultFeatureEngineer)
+    - a 2-D NumPy block  (one column per feature, used for batches)
+    - a 1-D vector       (one row, used by WinProbabilityInterface)
+
+Terms are evaluated left to right in float64, exactly like the hand-written
+formulas they replace, so all three paths give bit-identical values.
+"""
+import numpy as np
+
+# name -> [(sign, source feature, op, constant), ...]
+# op is '/' or '*' (or None to use the source as is). Features may refer to
+# derived features listed above them.
+DERIVED_FEATURES = {
+    # 1. Combat Power: Overall fighting strength
+    # Normalized to similar scales so model can weight them
+    'combat_power': [
+        ('+', 'kill_diff', '/', 10.0),      # Kills normalized
+        ('+', 'gold_diff', '/', 3000.0),    # Gold normalized
+        ('+', 'level_diff', '/', 10.0),     # Levels normalized
+        ('+', 'baron_diff', '*', 3.0),      # Baron is huge
+        ('+', 'dragon_diff', '*', 0.5),     # Dragons help
+    ],
+    # 2. Tower-Combat Mismatch: Do towers match combat strength?
+    # Positive = have towers but weak (bad)
+    # Negative = strong but lack towers (can recover)
+    'tower_combat_mismatch': [
+        ('+', 'tower_diff', None, None),
+        ('-', 'combat_power', None, None),
+    ],
+    # 3. Push Capability: Can you actually take objectives?
+    # Combines combat power with objective control
+    'push_capability': [
+        ('+', 'combat_power', None, None),
+        ('+', 'baron_diff', '*', 2.0),      # Baron enables pushing
+        ('+', 'herald_diff', '*', 1.0),     # Herald helps early
+    ],
+    # 4. Economic Advantage: Gold/CS combined (scales better)
+    'economic_advantage': [
+        ('+', 'gold_diff', '/', 1000.0),    # Gold per 1k
+        ('+', 'cs_diff', '/', 50.0),        # CS per 50
+    ],
+    # 5. Objective Control: Overall map control
+    'objective_control': [
+        ('+', 'dragon_diff', '*', 1.0),
+        ('+', 'baron_diff', '*', 3.0),
+        ('+', 'tower_diff', '*', 2.0),
+        ('+', 'herald_diff', '*', 1.5),
+        ('+', 'inhib_diff', '*', 4.0),
+    ],
+}
+
+DERIVED_FEATURE_NAMES = list(DERIVED_FEATURES)
+
+
+def validate_definitions(definitions):
+    """
+    Check a registry read from outside the code (e.g. a model artifact) and
+    return it in the DERIVED_FEATURES form. Only signs, known ops and numeric
+    constants are accepted, since the registry is compiled into code.
+    """
+    checked = {}
+    for name, terms in definitions.items():
+        if not isinstance(name, str) or not terms:
+            raise ValueError(f"Invalid derived feature: {name!r}")
+        checked[name] = []
+        for term in terms:
+            sign, source, op, const = term
+            if sign not in ('+', '-') or op not in ('/', '*', None) or not isinstance(source, str):
+                raise ValueError(f"Invalid term for derived feature {name!r}: {term!r}")
+            if (op is None) != (const is None):
+                raise ValueError(f"Invalid term for derived feature {name!r}: {term!r}")
+            checked[name].append((sign, source, op, None if const is None else float(const)))
+    return checked
+
+
+def _expression(terms, ref):
+    """Python expression for one feature; ref(name) gives the source lookup"""
+    parts = []
+    for i, (sign, source, op, const) in enumerate(terms):
+        term = f"c[{ref(source)}]"
+        if op is not None:
+            term = f"{term} {op} {const!r}"
+        if i == 0:
+            parts.append(term if sign == '+' else f"-{term}")
+        else:
+            parts.append(f"{sign} {term}")
+    return " ".join(parts)
+
+
+def _compile(ref, definitions=DERIVED_FEATURES):
+    """Compile a registry into `derive(c)`, assigning c[ref(name)] for every feature"""
+    lines = ["def derive(c):"]
+    for name, terms in definitions.items():
+        lines.append(f"    c[{ref(name)}] = {_expression(terms, ref)}")
+    namespace = {}
+    exec(compile("\n".join(lines), "<derived_features>", "exec"), namespace)
+    return namespace['derive']
+
+
+# Keyed by column name: works on DataFrames and dicts
+_derive_named = _compile(repr)
+
+
+def add_derived_features(df):
+    """Add the derived columns to a DataFrame (or dict) of base features, in place"""
+    _derive_named(df)
+    return df
+
+
+class DerivedFeatures:
+    """
+    The registry compiled against a fixed column order.
+
+    Args:
+        columns: every feature in model order; must contain all derived
+            features and the base features they use
+        definitions: registry to compile (default DERIVED_FEATURES), e.g.
+            the one stored with a model; see validate_definitions()
+    """
+
+    def __init__(self, columns, definitions=None):
+        definitions = DERIVED_FEATURES if definitions is None else validate_definitions(definitions)
+        self.columns = list(columns)
+        self.names = list(definitions)
+        position = {name: i for i, name in enumerate(self.columns)}
+        missing = [name for name in definitions if name not in position]
+        for terms in definitions.values():
+            missing += [source for _, source, _, _ in terms if source not in position]
+        if missing:
+            raise ValueError(f"Columns missing for derived features: {sorted(set(missing))}")
+
+        self.outputs = np.array([position[name] for name in definitions], dtype=np.intp)
+        self._derive = _compile(lambda name: position[name], definitions)
+
+    def fill_vector(self, vector):
+        """
+        Fill the derived slots of one preallocated feature vector in place.
+
+        The base values are read as Python floats (float64), so the result does
+        not depend on the vector's dtype beyond the final store.
+        """
+        values = vector.tolist()
+        self._derive(values)
+        vector[self.outputs] = [values[i] for i in self.outputs]
+        return vector
+
+    def fill_block(self, block):
+        """Fill the derived columns of a 2-D (rows, features) array in place"""
+        columns = [block[:, i].astype(np.float64) for i in range(block.shape[1])]
+        self._derive(columns)
+        for i in self.outputs:
+            block[:, i] = columns[i]
+        return block
@@ -1,189 +1,286 @@
-import pandas as pd
-
-class FeatureEngineerBase:
-    """Abstract base class for feature engineering"""
-    def fit_transform(self, match_stats: pd.DataFrame, team_stats: pd.DataFrame, summoner_match: pd.DataFrame, match_tbl: pd.DataFrame):
-        raise NotImplementedError
-
-class DefaultFeatureEngineer(FeatureEngineerBase):
-    """Aggregates player stats per team and computes differences for blue vs red"""
-    def fit_transform(self, match_stats, team_stats, summoner_match, match_tbl):
-        # Merge match stats with summoner_match to get MatchID
-        match_stats = match_stats.merge(
-            summoner_match[['SummonerMatchId','MatchFk','ChampionFk']],
-            left_on='SummonerMatchFk', right_on='SummonerMatchId',
-            how='left'
-        )
-
-        # Merge with team_stats to get champions per side
-        match_stats = match_stats.merge(
-            team_stats[['TeamID','MatchFk','B1Champ','B2Champ','B3Champ','B4Champ','B5Champ',
-                        'R1Champ','R2Champ','R3Champ','R4Champ','R5Champ',
-                        'BlueBaronKills','BlueDragonKills','BlueTowerKills','BlueKills',
-                        'RedBaronKills','RedDragonKills','RedTowerKills','RedKills',
-                        'BlueWin','RedWin']],
-            left_on='MatchFk', right_on='MatchFk', how='left'
-        )
-        
-        # Merge with match_tbl to get GameDuration
-        match_stats = match_stats.merge(
-            match_tbl[['MatchId', 'GameDuration']],
-            left_on='MatchFk', right_on='MatchId',
-            how='left'
-        )
-
-        # Assign team BLUE or RED
-        def assign_team(row):
-            if row['ChampionFk'] in [row['B1Champ'], row['B2Champ'], row['B3Champ'], row['B4Champ'], row['B5Champ']]:
-                return 'BLUE'
-            else:
-                return 'RED'
-
-        match_stats['Team'] = match_stats.apply(assign_team, axis=1)
-
-        # Aggregate stats per team
-        # We also need to know the COUNT of players per team per match to scale correctly
-        player_features = match_stats.groupby(['MatchFk','Team']).agg({
-            'kills':'sum', # We use TeamStats for kills, so this is just for aux check
-            'deaths':'sum',
-            'assists':'sum',
-            'TotalGold':'sum',
-            'MinionsKilled':'sum',
-            'DragonKills':'sum',
-            'BaronKills':'sum',
-            'visionScore':'sum',
-            'SummonerMatchFk': 'count' # Count number of observed data points
-        }).reset_index()
-
-        # Pivot BLUE vs RED
-        blue = player_features[player_features.Team=='BLUE'].set_index('MatchFk')
-        red  = player_features[player_features.Team=='RED'].set_index('MatchFk')
-
-        df = pd.DataFrame()
-        
-        # --- Reliability Fix ---
-        # Player data is incomplete. We use TeamStats for exact totals where possible.
-        # For player-specific stats (Gold, CS, Assists), we must SCALE the partial data 
-        # to estimate the full 5-player team total.
-        # Scaling Factor = 5 / observed_player_count
-        
-        # Avoid division by zero by replacing 0 with 1 (though count should > 0)
-        blue_scale = 5.0 / blue['SummonerMatchFk'].replace(0, 1)
-        red_scale  = 5.0 / red['SummonerMatchFk'].replace(0, 1)
-        
-        # Kills/Deaths from TeamStats (Exact)
-        ts_indexed = team_stats.set_index('MatchFk')
-        
-        # Validating overlap - only process matches present in ALL three (Blue players, Red players, TeamStats)
-        common_indices = blue.index.intersection(red.index).intersection(ts_indexed.index)
-        
-        blue = blue.loc[common_indices]
-        red = red.loc[common_indices]
-        ts_indexed = ts_indexed.loc[common_indices]
-        blue_scale = blue_scale.loc[common_indices]
-        red_scale = red_scale.loc[common_indices]
-        
-        df['kill_diff'] = ts_indexed['BlueKills'] - ts_indexed['RedKills']
-        # death_diff is redundant (it's just -kill_diff)
-        
-        # Scaled Estimates for Partial Data
-        # We estimate what the total would be if we had all 5 players
-        blue_gold_est = blue['TotalGold'] * blue_scale
-        red_gold_est  = red['TotalGold'] * red_scale
-        
-        blue_assists_est = blue['assists'] * blue_scale
-        red_assists_est  = red['assists'] * red_scale
-        
-        blue_cs_est = blue['MinionsKilled'] * blue_scale
-        red_cs_est  = red['MinionsKilled'] * red_scale
-        
-        blue_ward_est = blue['visionScore'] * blue_scale
-        red_ward_est  = red['visionScore'] * red_scale
-        
-        # Calculate Diffs using Scaled Estimates
-        df['assist_diff'] = blue_assists_est - red_assists_est
-        df['gold_diff'] = blue_gold_est - red_gold_est
-        df['cs_diff'] = blue_cs_est - red_cs_est
-        df['ward_score_diff'] = blue_ward_est - red_ward_est
-        
-        # Note: Level data not available in historical data, will use 0 as placeholder
-        df['level_diff'] = 0
-        
-        # Objectives (Reliable from TeamStats)
-        df['dragon_diff'] = ts_indexed['BlueDragonKills'] - ts_indexed['RedDragonKills']
-        df['baron_diff'] = ts_indexed['BlueBaronKills'] - ts_indexed['RedBaronKills']
-        df['tower_diff'] = ts_indexed['BlueTowerKills'] - ts_indexed['RedTowerKills']
-        df['herald_diff'] = ts_indexed['BlueRiftHeraldKills'] - ts_indexed['RedRiftHeraldKills']
-        
-        # Inhibitors not in TeamMatchTbl, use 0 as placeholder
-        df['inhib_diff'] = 0
-        
-        # Game Duration
-        df['game_duration'] = match_tbl.set_index('MatchId').loc[common_indices]['GameDuration']
-        game_minutes = (df['game_duration'] / 60).clip(lower=1)
-        
-        df['blue_win'] = ts_indexed['BlueWin']
-
-        # Drop rows with missing target/features
-        df = df.dropna(subset=['blue_win'])
-        
-        # Fill other NaNs with 0
-        df = df.fillna(0)
-        
-        # ============ DERIVED INTERACTION FEATURES ============
-        # These capture the concept of "tower-taking capability"
-        # Instead of heuristics, let the model LEARN these relationships from data!
-        
-        # 1. Combat Power: Overall fighting strength
-        # Normalized to similar scales so model can weight them
-        df['combat_power'] = (
-            df['kill_diff'] / 10.0 +           # Kills normalized
-            df['gold_diff'] / 3000.0 +         # Gold normalized  
-            df['level_diff'] / 10.0 +          # Levels normalized
-            df['baron_diff'] * 3.0 +           # Baron is huge
-            df['dragon_diff'] * 0.5            # Dragons help
-        )
-        
-        # 2. Tower-Combat Mismatch: Do towers match combat strength?
-        # Positive = have towers but weak (bad)
-        # Negative = strong but lack towers (can recover)
-        df['tower_combat_mismatch'] = df['tower_diff'] - df['combat_power']
-        
-        # 3. Push Capability: Can you actually take objectives?
-        # Combines combat power with objective control
-        df['push_capability'] = (
-            df['combat_power'] + 
-            df['baron_diff'] * 2.0 +           # Baron enables pushing
-            df['herald_diff'] * 1.0            # Herald helps early
-        )
-        
-        # 4. Economic Advantage: Gold/CS combined (scales better)
-        df['economic_advantage'] = (
-            df['gold_diff'] / 1000.0 +         # Gold per 1k
-            df['cs_diff'] / 50.0               # CS per 50
-        )
-        
-        # 5. Objective Control: Overall map control
-        df['objective_control'] = (
-            df['dragon_diff'] * 1.0 +
-            df['baron_diff'] * 3.0 +
-            df['tower_diff'] * 2.0 +
-            df['herald_diff'] * 1.5 +
-            df['inhib_diff'] * 4.0
-        )
-        
-        features = [
-            # Core stats
-            'kill_diff', 'assist_diff', 'gold_diff', 'cs_diff',
-            'ward_score_diff', 'level_diff',
-            # Objectives
-            'dragon_diff', 'baron_diff', 'tower_diff', 'herald_diff', 'inhib_diff',
-            # Time context
-            'game_duration',
-            # NEW: Derived interaction features (data-driven, not heuristic!)
-            'combat_power', 'tower_combat_mismatch', 'push_capability',
-            'economic_advantage', 'objective_control'
-        ]
-        X = df[features]
-        y = df['blue_win']
-        return X, y
+import os
+import copy
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from derived_features import add_derived_features, DERIVED_FEATURE_NAMES
+
+BLUE_CHAMP_COLS = ['B1Champ', 'B2Champ', 'B3Champ', 'B4Champ', 'B5Champ']
+
+def blue_side_mask(champions, blue_champs):
+    """
+    True for every player on the BLUE side.
+
+    Args:
+        champions: (n,) champion id of each player
+        blue_champs: (n, 5) array, or an iterable of five (n,) arrays, holding
+            B1Champ..B5Champ of each player's match
+
+    A player is BLUE if their champion is one of their match's blue champions,
+    otherwise RED (NaN never matches).
+    """
+    champions = np.asarray(champions)
+    if isinstance(blue_champs, np.ndarray):
+        blue_champs = blue_champs.T
+    is_blue = np.zeros(len(champions), dtype=bool)
+    for column in blue_champs:
+        is_blue |= np.asarray(column) == champions
+    return is_blue
+
+def side_labels(is_blue):
+    """'BLUE'/'RED' categorical from a blue_side_mask"""
+    return pd.Categorical.from_codes(np.where(is_blue, 0, 1), categories=['BLUE', 'RED'])
+
+def _lookup(column, positions):
+    """
+    column.iloc[positions] as an array, with NaN where positions is -1
+    (what a left merge yields for rows that have no match)
+    """
+    values = column.to_numpy()
+    if (positions < 0).any():
+        values = np.append(values.astype(float), np.nan)
+    return values[positions]
+
+def match_shards(match_ids, n_shards):
+    """
+    Shard number of each match id (multiplicative hash, so consecutive ids
+    spread over all shards). Missing ids (NaN) get shard -1.
+    """
+    ids = np.asarray(match_ids, dtype=float)
+    valid = ~np.isnan(ids)
+    hashed = (ids[valid].astype(np.uint64) * np.uint64(2654435761)) % np.uint64(2 ** 32)
+    shards = np.full(len(ids), -1, dtype=np.int64)
+    shards[valid] = (hashed % np.uint64(n_shards)).astype(np.int64)
+    return shards
+
+def _split_by_shard(df, shards, n_shards):
+    """Rows of df for each shard, keeping their original order"""
+    order = np.argsort(shards, kind='stable')
+    bounds = np.searchsorted(shards[order], np.arange(n_shards + 1))
+    return [df.iloc[order[bounds[i]:bounds[i + 1]]] for i in range(n_shards)]
+
+def _fit_transform_shard(engineer, tables):
+    """Process pool entry point (must be a module-level function to be picklable)"""
+    return engineer.fit_transform(*tables)
+
+class FeatureEngineerBase:
+    """Abstract base class for feature engineering"""
+    def fit_transform(self, match_stats: pd.DataFrame, team_stats: pd.DataFrame, summoner_match: pd.DataFrame, match_tbl: pd.DataFrame):
+        raise NotImplementedError
+
+class DefaultFeatureEngineer(FeatureEngineerBase):
+    """Aggregates player stats per team and computes differences for blue vs red"""
+    # Part of the feature store key (feature_store.py): bump to force cached
+    # feature matrices to be rebuilt when behaviour changes outside this module
+    VERSION = 1
+    source_modules = ('derived_features',)
+
+    # Columns fit_transform reads from each table; the partitioned mode only
+    # ships these to the worker processes
+    INPUT_COLUMNS = (
+        ['SummonerMatchFk', 'kills', 'deaths', 'assists', 'TotalGold', 'MinionsKilled',
+         'DragonKills', 'BaronKills', 'visionScore'],
+        ['MatchFk', *BLUE_CHAMP_COLS, 'BlueWin',
+         'BlueKills', 'BlueDragonKills', 'BlueBaronKills', 'BlueTowerKills', 'BlueRiftHeraldKills',
+         'RedKills', 'RedDragonKills', 'RedBaronKills', 'RedTowerKills', 'RedRiftHeraldKills'],
+        ['SummonerMatchId', 'MatchFk', 'ChampionFk'],
+        ['MatchId', 'GameDuration'],
+    )
+
+    # Columns of X in order, with their dtypes (the integer widths of the table
+    # schemas carry through the team differences). fit_transform casts to
+    # these, so the output is known without running it (model_schema.py)
+    OUTPUT_DTYPES = {
+        # Core stats
+        'kill_diff': 'int16', 'assist_diff': 'float64', 'gold_diff': 'float64', 'cs_diff': 'float64',
+        'ward_score_diff': 'float64', 'level_diff': 'int64',
+        # Objectives
+        'dragon_diff': 'int8', 'baron_diff': 'int8', 'tower_diff': 'int8', 'herald_diff': 'int8',
+        'inhib_diff': 'int64',
+        # Time context
+        'game_duration': 'int16',
+        # Derived interaction features
+        **dict.fromkeys(DERIVED_FEATURE_NAMES, 'float64'),
+    }
+
+    def __init__(self, n_jobs=1, n_shards=None):
+        """
+        Args:
+            n_jobs: worker processes for fit_transform (-1 = all cores, 1 = serial)
+            n_shards: number of MatchFk partitions in parallel mode (default: n_jobs)
+        """
+        self.n_jobs = n_jobs
+        self.n_shards = n_shards
+
+    def aggregate_players(self, match_stats, team_stats, summoner_match):
+        """
+        Sum player stats per (MatchFk, Team).
+
+        Player rows are grouped before any match-level table is joined; the
+        team and match columns are attached once per match in fit_transform
+        instead of being copied onto all ~10 player rows of every match.
+        """
+        # Get MatchID and champion from summoner_match (a positional lookup,
+        # equivalent to the left merge on SummonerMatchId)
+        sm_pos = pd.Index(summoner_match['SummonerMatchId']).get_indexer(match_stats['SummonerMatchFk'])
+        match_fk = _lookup(summoner_match['MatchFk'], sm_pos)
+        champions = _lookup(summoner_match['ChampionFk'], sm_pos)
+
+        # Assign team BLUE or RED
+        # Only the five blue champion ids of each player's match are needed, also
+        # looked up by position instead of merging the team row onto every player
+        team_pos = pd.Index(team_stats['MatchFk']).get_indexer(match_fk)
+        blue_champs = (_lookup(team_stats[col], team_pos) for col in BLUE_CHAMP_COLS)
+        team = side_labels(blue_side_mask(champions, blue_champs))
+
+        # Aggregate stats per team
+        # We also need to know the COUNT of players per team per match to scale correctly
+        # (grouping match_stats by key arrays directly avoids copying its columns)
+        keys = [pd.Series(match_fk, index=match_stats.index, name='MatchFk'),
+                pd.Series(team, index=match_stats.index, name='Team')]
+        player_features = match_stats.groupby(keys, observed=True).agg({
+            'kills':'sum', # We use TeamStats for kills, so this is just for aux check
+            'deaths':'sum',
+            'assists':'sum',
+            'TotalGold':'sum',
+            'MinionsKilled':'sum',
+            'DragonKills':'sum',
+            'BaronKills':'sum',
+            'visionScore':'sum',
+            'SummonerMatchFk': 'count' # Count number of observed data points
+        }).reset_index()
+        return player_features
+
+    def fit_transform_partitioned(self, match_stats, team_stats, summoner_match, match_tbl):
+        """
+        fit_transform on MatchFk-hashed shards in a process pool.
+
+        Every match's player, team and match rows land in the same shard, so
+        each shard is engineered independently. Shards are collected in order
+        and sorted by MatchFk (stable), which is the order the serial path
+        produces, so the output is identical to it.
+        """
+        n_workers = os.cpu_count() if self.n_jobs is None or self.n_jobs < 0 else self.n_jobs
+        n_shards = min(self.n_shards or n_workers, max(len(match_tbl), 1))
+        if n_workers <= 1 or n_shards <= 1:
+            return self._fit_transform_serial(match_stats, team_stats, summoner_match, match_tbl)
+
+        # Player rows follow their SummonerMatch row's match
+        sm_pos = pd.Index(summoner_match['SummonerMatchId']).get_indexer(match_stats['SummonerMatchFk'])
+        player_match = _lookup(summoner_match['MatchFk'], sm_pos)
+
+        tables = [match_stats, team_stats, summoner_match, match_tbl]
+        tables = [df[[c for c in columns if c in df.columns]] for df, columns in zip(tables, self.INPUT_COLUMNS)]
+        keys = [player_match, team_stats['MatchFk'], summoner_match['MatchFk'], match_tbl['MatchId']]
+        parts = [_split_by_shard(df, match_shards(key, n_shards), n_shards) for df, key in zip(tables, keys)]
+        shards = [tables for tables in zip(*parts) if len(tables[0]) and len(tables[1])]
+        if len(shards) <= 1:
+            return self._fit_transform_serial(match_stats, team_stats, summoner_match, match_tbl)
+
+        serial = copy.copy(self)
+        serial.n_jobs = 1
+        with ProcessPoolExecutor(max_workers=min(n_workers, len(shards))) as pool:
+            results = list(pool.map(_fit_transform_shard, [serial] * len(shards), shards))
+
+        X = pd.concat([X for X, _ in results])
+        y = pd.concat([y for _, y in results])
+        order = np.argsort(X.index.to_numpy(), kind='stable')
+        return X.iloc[order], y.iloc[order]
+
+    def fit_transform(self, match_stats, team_stats, summoner_match, match_tbl):
+        if self.n_jobs != 1:
+            return self.fit_transform_partitioned(match_stats, team_stats, summoner_match, match_tbl)
+        return self._fit_transform_serial(match_stats, team_stats, summoner_match, match_tbl)
+
+    def _fit_transform_serial(self, match_stats, team_stats, summoner_match, match_tbl):
+        player_features = self.aggregate_players(match_stats, team_stats, summoner_match)
+
+        # Pivot BLUE vs RED
+        blue = player_features[player_features.Team=='BLUE'].set_index('MatchFk')
+        red  = player_features[player_features.Team=='RED'].set_index('MatchFk')
+
+        df = pd.DataFrame()
+        
+        # --- Reliability Fix ---
+        # Player data is incomplete. We use TeamStats for exact totals where possible.
+        # For player-specific stats (Gold, CS, Assists), we must SCALE the partial data 
+        # to estimate the full 5-player team total.
+        # Scaling Factor = 5 / observed_player_count
+        
+        # Avoid division by zero by replacing 0 with 1 (though count should > 0)
+        blue_scale = 5.0 / blue['SummonerMatchFk'].replace(0, 1)
+        red_scale  = 5.0 / red['SummonerMatchFk'].replace(0, 1)
+        
+        # Kills/Deaths from TeamStats (Exact)
+        ts_indexed = team_stats.set_index('MatchFk')
+        
+        # Validating overlap - only process matches present in ALL three (Blue players, Red players, TeamStats)
+        common_indices = blue.index.intersection(red.index).intersection(ts_indexed.index)
+        
+        blue = blue.loc[common_indices]
+        red = red.loc[common_indices]
+        ts_indexed = ts_indexed.loc[common_indices]
+        blue_scale = blue_scale.loc[common_indices]
+        red_scale = red_scale.loc[common_indices]
+        
+        df['kill_diff'] = ts_indexed['BlueKills'] - ts_indexed['RedKills']
+        # death_diff is redundant (it's just -kill_diff)
+        
+        # Scaled Estimates for Partial Data
+        # We estimate what the total would be if we had all 5 players
+        blue_gold_est = blue['TotalGold'] * blue_scale
+        red_gold_est  = red['TotalGold'] * red_scale
+        
+        blue_assists_est = blue['assists'] * blue_scale
+        red_assists_est  = red['assists'] * red_scale
+        
+        blue_cs_est = blue['MinionsKilled'] * blue_scale
+        red_cs_est  = red['MinionsKilled'] * red_scale
+        
+        blue_ward_est = blue['visionScore'] * blue_scale
+        red_ward_est  = red['visionScore'] * red_scale
+        
+        # Calculate Diffs using Scaled Estimates
+        df['assist_diff'] = blue_assists_est - red_assists_est
+        df['gold_diff'] = blue_gold_est - red_gold_est
+        df['cs_diff'] = blue_cs_est - red_cs_est
+        df['ward_score_diff'] = blue_ward_est - red_ward_est
+        
+        # Note: Level data not available in historical data, will use 0 as placeholder
+        df['level_diff'] = 0
+        
+        # Objectives (Reliable from TeamStats)
+        df['dragon_diff'] = ts_indexed['BlueDragonKills'] - ts_indexed['RedDragonKills']
+        df['baron_diff'] = ts_indexed['BlueBaronKills'] - ts_indexed['RedBaronKills']
+        df['tower_diff'] = ts_indexed['BlueTowerKills'] - ts_indexed['RedTowerKills']
+        df['herald_diff'] = ts_indexed['BlueRiftHeraldKills'] - ts_indexed['RedRiftHeraldKills']
+        
+        # Inhibitors not in TeamMatchTbl, use 0 as placeholder
+        df['inhib_diff'] = 0
+        
+        # Game Duration
+        df['game_duration'] = match_tbl.set_index('MatchId').loc[common_indices]['GameDuration']
+        game_minutes = (df['game_duration'] / 60).clip(lower=1)
+        
+        df['blue_win'] = ts_indexed['BlueWin']
+
+        # Drop rows with missing target/features
+        df = df.dropna(subset=['blue_win'])
+        
+        # Fill other NaNs with 0
+        df = df.fillna(0)
+        
+        # ============ DERIVED INTERACTION FEATURES ============
+        # These capture the concept of "tower-taking capability"
+        # Instead of heuristics, let the model LEARN these relationships from data!
+        
+        # combat_power, tower_combat_mismatch, push_capability,
+        # economic_advantage and objective_control (see derived_features.py,
+        # shared with WinProbabilityInterface)
+        add_derived_features(df)
+        
+        # Core stats, objectives, time context and the derived interaction
+        # features (data-driven, not heuristic!)
+        X = df[list(self.OUTPUT_DTYPES)].astype(self.OUTPUT_DTYPES)
+        y = df['blue_win']
+        return X, y
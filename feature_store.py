@@ -0,0 +1,190 @@
+"""
+Persistent cache for engineered feature matrices.
+
+fit_transform over the full dataset is the slowest step shared by the training,
+tuning and analysis scripts. The resulting (X, y) is stored once per
+
+    data fingerprint   (content hash of the four source CSVs + their schemas)
+    rank filter        (rank_ids passed to DataLoader.load_match_stats)
+    engineer version   (VERSION attribute + hash of the engineer's source code)
+
+so rerunning a script with unchanged data and code loads the matrix straight
+from disk, while editing a CSV or the feature engineering code builds a new one.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import inspect
+import numpy as np
+import pandas as pd
+from data_loader import DataLoader
+
+STORE_FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+INDEX_KEY = "__index__"
+TARGET_KEY = "__target__"
+
+
+def engineer_fingerprint(engineer):
+    """
+    Hash identifying the feature engineering code.
+
+    Covers the class name, its VERSION attribute and the source of the module
+    defining it plus any extra modules listed in its `source_modules`.
+    """
+    cls = type(engineer)
+    sha1 = hashlib.sha1()
+    sha1.update(f"{cls.__module__}.{cls.__qualname__}:{getattr(engineer, 'VERSION', 0)};".encode('utf-8'))
+    modules = [cls.__module__] + list(getattr(engineer, 'source_modules', ()))
+    for name in modules:
+        module = sys.modules.get(name)
+        try:
+            source = inspect.getsource(module)
+        except (TypeError, OSError):
+            source = ""
+        sha1.update(f"{name}:".encode('utf-8'))
+        sha1.update(source.encode('utf-8'))
+    return sha1.hexdigest()
+
+
+def feature_key(data_fingerprint, rank_ids, engineer):
+    """Store key for one (data, rank filter, engineer) combination"""
+    text = json.dumps({
+        'format': STORE_FORMAT_VERSION,
+        'data': data_fingerprint,
+        'rank_ids': sorted(int(r) for r in rank_ids) if rank_ids is not None else None,
+        'queue_type': 'CLASSIC',
+        'engineer': engineer_fingerprint(engineer),
+    }, sort_keys=True)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class FeatureStore:
+    """Stores (X, y) pairs as one npz file per key, keeping the most recent entries"""
+
+    def __init__(self, store_dir, max_entries=8):
+        self.store_dir = store_dir
+        self.max_entries = max_entries
+
+    def _entry_dir(self, key):
+        return os.path.join(self.store_dir, key)
+
+    def _read_manifest(self, key):
+        path = os.path.join(self._entry_dir(key), MANIFEST_NAME)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def rows(self, key):
+        """Row count of the matrix stored under key, None if not stored"""
+        manifest = self._read_manifest(key)
+        return manifest.get('rows') if manifest is not None else None
+
+    def contains(self, key):
+        manifest = self._read_manifest(key)
+        return manifest is not None and manifest.get('version') == STORE_FORMAT_VERSION
+
+    def load(self, key):
+        """Return the stored (X, y) for key"""
+        manifest = self._read_manifest(key)
+        if manifest is None:
+            raise FileNotFoundError(f"No feature matrix stored for {key}")
+
+        with np.load(os.path.join(self._entry_dir(key), "data.npz"), allow_pickle=False) as data:
+            index = pd.Index(data[INDEX_KEY], name=manifest['index_name'])
+            X = pd.DataFrame({name: data[f"c{i}"] for i, name in enumerate(manifest['columns'])},
+                             index=index, columns=manifest['columns'])
+            y = pd.Series(data[TARGET_KEY], index=index, name=manifest['target_name'])
+
+        # Mark as recently used so pruning keeps it
+        os.utime(os.path.join(self._entry_dir(key), MANIFEST_NAME))
+        return X, y
+
+    def save(self, key, X, y):
+        """Write (X, y) under key (atomically replaces any old entry)"""
+        os.makedirs(self.store_dir, exist_ok=True)
+        tmp_dir = self._entry_dir(key) + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        try:
+            arrays = {f"c{i}": X[name].to_numpy() for i, name in enumerate(X.columns)}
+            arrays[INDEX_KEY] = X.index.to_numpy()
+            arrays[TARGET_KEY] = y.to_numpy()
+            np.savez(os.path.join(tmp_dir, "data.npz"), **arrays)
+            with open(os.path.join(tmp_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+                json.dump({
+                    'version': STORE_FORMAT_VERSION,
+                    'created': time.time(),
+                    'rows': len(X),
+                    'columns': [str(c) for c in X.columns],
+                    'index_name': X.index.name,
+                    'target_name': y.name,
+                }, f, indent=1)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        entry_dir = self._entry_dir(key)
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(tmp_dir, entry_dir)
+        self._prune()
+
+    def _prune(self):
+        """Drop the least recently used entries beyond max_entries"""
+        entries = []
+        for name in os.listdir(self.store_dir):
+            manifest = os.path.join(self.store_dir, name, MANIFEST_NAME)
+            if os.path.exists(manifest):
+                entries.append((os.path.getmtime(manifest), name))
+        entries.sort(reverse=True)
+        for _, name in entries[self.max_entries:]:
+            shutil.rmtree(os.path.join(self.store_dir, name), ignore_errors=True)
+
+
+def default_store_dir(data_dir):
+    return os.path.join(data_dir, ".cache", "features")
+
+
+def load_features(data_dir="data", rank_ids=None, engineer=None, use_store=True, store_dir=None):
+    """
+    Engineered (X, y) for the CLASSIC matches of the given ranks.
+
+    Served from the feature store when the data and engineer are unchanged;
+    otherwise the tables are loaded, fit_transform runs and the result is stored.
+
+    Args:
+        data_dir: directory holding the source CSVs
+        rank_ids: list of RankFk values (None = all ranks)
+        engineer: feature engineer instance (default: DefaultFeatureEngineer
+            partitioned over all cores)
+        use_store: set False to always rebuild without reading or writing the store
+        store_dir: defaults to default_store_dir(data_dir), <data_dir>/.cache/features
+    """
+    if engineer is None:
+        from feature_engineer import DefaultFeatureEngineer
+        engineer = DefaultFeatureEngineer(n_jobs=-1)
+
+    loader = DataLoader(data_dir)
+    store = None
+    if use_store:
+        store = FeatureStore(store_dir or default_store_dir(data_dir))
+        key = feature_key(loader.fingerprint(), rank_ids, engineer)
+        if store.contains(key):
+            print("Loading engineered features from cache...")
+            return store.load(key)
+
+    match_stats, team_stats, match_tbl, summoner_match = loader.load_match_stats(rank_ids=rank_ids)
+    print("Engineering features...")
+    X, y = engineer.fit_transform(match_stats, team_stats, summoner_match, match_tbl)
+
+    if store is not None:
+        try:
+            store.save(key, X, y)
+        except OSError as e:
+            print(f"Warning: could not write feature cache: {e}")
+    return X, y
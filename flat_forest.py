@@ -0,0 +1,246 @@
+"""
+Random forest flattened into contiguous NumPy arrays.
+
+All trees of a fitted RandomForestClassifier are concatenated into one set of
+node arrays (feature, threshold, left, right, value, roots). Nodes are
+renumbered breadth-first so the two children of a node are adjacent
+(right = left + 1), and leaves point to themselves through an extra always-zero
+input column with an infinite threshold. Every row can then be walked for
+max_depth steps with one "left + went_right" update per step, without
+checking whether it has already reached a leaf.
+
+The evaluator reproduces sklearn's serial predict_proba (n_jobs=1) bit for
+bit; for forests fitted with n_jobs != 1 sklearn sums the trees across
+threads in no fixed order, so the two agree within float rounding:
+    - inputs are compared as float32 (sklearn casts X to float32); thresholds
+      are stored as the largest float32 <= sklearn's float64 threshold, which
+      gives the same x <= threshold outcome for every float32 x
+    - NaN goes left only where the node's missing_go_to_left is set
+    - the trees' class-1 leaf values are summed in estimator order starting
+      from 0 and divided by the number of trees
+
+Usage:
+    python flat_forest.py     # export data/winprob_model.joblib -> data/winprob_model.npz
+"""
+import numpy as np
+
+FLAT_FOREST_VERSION = 1
+
+# Rows walked together in predict_proba; keeps the (rows, trees) working
+# arrays cache-sized (about 2.5x faster than one pass over 100k rows)
+CHUNK_ROWS = 1024
+
+
+def float32_at_most(values):
+    """Largest float32 <= each float64 value (x32 <= t64 iff x32 <= result)"""
+    rounded = values.astype(np.float32)
+    too_big = rounded.astype(np.float64) > values
+    rounded[too_big] = np.nextafter(rounded[too_big], np.float32(-np.inf))
+    return rounded
+
+
+def _breadth_first(tree):
+    """Node ids of one sklearn tree in breadth-first order (children adjacent)"""
+    order = [0]
+    for node in order:
+        if tree.children_left[node] != -1:
+            order.append(tree.children_left[node])
+            order.append(tree.children_right[node])
+    return np.array(order, dtype=np.intp)
+
+
+class FlatForest:
+    """Array-backed binary classification forest; see module docstring"""
+
+    def __init__(self, feature, threshold, left, right, missing_left, value, roots, max_depth, n_features):
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float32)
+        self.left = np.asarray(left, dtype=np.intp)
+        self.right = np.asarray(right, dtype=np.intp)
+        self.missing_left = np.asarray(missing_left, dtype=bool)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+        self._has_missing = bool(self.missing_left.any())
+        self._tree_ends = np.append(self.roots, len(self.value)).tolist()
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        """Flatten a fitted binary RandomForestClassifier"""
+        if len(forest.classes_) != 2 or forest.n_outputs_ != 1:
+            raise ValueError("Only single-output binary forests can be flattened")
+        n_features = forest.n_features_in_
+
+        features, thresholds, lefts, missing, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            order = _breadth_first(tree)
+            new_id = np.empty(tree.node_count, dtype=np.intp)
+            new_id[order] = np.arange(tree.node_count) + offset
+            is_leaf = tree.children_left[order] == -1
+
+            # Leaves read the extra zero column (index n_features) and always go "left" to themselves
+            features.append(np.where(is_leaf, n_features, tree.feature[order]))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold[order]))
+            lefts.append(np.where(is_leaf, new_id[order], new_id[tree.children_left[order]]))
+            missing_left = getattr(tree, 'missing_go_to_left', None)
+            missing.append(np.zeros(len(order), dtype=bool) if missing_left is None
+                           else np.asarray(missing_left, dtype=bool)[order] & ~is_leaf)
+            # Class-1 leaf fraction: what predict_proba[:, 1] sums per tree
+            values.append(tree.value[order, 0, 1].astype(np.float64))
+            roots.append(offset)
+
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        left = np.concatenate(lefts)
+        feature = np.concatenate(features)
+        return cls(
+            feature=feature,
+            threshold=float32_at_most(np.concatenate(thresholds)),
+            left=left,
+            right=np.where(feature == n_features, left, left + 1),
+            missing_left=np.concatenate(missing),
+            value=np.concatenate(values),
+            roots=roots,
+            max_depth=max_depth,
+            n_features=n_features,
+        )
+
+    def _extended(self, X):
+        """float32 copy of X with the extra zero column leaves read"""
+        X = np.asarray(X)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected shape (n, {self.n_features}), got {X.shape}")
+        extended = np.zeros((X.shape[0], self.n_features + 1), dtype=np.float32)
+        extended[:, :-1] = X
+        return extended
+
+    def leaves(self, X):
+        """(n_rows, n_trees) leaf index of every row in every tree"""
+        extended = self._extended(X)
+        flat = extended.ravel()
+        row_offset = (np.arange(len(extended)) * extended.shape[1])[:, np.newaxis]
+        nodes = np.broadcast_to(self.roots, (len(extended), self.n_trees))
+        for _ in range(self.max_depth):
+            x = flat.take(row_offset + self.feature.take(nodes))
+            went_right = ~(x <= self.threshold.take(nodes))
+            if self._has_missing:
+                went_right &= ~(np.isnan(x) & self.missing_left.take(nodes))
+            nodes = self.left.take(nodes) + went_right
+        return nodes
+
+    def predict_proba(self, X):
+        """Class-1 probability for each row of X (n_rows, n_features)"""
+        X = np.asarray(X)
+        proba = np.empty(len(X))
+        for start in range(0, len(X), CHUNK_ROWS):
+            tree_values = self.value.take(self.leaves(X[start:start + CHUNK_ROWS]))
+            # Sequential sum over trees, in estimator order (np.sum would pair up terms)
+            proba[start:start + CHUNK_ROWS] = np.cumsum(tree_values, axis=1)[:, -1] / self.n_trees
+        return proba
+
+    def predict_one(self, x):
+        """
+        Class-1 probability for a single feature vector.
+
+        With one row it is cheaper to decide every node's direction at once
+        and then follow a precomputed next-node table, one lookup per level.
+        """
+        extended = np.zeros(self.n_features + 1, dtype=np.float32)
+        extended[:-1] = x
+        values = extended.take(self.feature)
+        went_right = ~(values <= self.threshold)
+        if self._has_missing:
+            went_right &= ~(np.isnan(values) & self.missing_left)
+        next_node = self.left + went_right
+        nodes = self.roots
+        for _ in range(self.max_depth):
+            nodes = next_node.take(nodes)
+        return np.cumsum(self.value.take(nodes))[-1] / self.n_trees
+
+    def predict_one_anytime(self, x, tolerance, batch_size=16, z=2.576):
+        """
+        Class-1 probability for one feature vector, stopping early.
+
+        Trees are evaluated batch_size at a time (only those trees' nodes are
+        touched). After each batch the running mean of the per-tree values is
+        accepted once z * its standard error (with finite-forest correction)
+        is below tolerance; z=2.576 is a ~99% bound. At least two batches
+        are always evaluated.
+
+        Returns:
+            (probability, number of trees used). When every tree is used the
+            probability is exactly predict_one(x).
+        """
+        extended = np.zeros(self.n_features + 1, dtype=np.float32)
+        extended[:-1] = x
+        n_trees = self.n_trees
+        ends = self._tree_ends
+        tree_values = np.empty(n_trees)
+        total = total_sq = 0.0
+        used = 0
+        while used < n_trees:
+            stop = min(used + batch_size, n_trees)
+            lo, hi = ends[used], ends[stop]
+            values = extended.take(self.feature[lo:hi])
+            went_right = ~(values <= self.threshold[lo:hi])
+            if self._has_missing:
+                went_right &= ~(np.isnan(values) & self.missing_left[lo:hi])
+            next_node = self.left[lo:hi] - lo + went_right
+            nodes = self.roots[used:stop] - lo
+            for _ in range(self.max_depth):
+                nodes = next_node.take(nodes)
+            batch = self.value[lo:hi].take(nodes)
+            tree_values[used:stop] = batch
+            total += float(batch.sum())
+            total_sq += float(batch @ batch)
+            used = stop
+
+            # At least two batches: a single batch can agree by chance (zero spread)
+            if 2 * batch_size <= used < n_trees:
+                variance = max(total_sq - total * total / used, 0.0) / (used - 1)
+                std_error = (variance / used * (n_trees - used) / (n_trees - 1)) ** 0.5
+                if z * std_error < tolerance:
+                    break
+        return np.cumsum(tree_values[:used])[-1] / used, used
+
+    def save(self, path):
+        np.savez(
+            path,
+            version=FLAT_FOREST_VERSION,
+            feature=self.feature.astype(np.int32), threshold=self.threshold,
+            left=self.left.astype(np.int32), right=self.right.astype(np.int32),
+            missing_left=self.missing_left,
+            value=self.value, roots=self.roots.astype(np.int32),
+            max_depth=self.max_depth, n_features=self.n_features,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['version']) != FLAT_FOREST_VERSION:
+                raise ValueError(f"Unsupported flat forest version in {path}")
+            return cls(**{key: data[key] for key in (
+                'feature', 'threshold', 'left', 'right', 'missing_left',
+                'value', 'roots', 'max_depth', 'n_features')})
+
+
+if __name__ == "__main__":
+    import os
+    from model import RandomForestWinModel, MODEL_PATH
+
+    model = RandomForestWinModel(MODEL_PATH)
+    if not model.load():
+        raise SystemExit(f"Model not found at {MODEL_PATH}")
+    out_path = os.path.splitext(MODEL_PATH)[0] + ".npz"
+    flat = FlatForest.from_sklearn(model.model)
+    flat.save(out_path)
+    print(f"Exported {flat.n_trees} trees ({len(flat.value)} nodes, depth {flat.max_depth}) to {out_path}")
@@ -0,0 +1,125 @@
+"""
+Game lifecycle of the live pipeline: no client -> loading -> in game.
+
+What a tick does depends on the state, so the overlay does not hit port 2999
+harder than the situation needs:
+
+    no_client   nothing listening on the live client port: probe /gamestats
+                with exponential backoff (min_backoff doubling up to
+                max_backoff), so an idle overlay costs close to nothing
+    loading     the client answers but no game clock yet: cheap /gamestats
+                probe every loading_interval seconds
+    in_game     one round of game data per tick and no separate liveness
+                check; failed fetches count as liveness signals, and
+                max_failures in a row drop back to loading (HTTP errors) or
+                no_client (unreachable)
+"""
+from async_live_client import LiveClientError
+
+NO_CLIENT = "no_client"
+LOADING = "loading"
+IN_GAME = "in_game"
+
+STATUS_TEXT = {
+    NO_CLIENT: "No game running",
+    LOADING: "Game loading...",
+    IN_GAME: "Waiting for game data...",
+}
+
+
+class GameLifecycle:
+    """
+    State machine deciding what each tick fetches and how long to wait.
+
+    Args:
+        min_backoff, max_backoff: probe delay range while no client runs (s)
+        loading_interval: probe delay while the game loads (s)
+        max_failures: consecutive failed in-game fetches before leaving in_game
+    """
+
+    def __init__(self, min_backoff=1.0, max_backoff=30.0, loading_interval=2.0, max_failures=3):
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.loading_interval = loading_interval
+        self.max_failures = max_failures
+
+        self.state = NO_CLIENT
+        self.backoff = min_backoff
+        self.failures = 0
+        # Counters for diagnostics
+        self.probes = 0
+        self.fetches = 0
+        self.transitions = 0
+
+    def _enter(self, state):
+        if state == self.state:
+            return
+        self.state = state
+        self.transitions += 1
+        self.failures = 0
+        self.backoff = self.min_backoff
+
+    def observe_probe(self, status, game_time=0.0):
+        """
+        Result of a liveness probe.
+
+        Args:
+            status: HTTP status of /gamestats, None if the client was unreachable
+            game_time: game clock from a successful probe
+        """
+        if status is None:
+            if self.state == NO_CLIENT:
+                self.backoff = min(self.backoff * 2, self.max_backoff)
+            else:
+                self._enter(NO_CLIENT)
+        elif status == 200 and game_time > 0:
+            self._enter(IN_GAME)
+        else:
+            self._enter(LOADING)
+
+    def observe_fetch(self, error=None):
+        """Result of an in-game data fetch (error: the LiveClientError, None on success)"""
+        if error is None:
+            self.failures = 0
+            return
+        self.failures += 1
+        if self.failures >= self.max_failures:
+            self._enter(NO_CLIENT if error.status is None else LOADING)
+
+    def next_delay(self, in_game_interval):
+        """Seconds to wait before the next tick"""
+        if self.state == NO_CLIENT:
+            return self.backoff
+        if self.state == LOADING:
+            return self.loading_interval
+        return in_game_interval
+
+    def status_text(self):
+        """Overlay status for a tick that produced no features"""
+        return STATUS_TEXT[self.state]
+
+    async def tick(self, client):
+        """
+        One tick against an AsyncLiveClient.
+
+        Returns:
+            the features dict when in game and the fetch succeeded, else None
+        """
+        if self.state != IN_GAME:
+            self.probes += 1
+            try:
+                stats = await client.fetch_json("/gamestats")
+                self.observe_probe(200, stats.get("gameTime", 0))
+            except LiveClientError as e:
+                self.observe_probe(e.status)
+            if self.state != IN_GAME:
+                return None
+
+        self.fetches += 1
+        try:
+            features = await client.fetch_features()
+        except LiveClientError as e:
+            self.observe_fetch(e)
+            return None
+        self.observe_fetch()
+        return features
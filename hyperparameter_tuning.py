@@ -3,8 +3,7 @@ import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split, GridSearchCV
 from sklearn.metrics import accuracy_score, classification_report, make_scorer
-from data_loader import DataLoader
-from feature_engineer import DefaultFeatureEngineer
+from feature_store import load_features
 import time
 
 def hyperparameter_tuning():
@@ -15,12 +14,7 @@ def hyperparameter_tuning():
     
     # Load and prepare data
     print("Loading data...")
-    loader = DataLoader("data")
-    match_stats, team_stats, match_tbl, summoner_match = loader.load_match_stats()
-    
-    print("Engineering features...")
-    engineer = DefaultFeatureEngineer()
-    X, y = engineer.fit_transform(match_stats, team_stats, summoner_match, match_tbl)
+    X, y = load_features("data")
     
     # Split data
     X_train, X_test, y_train, y_test = train_test_split(
@@ -1,189 +1,296 @@
-import sys
-import os
-import pandas as pd
-from model import RandomForestWinModel
-
-def resource_path(relative_path):
-    """ Get absolute path to resource, works for dev and for PyInstaller """
-    try:
-        # PyInstaller creates a temp folder and stores path in _MEIPASS
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-
-    return os.path.join(base_path, relative_path)
-
-MODEL_PATH = resource_path(os.path.join("data", "winprob_model.joblib"))
-FEATURES = [
-    # Core stats
-    'kill_diff', 'assist_diff', 'gold_diff', 'cs_diff',
-    'ward_score_diff', 'level_diff',
-    # Objectives
-    'dragon_diff', 'baron_diff', 'tower_diff', 'herald_diff', 'inhib_diff',
-    # Time context
-    'game_duration',
-    # Derived interaction features (model learns these!)
-    'combat_power', 'tower_combat_mismatch', 'push_capability',
-    'economic_advantage', 'objective_control'
-]
-
-class WinProbabilityInterface:
-    def __init__(self):
-        self.model = RandomForestWinModel(MODEL_PATH)
-        if not self.model.load():
-            print("Warning: Model not found at", MODEL_PATH)
-        
-        # Calibration parameters to fix symmetry
-        # The model has asymmetric predictions because it was trained on full-game data
-        # where towers/objectives matter most. We need to:
-        #   1. Center the baseline at 50%
-        #   2. Make it more symmetric
-        #   3. Increase sensitivity to early-game features like gold
-        
-        # Empirically measured baseline (all zeros with small game_duration)
-        self.baseline_raw = 0.458
-        
-        # Use a two-stage calibration:
-        # Stage 1: Re-center around 0.5
-        # Stage 2: Apply non-linear mapping to fix asymmetry and boost sensitivity
-        
-    def _calibrate(self, raw_prob):
-        """
-        Apply piecewise calibration to fix symmetry and sensitivity.
-        
-        The model's raw predictions have these issues:
-        - Baseline (~0.458) should be 0.50
-        - Asymmetric: advantage predictions are compressed, disadvantage predictions are too extreme
-        - Insensitive: 2000 gold advantage barely moves the needle
-        
-        We apply a piecewise mapping with different curves for each side:
-        - Map 0 → 0 (total loss)
-        - Map baseline (0.458) → 0.50 (even game)
-        - Map extremes with power curves to boost middle range and improve symmetry
-        - Map 1 → 1 (total win)
-        """
-        
-        if raw_prob <= 0.01:
-            return 0.0
-        elif raw_prob >= 0.99:
-            return 1.0
-        
-        # Piecewise calibration with different handling for each side
-        
-        if raw_prob < self.baseline_raw:
-            # Below baseline: map [0, 0.458] → [0, 0.5]
-            # The model tends to be too extreme on the low end
-            normalized = raw_prob / self.baseline_raw  # 0 to 1
-            
-            # Use power curve to compress extreme values human: 0.8 makes it less extreme)
-            compressed = normalized ** 0.8
-            
-            return compressed * 0.5
-        else:
-            # Above baseline: map [0.458, 1.0] → [0.5, 1.0]
-            # The model tends to be too conservative on the high end
-            normalized = (raw_prob - self.baseline_raw) / (1.0 - self.baseline_raw)  # 0 to 1
-            
-            # Use power curve to boost sensitivity (< 1.0 boosts middle range)
-            boosted = normalized ** 0.5
-            
-            return 0.5 + (boosted * 0.5)
-
-    def _calculate_derived_features(self, **kwargs):
-        """
-        Calculate derived interaction features from base features.
-        These are the SAME formulas used in training!
-        """
-        # Extract base features
-        kill_diff = kwargs.get('kill_diff', 0)
-        gold_diff = kwargs.get('gold_diff', 0)
-        level_diff = kwargs.get('level_diff', 0)
-        baron_diff = kwargs.get('baron_diff', 0)
-        dragon_diff = kwargs.get('dragon_diff', 0)
-        tower_diff = kwargs.get('tower_diff', 0)
-        herald_diff = kwargs.get('herald_diff', 0)
-        inhib_diff = kwargs.get('inhib_diff', 0)
-        cs_diff = kwargs.get('cs_diff', 0)
-        
-        # Calculate derived features (must match feature_engineer.py!)
-        combat_power = (
-            kill_diff / 10.0 +
-            gold_diff / 3000.0 +
-            level_diff / 10.0 +
-            baron_diff * 3.0 +
-            dragon_diff * 0.5
-        )
-        
-        tower_combat_mismatch = tower_diff - combat_power
-        
-        push_capability = (
-            combat_power +
-            baron_diff * 2.0 +
-            herald_diff * 1.0
-        )
-        
-        economic_advantage = (
-            gold_diff / 1000.0 +
-            cs_diff / 50.0
-        )
-        
-        objective_control = (
-            dragon_diff * 1.0 +
-            baron_diff * 3.0 +
-            tower_diff * 2.0 +
-            herald_diff * 1.5 +
-            inhib_diff * 4.0
-        )
-        
-        return {
-            'combat_power': combat_power,
-            'tower_combat_mismatch': tower_combat_mismatch,
-            'push_capability': push_capability,
-            'economic_advantage': economic_advantage,
-            'objective_control': objective_control
-        }
-
-    def predict(self, **kwargs):
-        """
-        Predict win probability using the trained Random Forest model with calibration.
-        
-        Calibration ensures:
-        - Game start (all zeros) → 50% prediction
-        - Better symmetry: +X and -X are symmetric around 50%
-        - More responsive to gold/stats differences in early game
-        
-        Model now learns tower-taking capability from DATA instead of heuristics!
-        """
-        data = {}
-        
-        # Fill in base features
-        for f in FEATURES:
-            if f not in ['combat_power', 'tower_combat_mismatch', 'push_capability', 
-                         'economic_advantage', 'objective_control']:
-                data[f] = kwargs.get(f, 0)
-        
-        # Calculate derived features
-        derived = self._calculate_derived_features(**kwargs)
-        data.update(derived)
-            
-        # Create DataFrame for prediction
-        df = pd.DataFrame([data])
-        df = df[FEATURES]  # Ensure correct order
-        
-        try:
-            # Use the full Random Forest model
-            # Model will use the derived features to understand tower-taking capability!
-            raw_prob = self.model.predict(df)[0]
-            
-            # Apply calibration for symmetry
-            calibrated_prob = self._calibrate(raw_prob)
-            
-            # Clamp to valid probability range
-            final_prob = max(0.0, min(1.0, calibrated_prob))
-            
-            return final_prob
-            
-        except Exception as e:
-            print(f"Error predicting: {e}")
-            # Failsafe: return 50% if model fails
-            return 0.5
+import sys
+import os
+import numpy as np
+from compact_forest import CompactWinModel, COMPACT_MODEL_PATH
+from surrogate import SurrogateWinModel
+from lookup_surface import LookupSurfaceModel
+from derived_features import DERIVED_FEATURE_NAMES
+from model_schema import FeatureSchema
+from calibration import CalibrationTable
+
+def resource_path(relative_path):
+    """ Get absolute path to resource, works for dev and for PyInstaller """
+    try:
+        # PyInstaller creates a temp folder and stores path in _MEIPASS
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+
+    return os.path.join(base_path, relative_path)
+
+MODEL_PATH = resource_path(os.path.join("data", "winprob_model.joblib"))
+COMPACT_PATH = resource_path(COMPACT_MODEL_PATH)
+SURROGATE_PATH = resource_path(os.path.join("data", "winprob_surrogate.npz"))
+SURFACE_PATH = resource_path(os.path.join("data", "winprob_surface.npz"))
+FEATURES = [
+    # Core stats
+    'kill_diff', 'assist_diff', 'gold_diff', 'cs_diff',
+    'ward_score_diff', 'level_diff',
+    # Objectives
+    'dragon_diff', 'baron_diff', 'tower_diff', 'herald_diff', 'inhib_diff',
+    # Time context
+    'game_duration',
+    # Derived interaction features (model learns these!)
+    'combat_power', 'tower_combat_mismatch', 'push_capability',
+    'economic_advantage', 'objective_control'
+]
+# Inputs predict() can be given (what live_client.extract_features produces)
+BASE_FEATURES = [f for f in FEATURES if f not in DERIVED_FEATURE_NAMES]
+
+class WinProbabilityInterface:
+    def __init__(self, anytime_tolerance=None, backend="forest"):
+        """
+        Args:
+            anytime_tolerance: if set, predict() stops evaluating trees once the
+                raw forest probability is known to within this value
+                (anytime_tolerance of RandomForestWinModel / CompactWinModel);
+                None = all trees. Forest and compact backends only
+            backend: "forest" for the trained Random Forest (needs sklearn),
+                "compact" for its NumPy-only export (compact_forest.py; what
+                the live overlay uses), "surrogate"
+                for the distilled lookup-table model (surrogate.py), or
+                "surface" for the precomputed, already calibrated
+                probability grid (lookup_surface.py)
+        """
+        if backend in ("forest", "compact"):
+            if backend == "forest":
+                # Imported here so the inference-only runtime never loads sklearn/pandas
+                from model import RandomForestWinModel
+                path = MODEL_PATH
+                self.model = RandomForestWinModel(path)
+            else:
+                path = COMPACT_PATH
+                self.model = CompactWinModel(path)
+            self.model.anytime_tolerance = anytime_tolerance
+        elif backend in ("surrogate", "surface") and anytime_tolerance is not None:
+            raise ValueError(f"anytime_tolerance needs a forest backend, not {backend!r}")
+        elif backend == "surrogate":
+            path = SURROGATE_PATH
+            self.model = SurrogateWinModel(path)
+        elif backend == "surface":
+            path = SURFACE_PATH
+            self.model = LookupSurfaceModel(path)
+        else:
+            raise ValueError(f"Unknown backend: {backend}")
+        
+        loaded = self.model.load()
+        if not loaded:
+            print("Warning: Model not found at", path)
+        
+        # Validate the model's feature schema once and bind its column layout.
+        # Artifacts that carry a schema (compact_forest.py) bring their own
+        # feature order, derived-feature formulas and calibration; otherwise
+        # the model's feature names (or FEATURES) and the current code are used.
+        schema = getattr(self.model, 'schema', None) if loaded else None
+        if schema is not None:
+            self.schema = FeatureSchema(schema)
+        else:
+            self.schema = FeatureSchema.for_features((loaded and self.model.feature_names) or FEATURES,
+                                                     getattr(self.model, 'calibration', None) if loaded else None)
+        if loaded and self.model.feature_names is not None and self.model.feature_names != self.schema.features:
+            raise ValueError(f"Model at {path} does not match its feature schema")
+        unknown = [name for _, name in self.schema.base_index if name not in BASE_FEATURES]
+        if unknown:
+            # predict() reads base features by name; these would silently be 0
+            raise ValueError(f"Model at {path} needs unknown input features: {unknown}")
+        self.features = self.schema.features
+
+        # Reused by every predict() call: float64 inputs for the derived
+        # features, float32 copy for the trees (what sklearn casts to)
+        self._vector = np.zeros(len(self.features))
+        self._vector32 = np.zeros(len(self.features), dtype=np.float32)
+        self._precalibrated = getattr(self.model, 'calibrated', False)
+        
+        # Calibration parameters to fix symmetry
+        # The model has asymmetric predictions because it was trained on full-game data
+        # where towers/objectives matter most. We need to:
+        #   1. Center the baseline at 50%
+        #   2. Make it more symmetric
+        #   3. Increase sensitivity to early-game features like gold
+        calibration = self.schema.calibration
+        
+        # Models trained with a fitted calibration carry a monotone lookup
+        # table (calibration.py) whose baseline was measured on the model
+        if calibration['kind'] == 'table':
+            self._table = CalibrationTable.from_dict(calibration)
+            self.baseline_raw = self._table.baseline_raw
+        else:
+            self._table = None
+            
+            # Empirically measured baseline (all zeros with small game_duration)
+            self.baseline_raw = calibration['baseline_raw']
+            self.below_power = calibration['below_power']
+            self.above_power = calibration['above_power']
+            self.floor = calibration['floor']
+            self.ceiling = calibration['ceiling']
+            
+            # Use a two-stage calibration:
+            # Stage 1: Re-center around 0.5
+            # Stage 2: Apply non-linear mapping to fix asymmetry and boost sensitivity
+        
+    def _calibrate(self, raw_prob):
+        """
+        Apply piecewise calibration to fix symmetry and sensitivity.
+        
+        The model's raw predictions have these issues:
+        - Baseline (~0.458) should be 0.50
+        - Asymmetric: advantage predictions are compressed, disadvantage predictions are too extreme
+        - Insensitive: 2000 gold advantage barely moves the needle
+        
+        We apply a piecewise mapping with different curves for each side:
+        - Map 0 → 0 (total loss)
+        - Map baseline (0.458) → 0.50 (even game)
+        - Map extremes with power curves to boost middle range and improve symmetry
+        - Map 1 → 1 (total win)
+        
+        Models with a fitted calibration table use that instead.
+        """
+        if self._table is not None:
+            return self._table.one(raw_prob)
+        
+        if raw_prob <= self.floor:
+            return 0.0
+        elif raw_prob >= self.ceiling:
+            return 1.0
+        
+        # Piecewise calibration with different handling for each side
+        
+        if raw_prob < self.baseline_raw:
+            # Below baseline: map [0, 0.458] → [0, 0.5]
+            # The model tends to be too extreme on the low end
+            normalized = raw_prob / self.baseline_raw  # 0 to 1
+            
+            # Use power curve to compress extreme values human: 0.8 makes it less extreme)
+            compressed = normalized ** self.below_power
+            
+            return compressed * 0.5
+        else:
+            # Above baseline: map [0.458, 1.0] → [0.5, 1.0]
+            # The model tends to be too conservative on the high end
+            normalized = (raw_prob - self.baseline_raw) / (1.0 - self.baseline_raw)  # 0 to 1
+            
+            # Use power curve to boost sensitivity (< 1.0 boosts middle range)
+            boosted = normalized ** self.above_power
+            
+            return 0.5 + (boosted * 0.5)
+
+    def _calibrate_batch(self, raw_probs):
+        """_calibrate for an array of raw probabilities (same curves, vectorized)"""
+        if self._table is not None:
+            return self._table.batch(raw_probs)
+        raw_probs = np.asarray(raw_probs, dtype=np.float64)
+        
+        # Below baseline: map [0, baseline] → [0, 0.5] with the below_power curve
+        below = (raw_probs / self.baseline_raw) ** self.below_power * 0.5
+        # Above baseline: map [baseline, 1] → [0.5, 1] with the above_power curve
+        # (clamped at 0 so rows that take the other branch don't produce NaN)
+        normalized = np.maximum(raw_probs - self.baseline_raw, 0.0) / (1.0 - self.baseline_raw)
+        above = 0.5 + (normalized ** self.above_power * 0.5)
+        
+        calibrated = np.where(raw_probs < self.baseline_raw, below, above)
+        calibrated = np.where(raw_probs <= self.floor, 0.0, calibrated)
+        calibrated = np.where(raw_probs >= self.ceiling, 1.0, calibrated)
+        return np.clip(calibrated, 0.0, 1.0)
+
+    def _fill_features(self, **kwargs):
+        """
+        Write the base features into the preallocated feature vector and
+        compute the derived ones in place (the formulas bound from the model's
+        schema, i.e. those used in training). Missing base features are 0.
+        """
+        vector = self._vector
+        for i, f in self.schema.base_index:
+            vector[i] = kwargs.get(f, 0)
+        self.schema.derived.fill_vector(vector)
+        return vector
+
+    def _calculate_derived_features(self, **kwargs):
+        """
+        Calculate derived interaction features from base features.
+        These are the SAME formulas used in training!
+        """
+        vector = self._fill_features(**kwargs)
+        derived = self.schema.derived
+        return {name: float(vector[i]) for name, i in zip(derived.names, derived.outputs)}
+
+    def predict(self, **kwargs):
+        """
+        Predict win probability using the trained Random Forest model with calibration.
+        
+        Calibration ensures:
+        - Game start (all zeros) → 50% prediction
+        - Better symmetry: +X and -X are symmetric around 50%
+        - More responsive to gold/stats differences in early game
+        
+        Model now learns tower-taking capability from DATA instead of heuristics!
+        """
+        # Base + derived features, in the model's feature order
+        vector = self._fill_features(**kwargs)
+        self._vector32[:] = vector
+        
+        try:
+            # Use the full Random Forest model
+            # Model will use the derived features to understand tower-taking capability!
+            raw_prob = self.model.predict_row(self._vector32)
+            
+            # Apply calibration for symmetry (the lookup surface already includes it)
+            calibrated_prob = raw_prob if self._precalibrated else self._calibrate(raw_prob)
+            
+            # Clamp to valid probability range
+            final_prob = max(0.0, min(1.0, calibrated_prob))
+            
+            return final_prob
+            
+        except Exception as e:
+            print(f"Error predicting: {e}")
+            # Failsafe: return 50% if model fails
+            return 0.5
+
+    def feature_block(self, features):
+        """
+        (n, len(self.features)) float64 array with base and derived features.
+
+        Args:
+            features: DataFrame with base feature columns (missing ones are 0),
+                or an array with one row per game state and either the base
+                features or all features as columns, in the model's order
+        """
+        base_index = self.schema.base_index
+        n_features = len(self.features)
+        if hasattr(features, 'columns'):
+            block = np.zeros((len(features), n_features))
+            for i, f in base_index:
+                if f in features.columns:
+                    block[:, i] = features[f].to_numpy(dtype=np.float64)
+        else:
+            values = np.asarray(features, dtype=np.float64)
+            if values.ndim == 1:
+                values = values.reshape(1, -1)
+            if values.shape[1] == n_features:
+                block = values.copy()
+            elif values.shape[1] == len(base_index):
+                block = np.zeros((len(values), n_features))
+                block[:, [i for i, _ in base_index]] = values
+            else:
+                raise ValueError(f"Expected {len(base_index)} base or {n_features} feature columns, got {values.shape[1]}")
+        return self.schema.derived.fill_block(block)
+
+    def predict_batch(self, features):
+        """
+        Predict win probabilities for many game states at once.
+        
+        Derived features, the forest and calibration all run on whole arrays.
+        Features and raw model output are identical to predict() row by row;
+        the calibrated values can differ in the last bit because NumPy's
+        power function rounds differently from Python's.
+        
+        Args:
+            features: see feature_block()
+        Returns:
+            float64 array with one probability per row
+        """
+        block = self.feature_block(features)
+        raw_probs = self.model.predict_rows(block.astype(np.float32))
+        if self._precalibrated:
+            return np.clip(raw_probs, 0.0, 1.0)
+        return self._calibrate_batch(raw_probs)
@@ -1,13 +1,10 @@
 import requests
 import urllib3
-import re
+from live_state import ObjectiveTracker, RosterIndex, normalize_name, player_aliases, roster_key
 
 # Disable SSL warnings for local API
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-# GLOBAL REGEX — removes everything except letters and numbers
-_non_alnum = re.compile(r"[^a-z0-9]+")
-
 class LiveClientAPI:
     """Interface to League of Legends Live Client Data API"""
     
@@ -16,6 +13,10 @@ class LiveClientAPI:
     def __init__(self):
         self.session = requests.Session()
         self.session.verify = False  # Local API uses self-signed cert
+        # Objective counts of the current game, updated incrementally
+        self.objectives = ObjectiveTracker()
+        # Name -> team index of the current roster, rebuilt when it changes
+        self.roster = None
     
     def is_game_running(self):
         """Check if a game is currently running"""
@@ -40,12 +41,7 @@ class LiveClientAPI:
     # ----------------------------
 
     def _normalize(self, name):
-        if not name:
-            return ""
-        n = str(name).lower().strip()
-        # Remove spaces, punctuation, symbols
-        n = _non_alnum.sub("", n)
-        return n
+        return normalize_name(name)
     
 
     # ----------------------------
@@ -56,27 +52,7 @@ class LiveClientAPI:
         """
         Build a *complete* set of possible identifiers for matching.
         """
-        names = set()
-
-        fields = [
-            "summonerName", "riotIdGameName", "riotId",
-            "championName", "rawChampionName"
-        ]
-
-        for f in fields:
-            v = player.get(f)
-            if v:
-                names.add(self._normalize(v))
-
-        # Combine gamename + tagline
-        rg = player.get("riotIdGameName")
-        rt = player.get("riotIdTagLine")
-        if rg and rt:
-            names.add(self._normalize(f"{rg}{rt}"))
-            names.add(self._normalize(f"{rg}-{rt}"))
-            names.add(self._normalize(f"{rg}#{rt}"))
-
-        return names
+        return player_aliases(player)
 
 
     def belongs_to_team(self, raw_name, team_set):
@@ -86,6 +62,14 @@ class LiveClientAPI:
         return self._normalize(raw_name) in team_set
 
 
+    def roster_index(self, all_players):
+        """RosterIndex of the current players, rebuilt only when the roster changes"""
+        key = roster_key(all_players)
+        if self.roster is None or self.roster.key != key:
+            self.roster = RosterIndex(all_players, key)
+        return self.roster
+
+
     # ----------------------------
     # GOLD EXTRACTION
     # ----------------------------
@@ -139,23 +123,17 @@ class LiveClientAPI:
             blue_team = [p for p in all_players if p.get("team") == "ORDER"]
             red_team  = [p for p in all_players if p.get("team") == "CHAOS"]
 
-            # Build robust name lookup tables
-            blue_names = set()
-            red_names = set()
-
-            for p in blue_team:
-                blue_names |= self.collect_player_names(p)
-
-            for p in red_team:
-                red_names |= self.collect_player_names(p)
+            # Alias -> team index, built once per roster
+            roster = self.roster_index(all_players)
 
             # ------------ DETECT ACTIVE PLAYER'S TEAM ------------
             # CRITICAL: Model always predicts from Blue's perspective
             # If active player is Red, we need to invert features!
             
             active_player_name = game_data.get("activePlayer", {}).get("summonerName", "")
-            player_is_blue = self.belongs_to_team(active_player_name, blue_names)
-            player_is_red = self.belongs_to_team(active_player_name, red_names)
+            active_sides = roster.sides_of(active_player_name)
+            player_is_blue = "ORDER" in active_sides
+            player_is_red = "CHAOS" in active_sides
             
             # Default to blue if we can't determine (shouldn't happen)
             if not player_is_blue and not player_is_red:
@@ -189,60 +167,14 @@ class LiveClientAPI:
 
 
             # ------------ OBJECTIVES via EVENTS ------------
-
-            blue_towers = red_towers = 0
-            blue_dragons = red_dragons = 0
-            blue_barons = red_barons = 0
-            blue_heralds = red_heralds = 0
-            blue_inhibs = red_inhibs = 0
-            blue_grubs = red_grubs = 0
-            blue_first_blood = red_first_blood = 0
+            # Only events newer than the last poll are folded in (live_state.py)
 
             events = game_data.get("events", {}) or {}
             event_list = events.get("Events") or events.get("events") or []
+            game_time = game_data.get("gameData", {}).get("gameTime", 0)
 
-            for e in event_list:
-                name = e.get("EventName", "")
-                killer = e.get("KillerName") or e.get("Killer") or ""
-                recipient = e.get("Recipient") or ""
-
-                is_blue = self.belongs_to_team(killer, blue_names)
-                is_red  = self.belongs_to_team(killer, red_names)
-
-                if name == "TurretKilled":
-                    if is_blue: blue_towers += 1
-                    if is_red:  red_towers += 1
-
-                elif name == "DragonKill":
-                    if is_blue: blue_dragons += 1
-                    if is_red:  red_dragons += 1
-
-                elif name == "BaronKill":
-                    if is_blue: blue_barons += 1
-                    if is_red:  red_barons += 1
-
-                elif name == "HeraldKill":
-                    if is_blue: blue_heralds += 1
-                    if is_red:  red_heralds += 1
-
-                elif name == "HordeKill":
-                    if is_blue: blue_grubs += 1
-                    if is_red:  red_grubs += 1
-
-                elif name == "InhibKilled":
-                    if is_blue: blue_inhibs += 1
-                    if is_red:  red_inhibs += 1
-
-                elif name == "FirstBlood":
-                    if self.belongs_to_team(recipient, blue_names):
-                        blue_first_blood = 1
-                    elif self.belongs_to_team(recipient, red_names):
-                        red_first_blood = 1
-
-
-            # ------------ GAME TIME ------------
+            self.objectives.update(event_list, game_time, roster.sides_of, roster.key)
 
-            game_time = game_data.get("gameData", {}).get("gameTime", 0)
 
             # ------------ FEATURE DIFFS (from active player's perspective) ------------
             
@@ -254,11 +186,11 @@ class LiveClientAPI:
             ward_diff    = blue_ward - red_ward
             level_diff   = blue_levels - red_levels
 
-            dragon_diff  = blue_dragons - red_dragons
-            baron_diff   = blue_barons - red_barons
-            tower_diff   = blue_towers - red_towers
-            herald_diff  = blue_heralds - red_heralds
-            inhib_diff   = blue_inhibs - red_inhibs
+            dragon_diff  = self.objectives.diff("dragons")
+            baron_diff   = self.objectives.diff("barons")
+            tower_diff   = self.objectives.diff("towers")
+            herald_diff  = self.objectives.diff("heralds")
+            inhib_diff   = self.objectives.diff("inhibs")
             
             # CRITICAL FIX: If player is on RED team, invert all differentials!
             # The model was trained to predict Blue's win probability
@@ -1,39 +1,72 @@
 import time
+import asyncio
 import threading
-import pandas as pd
 from datetime import datetime
-from live_client import LiveClientAPI
+from async_live_client import AsyncLiveClient
+from game_lifecycle import GameLifecycle, IN_GAME
+from poll_scheduler import PollScheduler
 from overlay import WinRateOverlay
-from interface import WinProbabilityInterface
 
 class LiveWinRatePredictor:
     """Main application coordinating API polling, prediction, and UI updates"""
     
     def __init__(self, update_interval=10):
         self.update_interval = update_interval
-        self.api_client = LiveClientAPI()
-        self.predictor = WinProbabilityInterface()
+        # Window first: it shows as soon as start() enters the Tk loop, while
+        # the model loads in the background
         self.overlay = WinRateOverlay()
+        self.overlay.update_status("Loading model...")
+        # Keep-alive connections to the live client, used from the update
+        # thread's event loop
+        self.api_client = AsyncLiveClient()
+        self.loop = None
+        # no client / loading / in game: decides what a tick fetches and how
+        # long to wait before the next one
+        self.lifecycle = GameLifecycle()
+        # In-game interval: fast after kills/objectives, slow while quiet;
+        # update_interval is the interval of a normal phase
+        self.scheduler = PollScheduler(normal_interval=update_interval)
+        self.predictor = None
+        self.model_ready = threading.Event()
         self.running = False
+        self._wake = threading.Event()  # set by stop() to cut the wait short
         self.update_count = 0
+        self.last_features = None
+    
+    def load_model(self):
+        """Import and load the prediction model (slow; runs on the update thread)"""
+        start = time.perf_counter()
+        try:
+            from interface import WinProbabilityInterface
+            # NumPy-only model (compact_forest.py): no sklearn/pandas in the runtime
+            self.predictor = WinProbabilityInterface(backend="compact")
+        except Exception as e:
+            print(f"Error loading model: {e}")
+            self.overlay.update_status(f"Model error: {str(e)[:20]}")
+            return False
+        
+        print(f"Model loaded in {time.perf_counter() - start:.1f}s")
+        self.model_ready.set()
+        self.overlay.update_status("Model ready")
+        return True
         
     def predict_from_live_data(self):
         """Fetch live data and make prediction"""
+        if not self.model_ready.is_set():
+            return None, "Loading model..."
+        
         self.update_count += 1
         timestamp = datetime.now().strftime("%H:%M:%S")
         print(f"\n[{timestamp}] Update #{self.update_count} - Attempting prediction...")
         
         try:
-            # Check if game is running
-            if not self.api_client.is_game_running():
-                print(f"[{timestamp}] No game running")
-                return None, "No game running"
-            
-            print(f"[{timestamp}] Game detected, fetching data...")
-            
-            # Fetch and extract features
-            game_data = self.api_client.get_all_game_data()
-            features = self.api_client.extract_features(game_data)
+            # Liveness probe, or players, game clock and new events fetched
+            # concurrently once in game
+            features = self.loop.run_until_complete(self.lifecycle.tick(self.api_client))
+            if features is None:
+                status = self.lifecycle.status_text()
+                print(f"[{timestamp}] {status}")
+                return None, status
             
             # Extract team info for display (not used in prediction)
             player_team = features.pop("player_team", "UNKNOWN")
@@ -50,6 +83,7 @@ class LiveWinRatePredictor:
             
             # Make prediction
             win_prob = self.predictor.predict(**features)
+            self.last_features = features
             
             # Warning for early game predictions
             game_time = features.get('game_duration', 0)
@@ -75,27 +109,49 @@ class LiveWinRatePredictor:
             return None, error_msg
     
     def update_loop(self):
-        """Background thread that polls API and updates overlay"""
-        while self.running:
-            win_prob, status = self.predict_from_live_data()
-            
-            if win_prob is not None:
-                print(f"Updating overlay with win rate: {win_prob*100:.2f}%")
-                self.overlay.update_win_rate(win_prob)
-                self.overlay.update_status(status)
-            else:
-                print(f"Updating overlay status: {status}")
-                self.overlay.update_status(status)
-            
-            # Wait for next update
-            print(f"Waiting {self.update_interval} seconds until next update...\n")
-            time.sleep(self.update_interval)
+        """Background thread that loads the model, then polls API and updates overlay"""
+        if not self.model_ready.is_set() and not self.load_model():
+            return
+        
+        self.loop = asyncio.new_event_loop()
+        try:
+            while self.running:
+                cpu_start = time.thread_time()
+                requests_before = self.api_client.requests_sent
+                win_prob, status = self.predict_from_live_data()
+                
+                if win_prob is not None:
+                    print(f"Updating overlay with win rate: {win_prob*100:.2f}%")
+                    self.overlay.update_win_rate(win_prob)
+                    self.overlay.update_status(status)
+                else:
+                    print(f"Updating overlay status: {status}")
+                    self.overlay.update_status(status)
+                
+                if win_prob is not None:
+                    self.scheduler.observe(self.api_client.api.objectives.new_events,
+                                           self.last_features.get("game_duration", 0), win_prob,
+                                           cpu_seconds=time.thread_time() - cpu_start,
+                                           requests=self.api_client.requests_sent - requests_before,
+                                           game_key=self.api_client.api.objectives.game)
+                    print(f"Polling: {self.scheduler.summary()}")
+                
+                # Wait for next update (adaptive in game, backs off while no game is running)
+                in_game = self.lifecycle.state == IN_GAME
+                delay = self.lifecycle.next_delay(self.scheduler.next_interval() if in_game else self.update_interval)
+                mode = f" ({self.scheduler.mode()})" if in_game else ""
+                print(f"Waiting {delay:.1f} seconds until next update{mode}...\n")
+                self._wake.wait(delay)
+        finally:
+            # Release the keep-alive connections and the loop
+            self.loop.run_until_complete(self.api_client.close())
+            self.loop.close()
     
     def start(self):
         """Start the predictor and overlay"""
         self.running = True
         
-        # Start update thread
+        # Start update thread (loads the model first)
         self.update_thread = threading.Thread(target=self.update_loop, daemon=True)
         self.update_thread.start()
         
@@ -105,6 +161,11 @@ class LiveWinRatePredictor:
     def stop(self):
         """Stop the predictor"""
         self.running = False
+        self._wake.set()
+        # Let update_loop finish its tick and close its connections
+        thread = getattr(self, 'update_thread', None)
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
         self.overlay.destroy()
 
 
@@ -112,7 +173,7 @@ if __name__ == "__main__":
     print("Starting Live Win Rate Predictor...")
     print("Make sure you have a League game running!")
     print("The overlay will appear in the top-right corner.")
-    print("Update interval: 10 seconds")
+    print("Update interval: 2-20 seconds (faster around fights and objectives)")
     print("Press Ctrl+C to exit.\n")
     
     predictor = LiveWinRatePredictor(update_interval=10)
@@ -0,0 +1,199 @@
+"""
+Per-game state that LiveClientAPI keeps between polls.
+
+The live client returns the whole event log of the game on every poll.
+ObjectiveTracker remembers the last EventID it has seen and folds only the
+new events into running objective counters, so a tick late in a 40-minute
+game costs the same as one in the first minute.
+
+RosterIndex maps every normalized alias of every player to their side. It
+is built once per roster, and raw names from events are resolved through a
+memo, so attributing an event to a team is a single dict lookup.
+
+Needs no third-party packages, so it is also usable (and testable) without
+requests installed.
+"""
+import re
+
+# Removes everything except letters and numbers
+_non_alnum = re.compile(r"[^a-z0-9]+")
+
+SIDES = ("ORDER", "CHAOS")
+
+# Event name -> objective counter
+OBJECTIVE_EVENTS = {
+    "TurretKilled": "towers",
+    "DragonKill": "dragons",
+    "BaronKill": "barons",
+    "HeraldKill": "heralds",
+    "HordeKill": "grubs",
+    "InhibKilled": "inhibs",
+}
+OBJECTIVES = tuple(OBJECTIVE_EVENTS.values())
+
+
+def roster_key(all_players):
+    """Identity of a game's roster: (team, summoner, champion) of every player"""
+    return tuple(sorted(
+        (p.get("team") or "", p.get("riotId") or p.get("summonerName") or "", p.get("championName") or "")
+        for p in all_players
+    ))
+
+
+# Player fields that events may use to name a player
+ALIAS_FIELDS = ("summonerName", "riotIdGameName", "riotId", "championName", "rawChampionName")
+
+
+def normalize_name(name):
+    """Lowercase, without spaces, punctuation and symbols"""
+    if not name:
+        return ""
+    return _non_alnum.sub("", str(name).lower().strip())
+
+
+def player_aliases(player):
+    """Every normalized identifier a player can appear under in events"""
+    names = set()
+    for field in ALIAS_FIELDS:
+        v = player.get(field)
+        if v:
+            names.add(normalize_name(v))
+
+    # Combine gamename + tagline
+    rg = player.get("riotIdGameName")
+    rt = player.get("riotIdTagLine")
+    if rg and rt:
+        names.add(normalize_name(f"{rg}{rt}"))
+        names.add(normalize_name(f"{rg}-{rt}"))
+        names.add(normalize_name(f"{rg}#{rt}"))
+
+    names.discard("")
+    return names
+
+
+class RosterIndex:
+    """
+    Normalized alias -> sides of one game's roster.
+
+    An alias shared by both teams (e.g. the same champion on both sides in
+    One for All) maps to both sides, like a lookup in each team's name set.
+
+    Args:
+        all_players: allPlayers of the live client data
+        key: roster_key(all_players), if already computed
+    """
+
+    def __init__(self, all_players, key=None):
+        self.key = roster_key(all_players) if key is None else key
+        self.aliases = {}
+        for side in SIDES:
+            for p in all_players:
+                if p.get("team") != side:
+                    continue
+                for alias in player_aliases(p):
+                    sides = self.aliases.get(alias, ())
+                    if side not in sides:
+                        self.aliases[alias] = sides + (side,)
+        # Raw name -> sides, so each distinct raw string is normalized once
+        self._resolved = {}
+
+    def sides_of(self, raw_name):
+        """Sides a raw player name from the API belongs to (empty tuple if none)"""
+        try:
+            return self._resolved[raw_name]
+        except KeyError:
+            sides = self.aliases.get(normalize_name(raw_name), ()) if raw_name else ()
+            self._resolved[raw_name] = sides
+            return sides
+
+
+def _event_id(event):
+    return event.get("EventID", -1)
+
+
+class ObjectiveTracker:
+    """
+    Running objective counts of one game, updated from new events only.
+
+    A new game is detected (and the counters reset) when the roster changes,
+    the game clock goes backwards or the event log restarts below the last
+    EventID seen.
+
+    Attributes:
+        counts: {side: {objective: count}} for ORDER and CHAOS
+        first_blood: side of the first blood recipient, or None
+        last_event_id: highest EventID folded in (-1 before the first event)
+        new_events: the events folded in by the last update (poll_scheduler.py)
+    """
+
+    def __init__(self):
+        self.game = None
+        self.reset()
+
+    def reset(self, game=None):
+        self.game = game
+        self.counts = {side: dict.fromkeys(OBJECTIVES, 0) for side in SIDES}
+        self.first_blood = None
+        self.last_event_id = -1
+        self.last_game_time = 0.0
+        self.new_events = []
+
+    def is_new_game(self, game, game_time):
+        """True if (game, game_time) is not the game being tracked"""
+        return game != self.game or game_time < self.last_game_time
+
+    def update(self, event_list, game_time, sides_of, game=None):
+        """
+        Fold the events after last_event_id into the counters.
+
+        Args:
+            event_list: the game's events in EventID order; the full log or
+                only its newest part (e.g. /eventdata?eventID=N)
+            game_time: current game clock in seconds
+            sides_of: raw player name -> sides it belongs to (iterable of
+                "ORDER"/"CHAOS", empty if not a player)
+            game: identity of the current game (see roster_key)
+
+        Returns:
+            number of events folded in
+        """
+        if (self.is_new_game(game, game_time)
+                or (event_list and _event_id(event_list[-1]) < self.last_event_id)):
+            self.reset(game)
+        self.last_game_time = game_time
+
+        if event_list and "EventID" not in event_list[-1]:
+            # No ids to resume from: recount the whole log
+            self.reset(game)
+            self.last_game_time = game_time
+            new_events = event_list
+        else:
+            # Scan back from the newest event: a tick costs the new events
+            # only, however long the log is (bisect's key= needs Python 3.10)
+            start = len(event_list)
+            while start > 0 and _event_id(event_list[start - 1]) > self.last_event_id:
+                start -= 1
+            new_events = event_list[start:]
+
+        for e in new_events:
+            self._fold(e, sides_of)
+        self.new_events = new_events
+        if new_events:
+            self.last_event_id = max(self.last_event_id, _event_id(new_events[-1]))
+        return len(new_events)
+
+    def _fold(self, e, sides_of):
+        name = e.get("EventName", "")
+        objective = OBJECTIVE_EVENTS.get(name)
+        if objective is not None:
+            killer = e.get("KillerName") or e.get("Killer") or ""
+            for side in sides_of(killer):
+                self.counts[side][objective] += 1
+        elif name == "FirstBlood" and self.first_blood is None:
+            sides = tuple(sides_of(e.get("Recipient") or ""))
+            if sides:
+                self.first_blood = sides[0]
+
+    def diff(self, objective):
+        """ORDER minus CHAOS count of one objective"""
+        return self.counts["ORDER"][objective] - self.counts["CHAOS"][objective]
@@ -0,0 +1,244 @@
+"""
+Precomputed win-probability lookup surface.
+
+The trained model plus calibration is evaluated once on a regular grid over
+the dominant features (all other features 0), quantized to uint16 and stored
+as a compressed n-dimensional table. At runtime a prediction is a multilinear
+interpolation between the 2^d surrounding grid points: constant time,
+whatever the size of the forest.
+
+Values outside the grid are clamped to its edge. error_report() measures how
+far the surface is from the real model, both inside the grid box and on
+realistic game states (where the non-grid features are not 0).
+
+Usage:
+    python lookup_surface.py     # build data/winprob_surface.npz and print the error report
+"""
+import os
+import json
+from bisect import bisect_right
+import numpy as np
+
+SURFACE_FORMAT_VERSION = 1
+QUANT_LEVELS = 65535
+CHUNK_ROWS = 4096
+
+# Feature -> grid points, for the base features the forest relies on most
+# (see analyze_feature_importance.py). The forest splits count features
+# between whole numbers, so those axes step by 1: interpolating across such
+# a split would blur a step the model really makes.
+DEFAULT_AXES = {
+    'gold_diff': np.arange(-12000, 12001, 1000),
+    'kill_diff': np.arange(-12, 13),
+    'tower_diff': np.arange(-8, 9),
+    'game_duration': np.arange(0, 2701, 300),
+    'dragon_diff': np.arange(-4, 5),
+    'baron_diff': np.arange(-1, 2),
+}
+
+
+class LookupSurface:
+    """
+    Quantized probability table over a grid of some features.
+
+    Args:
+        feature_names: all model features, in the order of the vectors passed in
+        axis_names: the gridded features
+        axes: grid points of each gridded feature (increasing, at least 2)
+        table: uint16 array of shape [len(axis) for axis in axes]
+    """
+
+    def __init__(self, feature_names, axis_names, axes, table):
+        self.feature_names = list(feature_names)
+        self.axis_names = list(axis_names)
+        self.axes = [np.asarray(a, dtype=np.float64) for a in axes]
+        self.table = np.asarray(table, dtype=np.uint16)
+        if self.table.shape != tuple(len(a) for a in self.axes):
+            raise ValueError("Table shape does not match the axes")
+        if any(len(a) < 2 for a in self.axes):
+            raise ValueError("Every axis needs at least two grid points")
+
+        self._columns = np.array([self.feature_names.index(name) for name in self.axis_names])
+        self._flat = self.table.ravel()
+        strides = np.cumprod([1] + [len(a) for a in self.axes[::-1]])[:-1][::-1]
+        self._strides = strides.astype(np.intp)
+        # All 2^d corners of a grid cell, as 0/1 offsets per axis
+        d = len(self.axes)
+        self._corners = ((np.arange(2 ** d)[:, np.newaxis] >> np.arange(d)[::-1]) & 1).astype(np.intp)
+        # Single-row lookups locate the cell in plain Python (d bisects are
+        # cheaper than the array setup) and gather all corners in one take
+        self._corner_offsets = self._corners @ self._strides
+        self._axis_lists = [a.tolist() for a in self.axes]
+        self._stride_list = self._strides.tolist()
+        self._column_list = self._columns.tolist()
+
+    @classmethod
+    def build(cls, interface, axes=None):
+        """Evaluate interface.predict_batch (model + calibration) on every grid point"""
+        features = interface.features
+        axes = dict(DEFAULT_AXES if axes is None else axes)
+        names = list(axes)
+        mesh = np.meshgrid(*[np.asarray(axes[n], dtype=np.float64) for n in names], indexing='ij')
+        base = np.zeros((mesh[0].size, len(features)))
+        for name, values in zip(names, mesh):
+            base[:, features.index(name)] = values.ravel()
+
+        probs = interface.predict_batch(base)
+        table = np.round(np.clip(probs, 0.0, 1.0) * QUANT_LEVELS).astype(np.uint16)
+        return cls(features, names, [axes[n] for n in names], table.reshape(mesh[0].shape))
+
+    def _interpolate(self, values):
+        """values: (n, d) gridded feature values -> (n,) probabilities"""
+        lower, weight = [], []
+        for k, axis in enumerate(self.axes):
+            v = np.clip(values[:, k], axis[0], axis[-1])
+            i = np.clip(np.searchsorted(axis, v, side='right') - 1, 0, len(axis) - 2)
+            lower.append(i)
+            weight.append((v - axis[i]) / (axis[i + 1] - axis[i]))
+        lower = np.stack(lower, axis=1)             # (n, d)
+        weight = np.stack(weight, axis=1)           # (n, d)
+
+        corners = lower[:, np.newaxis, :] + self._corners          # (n, 2^d, d)
+        corner_weight = np.where(self._corners, weight[:, np.newaxis, :],
+                                 1.0 - weight[:, np.newaxis, :]).prod(axis=2)
+        cell_values = self._flat.take(corners @ self._strides)     # (n, 2^d)
+        # Corner weights sum to 1 only up to rounding
+        return np.minimum((cell_values * corner_weight).sum(axis=1) / QUANT_LEVELS, 1.0)
+
+    def lookup_batch(self, X):
+        """Probability for each row of X (n, len(feature_names))"""
+        X = np.asarray(X, dtype=np.float64)
+        out = np.empty(len(X))
+        for start in range(0, len(X), CHUNK_ROWS):
+            out[start:start + CHUNK_ROWS] = self._interpolate(X[start:start + CHUNK_ROWS, self._columns])
+        return out
+
+    def lookup_one(self, x):
+        """Probability for one feature vector"""
+        values = x.tolist() if hasattr(x, 'tolist') else list(x)
+        cell = 0
+        weight = []
+        for column, axis, stride in zip(self._column_list, self._axis_lists, self._stride_list):
+            v = min(max(float(values[column]), axis[0]), axis[-1])
+            i = min(bisect_right(axis, v) - 1, len(axis) - 2)
+            cell += i * stride
+            weight.append((v - axis[i]) / (axis[i + 1] - axis[i]))
+        weight = np.array(weight)
+        corner_weight = np.where(self._corners, weight, 1.0 - weight).prod(axis=1)
+        return min(float(self._flat.take(cell + self._corner_offsets) @ corner_weight) / QUANT_LEVELS, 1.0)
+
+    @property
+    def nbytes(self):
+        return self.table.nbytes
+
+    def save(self, path):
+        meta = {'version': SURFACE_FORMAT_VERSION, 'feature_names': self.feature_names,
+                'axis_names': self.axis_names}
+        np.savez_compressed(path, meta=json.dumps(meta), table=self.table,
+                            **{f"axis{k}": a for k, a in enumerate(self.axes)})
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta['version'] != SURFACE_FORMAT_VERSION:
+                raise ValueError(f"Unsupported surface version in {path}")
+            axes = [data[f"axis{k}"] for k in range(len(meta['axis_names']))]
+            return cls(meta['feature_names'], meta['axis_names'], axes, data['table'])
+
+
+class LookupSurfaceModel:
+    """
+    Interface backend for a LookupSurface.
+
+    The surface already includes calibration, so `calibrated` tells
+    WinProbabilityInterface to use its values as they are.
+    """
+    calibrated = True
+
+    def __init__(self, model_path):
+        self.model_path = model_path
+        self.model = None
+
+    def load(self):
+        if os.path.exists(self.model_path):
+            self.model = LookupSurface.load(self.model_path)
+            return True
+        return False
+
+    @property
+    def feature_names(self):
+        return self.model.feature_names
+
+    def predict_rows(self, X):
+        if self.model is None:
+            raise ValueError("Lookup surface not loaded.")
+        return self.model.lookup_batch(X)
+
+    def predict_row(self, x):
+        if self.model is None:
+            raise ValueError("Lookup surface not loaded.")
+        return self.model.lookup_one(x)
+
+
+def _error_stats(errors):
+    return {
+        'mean_abs_error': float(errors.mean()),
+        'p99_abs_error': float(np.percentile(errors, 99)),
+        'max_abs_error': float(errors.max()),
+    }
+
+
+def error_report(surface, interface, X=None, n_samples=20000, seed=0):
+    """
+    Error of the surface against interface.predict_batch (model + calibration).
+
+    Args:
+        X: optional realistic game states (n, features), e.g. from load_features
+        n_samples: random game states drawn uniformly inside the grid box
+            (whole numbers, like the live client reports; other features 0)
+            to measure the interpolation error
+    Returns:
+        dict with 'in_grid' stats, and 'realistic' stats plus the fraction of
+        rows outside the grid box when X is given
+    """
+    rng = np.random.default_rng(seed)
+    points = np.zeros((n_samples, len(surface.feature_names)))
+    for column, axis in zip(surface._columns, surface.axes):
+        points[:, column] = rng.integers(int(np.ceil(axis[0])), int(np.floor(axis[-1])) + 1, n_samples)
+    points = interface.feature_block(points)
+    report = {'in_grid': _error_stats(np.abs(surface.lookup_batch(points) - interface.predict_batch(points)))}
+
+    if X is not None:
+        X = interface.feature_block(np.asarray(X, dtype=np.float64))
+        errors = np.abs(surface.lookup_batch(X) - interface.predict_batch(X))
+        realistic = _error_stats(errors)
+        gridded = X[:, surface._columns]
+        outside = np.zeros(len(X), dtype=bool)
+        for k, axis in enumerate(surface.axes):
+            outside |= (gridded[:, k] < axis[0]) | (gridded[:, k] > axis[-1])
+        realistic['outside_grid'] = float(outside.mean())
+        report['realistic'] = realistic
+    return report
+
+
+if __name__ == "__main__":
+    import time
+    from interface import WinProbabilityInterface, SURFACE_PATH
+    from feature_store import load_features
+    from surrogate import augment_game_states, print_report
+
+    interface = WinProbabilityInterface()
+    start = time.perf_counter()
+    surface = LookupSurface.build(interface)
+    print(f"Built {surface.table.size:,}-point surface over {', '.join(surface.axis_names)} "
+          f"in {time.perf_counter() - start:.1f}s")
+    surface.save(SURFACE_PATH)
+    print(f"Saved to {SURFACE_PATH} ({os.path.getsize(SURFACE_PATH) / 1024:.1f} KB, "
+          f"{surface.nbytes / 1024:.1f} KB in memory)")
+
+    print("\nLoading data for the error report...")
+    X, _ = load_features("data")
+    X = augment_game_states(X.to_numpy(dtype=np.float64), list(X.columns), copies=1)
+    print("\nError against model + calibration:")
+    print_report(error_report(surface, interface, X), "  ")
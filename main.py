@@ -1,49 +1,74 @@
-import os
-from interface import WinProbabilityInterface
-from data_loader import DataLoader
-from feature_engineer import DefaultFeatureEngineer
-from model import RandomForestWinModel, MODEL_PATH
-
-def main():
-    # 1. Train Model
-    print("Loading data...")
-    loader = DataLoader("data")
-    match_stats, team_stats, match_tbl, summoner_match = loader.load_match_stats()
-    
-    print("Engineering features...")
-    engineer = DefaultFeatureEngineer()
-    X, y = engineer.fit_transform(match_stats, team_stats, summoner_match, match_tbl)
-    
-    print("Training and Evaluating Model...")
-    model = RandomForestWinModel(MODEL_PATH)
-    model.train(X, y)
-    model.save()
-    
-    # 2. Test Predictions
-    print("\n--- Prediction Examples ---")
-    interface_instance = WinProbabilityInterface()
-    
-    # Realistic mid-game scenario: +1000 gold advantage
-    # Typically means: slight kill lead, small CS lead, maybe 1 tower
-    pred_plus = interface_instance.predict(
-        kill_diff=2, assist_diff=3, gold_diff=1000, cs_diff=15,
-        dragon_diff=0, baron_diff=0, tower_diff=1, game_duration=1200
-    )
-    print(f"Mid-game +1000 gold advantage: {pred_plus*100:.2f}%")
-    
-    # Realistic mid-game scenario: -1000 gold disadvantage  
-    pred_minus = interface_instance.predict(
-        kill_diff=-2, assist_diff=-3, gold_diff=-1000, cs_diff=-15,
-        dragon_diff=0, baron_diff=0, tower_diff=-1, game_duration=1200
-    )
-    print(f"Mid-game -1000 gold disadvantage: {pred_minus*100:.2f}%")
-    
-    # Even game
-    pred_even = interface_instance.predict(
-        kill_diff=0, assist_diff=0, gold_diff=0, cs_diff=0,
-        dragon_diff=0, baron_diff=0, tower_diff=0, game_duration=1200
-    )
-    print(f"Even game: {pred_even*100:.2f}%")
-
-if __name__ == "__main__":
-    main()
+import os
+import pandas as pd
+from interface import WinProbabilityInterface, SURROGATE_PATH, SURFACE_PATH
+from feature_store import load_features
+from model import RandomForestWinModel, MODEL_PATH, COMPACT_MODEL_PATH
+from compact_forest import export
+from model_schema import build_schema, training_data_info
+from surrogate import distill, print_report
+from lookup_surface import LookupSurface, error_report
+
+def main(build_surrogate=False, build_surface=False):
+    """
+    Train the forest and export its compact copy.
+
+    Args:
+        build_surrogate: also distill the surrogate (python surrogate.py
+            does the same from a saved model)
+        build_surface: also precompute the lookup surface, ~2.9M model
+            evaluations (python lookup_surface.py does the same)
+    """
+    # 1. Train Model
+    print("Loading data...")
+    X, y = load_features("data")
+    
+    print("Training and Evaluating Model...")
+    model = RandomForestWinModel(MODEL_PATH)
+    model.train(X, y)
+    model.save()
+    # Inference-only copy of the forest (WinProbabilityInterface(backend="compact")),
+    # carrying its feature schema and the fingerprint of the training data
+    export(model.model, COMPACT_MODEL_PATH,
+           schema=build_schema(X.columns, X.dtypes, model.calibration, training_data_info(X, "data")))
+    
+    # 1b. Distill the lightweight surrogate (WinProbabilityInterface(backend="surrogate"))
+    if build_surrogate:
+        print("\nDistilling surrogate model...")
+        surrogate, report = distill(model, X, y)
+        surrogate.save(SURROGATE_PATH)
+        print_report(report, "  ")
+    
+    # 1c. Precompute the calibrated lookup surface (WinProbabilityInterface(backend="surface"))
+    interface_instance = WinProbabilityInterface()
+    if build_surface:
+        print("\nBuilding lookup surface...")
+        surface = LookupSurface.build(interface_instance)
+        surface.save(SURFACE_PATH)
+        print_report(error_report(surface, interface_instance, X), "  ")
+    
+    # 2. Test Predictions
+    print("\n--- Prediction Examples ---")
+    
+    # Realistic mid-game scenarios, scored in one batch:
+    # +1000 gold advantage typically means: slight kill lead, small CS lead, maybe 1 tower
+    scenarios = pd.DataFrame([
+        dict(kill_diff=2, assist_diff=3, gold_diff=1000, cs_diff=15,
+             dragon_diff=0, baron_diff=0, tower_diff=1, game_duration=1200),
+        dict(kill_diff=-2, assist_diff=-3, gold_diff=-1000, cs_diff=-15,
+             dragon_diff=0, baron_diff=0, tower_diff=-1, game_duration=1200),
+        dict(kill_diff=0, assist_diff=0, gold_diff=0, cs_diff=0,
+             dragon_diff=0, baron_diff=0, tower_diff=0, game_duration=1200),
+    ], index=["Mid-game +1000 gold advantage", "Mid-game -1000 gold disadvantage", "Even game"])
+    
+    for name, pred in zip(scenarios.index, interface_instance.predict_batch(scenarios)):
+        print(f"{name}: {pred*100:.2f}%")
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Train the win probability model")
+    parser.add_argument("--surrogate", action="store_true",
+                        help=f"also distill the surrogate model ({SURROGATE_PATH})")
+    parser.add_argument("--surface", action="store_true",
+                        help=f"also precompute the lookup surface ({SURFACE_PATH})")
+    args = parser.parse_args()
+    main(build_surrogate=args.surrogate, build_surface=args.surface)
@@ -1,87 +1,185 @@
-import os
-import joblib
-import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, classification_report
-
-MODEL_PATH = "data/winprob_model.joblib"
-
-class ModelBase:
-    """Abstract base class for models"""
-    def train(self, X, y):
-        raise NotImplementedError
-    def predict(self, X):
-        raise NotImplementedError
-
-class RandomForestWinModel(ModelBase):
-    """Random Forest model - naturally handles feature interactions and game state"""
-    
-    def __init__(self, model_path):
-        self.model_path = model_path
-        self.model = None
-
-    def train(self, X, y):
-        # Split data
-        X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=42)
-
-        # Train Random Forest
-        # Random Forest naturally handles:
-        # - Feature interactions (e.g., tower_diff importance changes based on game time)
-        # - Non-linear relationships
-        # - Different feature importance at different game states
-        # - Automatically ignores features when they're not informative (e.g., tower_diff=0 early game)
-        self.model = RandomForestClassifier(
-            n_estimators=50,
-            max_depth=10,
-            min_samples_split=20,
-            min_samples_leaf=10,
-            random_state=42,
-            class_weight='balanced',
-            n_jobs=-1
-        )
-        self.model.fit(X_train, y_train)
-        
-        # Evaluate
-        self.evaluate(X_val, y_val)
-        
-        # Print feature importances
-        feature_names = X.columns if hasattr(X, 'columns') else [f'feature_{i}' for i in range(X.shape[1])]
-        importances = pd.DataFrame({
-            'feature': feature_names,
-            'importance': self.model.feature_importances_
-        }).sort_values('importance', ascending=False)
-        
-        print("\nFeature Importances:")
-        for _, row in importances.iterrows():
-            print(f"  {row['feature']:20s}: {row['importance']:.4f}")
-
-    def evaluate(self, X, y):
-        if self.model is None:
-            print("Model not trained.")
-            return
-        
-        y_pred = self.model.predict(X)
-        acc = accuracy_score(y, y_pred)
-        print(f"Model Accuracy: {acc:.4f}")
-        print("Classification Report:")
-        print(classification_report(y, y_pred))
-        
-        return acc
-
-    def predict(self, X):
-        if self.model is None:
-            raise ValueError("Model not loaded or trained.")
-        
-        # No scaling needed for Random Forest
-        return self.model.predict_proba(X)[:, 1]
-
-    def save(self):
-        os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
-        joblib.dump(self.model, self.model_path)
-
-    def load(self):
-        if os.path.exists(self.model_path):
-            self.model = joblib.load(self.model_path)
-            return True
-        return False
+import os
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import accuracy_score, classification_report
+from flat_forest import FlatForest
+from compact_forest import load_compact, COMPACT_MODEL_PATH  # inference-only export of the same forest
+from calibration import fit_for_model
+
+MODEL_PATH = "data/winprob_model.joblib"
+
+class ModelBase:
+    """Abstract base class for models"""
+    def train(self, X, y):
+        raise NotImplementedError
+    def predict(self, X):
+        raise NotImplementedError
+
+class RandomForestWinModel(ModelBase):
+    """Random Forest model - naturally handles feature interactions and game state"""
+    
+    def __init__(self, model_path):
+        self.model_path = model_path
+        self.model = None
+        self._flat = None
+        self._feature_names = None
+        self._schema = None
+
+        # Optional early exit for predict_row (see FlatForest.predict_one_anytime):
+        # stop once the raw probability is known to within this tolerance
+        self.anytime_tolerance = None
+        self.anytime_batch_size = 16
+        self.anytime_stats = {'predictions': 0, 'trees_used': 0, 'trees_total': 0, 'last_trees_used': 0}
+
+    def train(self, X, y):
+        # Split data
+        X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=42)
+
+        # Train Random Forest
+        # Random Forest naturally handles:
+        # - Feature interactions (e.g., tower_diff importance changes based on game time)
+        # - Non-linear relationships
+        # - Different feature importance at different game states
+        # - Automatically ignores features when they're not informative (e.g., tower_diff=0 early game)
+        self.model = RandomForestClassifier(
+            n_estimators=50,
+            max_depth=10,
+            min_samples_split=20,
+            min_samples_leaf=10,
+            random_state=42,
+            class_weight='balanced',
+            n_jobs=-1
+        )
+        self.model.fit(X_train, y_train)
+        self._flat = None
+        
+        # Evaluate
+        self.evaluate(X_val, y_val)
+        
+        # Fit the calibration table on the same held-out games (calibration.py).
+        # Kept on the fitted estimator so it is saved with it.
+        if hasattr(X_val, 'columns'):
+            self.model.calibration_ = fit_for_model(self, X_val, y_val)
+            if self.model.calibration_['kind'] == 'table':
+                print(f"Calibration fitted: even-game baseline {self.model.calibration_['baseline_raw']:.3f}")
+        
+        # Print feature importances
+        feature_names = X.columns if hasattr(X, 'columns') else [f'feature_{i}' for i in range(X.shape[1])]
+        importances = pd.DataFrame({
+            'feature': feature_names,
+            'importance': self.model.feature_importances_
+        }).sort_values('importance', ascending=False)
+        
+        print("\nFeature Importances:")
+        for _, row in importances.iterrows():
+            print(f"  {row['feature']:20s}: {row['importance']:.4f}")
+
+    def evaluate(self, X, y):
+        if self.model is None:
+            print("Model not trained.")
+            return
+        
+        y_pred = self.model.predict(X)
+        acc = accuracy_score(y, y_pred)
+        print(f"Model Accuracy: {acc:.4f}")
+        print("Classification Report:")
+        print(classification_report(y, y_pred))
+        
+        return acc
+
+    def predict(self, X):
+        if self.model is None:
+            if self._flat is not None:
+                # Compact artifact: no sklearn model behind it
+                return self._flat.predict_proba(np.asarray(X, dtype=np.float32))
+            raise ValueError("Model not loaded or trained.")
+        
+        # No scaling needed for Random Forest
+        return self.model.predict_proba(X)[:, 1]
+
+    @property
+    def feature_names(self):
+        """Column order the model was trained on (None if unknown)"""
+        if self.model is not None and hasattr(self.model, 'feature_names_in_'):
+            return list(self.model.feature_names_in_)
+        return self._feature_names
+
+    @property
+    def calibration(self):
+        """Fitted calibration table (dict) saved with the model, or None"""
+        if self.model is not None:
+            return getattr(self.model, 'calibration_', None)
+        return self._schema['calibration'] if self._schema else None
+
+    @property
+    def schema(self):
+        """Feature schema stored with a compact artifact (None for joblib models)"""
+        return self._schema
+
+    def _flat_forest(self):
+        if self._flat is None:
+            if self.model is None:
+                raise ValueError("Model not loaded or trained.")
+            self._flat = FlatForest.from_sklearn(self.model)
+        return self._flat
+
+    def predict_rows(self, X):
+        """
+        Blue win probabilities for a (n, features) array in model column order.
+
+        Same result as predict() (within float rounding: the forest is
+        fitted with n_jobs=-1, see flat_forest.py), evaluated on the flattened
+        forest (flat_forest.py): no DataFrame, no input validation and no
+        joblib dispatch, which dominate predict_proba's latency for small inputs.
+        """
+        return self._flat_forest().predict_proba(X)
+
+    def predict_row(self, x):
+        """
+        Blue win probability for one float32 feature vector (see predict_rows).
+
+        With anytime_tolerance set, trees are evaluated in batches and
+        evaluation stops early; anytime_stats counts the trees actually used.
+        """
+        forest = self._flat_forest()
+        if self.anytime_tolerance is None:
+            return forest.predict_one(x)
+
+        proba, used = forest.predict_one_anytime(x, self.anytime_tolerance, self.anytime_batch_size)
+        stats = self.anytime_stats
+        stats['predictions'] += 1
+        stats['trees_used'] += used
+        stats['trees_total'] += forest.n_trees
+        stats['last_trees_used'] = used
+        return proba
+
+    def anytime_summary(self):
+        """Average trees used per anytime prediction, as text"""
+        stats = self.anytime_stats
+        if stats['predictions'] == 0:
+            return "No anytime predictions yet"
+        return (f"{stats['predictions']} predictions, "
+                f"{stats['trees_used'] / stats['predictions']:.1f} trees on average "
+                f"({stats['trees_used'] / stats['trees_total']:.0%} of the forest)")
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
+        joblib.dump(self.model, self.model_path)
+
+    def load(self):
+        """Load the joblib model, or a compact .npz artifact (prediction only)"""
+        if os.path.exists(self.model_path):
+            if self.model_path.endswith(".npz"):
+                self.model = None
+                self._flat, meta = load_compact(self.model_path)
+                self._feature_names = meta['feature_names']
+                self._schema = meta.get('schema')
+            else:
+                self.model = joblib.load(self.model_path)
+                self._flat = None
+                self._schema = None
+            return True
+        return False
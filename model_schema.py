@@ -0,0 +1,166 @@
+"""
+Feature schema stored with a model artifact.
+
+A model is only usable with the exact feature vector it was trained on. The
+schema records, next to the trees:
+
+    features       column order and training dtypes
+    derived        the derived-feature registry (derived_features.py) in force
+                   at training time
+    calibration    the calibration applied to the raw probability: a fitted
+                   table (calibration.py) or the hand-tuned power curve
+    training_data  fingerprint of the data the model was trained on
+
+FeatureSchema validates a schema once and precomputes everything a prediction
+needs (base feature positions, compiled derived features), so filling the
+feature vector is the only per-call work.
+"""
+import numpy as np
+from derived_features import DERIVED_FEATURES, DerivedFeatures
+from calibration import CalibrationTable
+
+SCHEMA_VERSION = 1
+# The forest compares inputs as float32 (see flat_forest.py)
+MODEL_INPUT_DTYPE = 'float32'
+
+# The hand-tuned two-sided power curve of WinProbabilityInterface._calibrate,
+# used by models trained before calibration was fitted
+DEFAULT_CALIBRATION = {
+    'kind': 'piecewise_power',
+    'baseline_raw': 0.458,   # raw probability mapped to 50%
+    'below_power': 0.8,      # curve for [0, baseline] -> [0, 0.5]
+    'above_power': 0.5,      # curve for [baseline, 1] -> [0.5, 1]
+    'floor': 0.01,           # raw <= floor -> 0
+    'ceiling': 0.99,         # raw >= ceiling -> 1
+}
+
+
+def build_schema(feature_names, dtypes=None, calibration=None, training_data=None):
+    """
+    Schema for a model trained on feature_names.
+
+    Args:
+        dtypes: column -> dtype of the training matrix (e.g. X.dtypes); float64 if unknown
+        calibration: calibration parameters (default DEFAULT_CALIBRATION)
+        training_data: dict describing the training data (see training_data_info)
+    """
+    feature_names = [str(name) for name in feature_names]
+    return {
+        'version': SCHEMA_VERSION,
+        'features': [{'name': name, 'dtype': str(dtypes[name]) if dtypes is not None else 'float64'}
+                     for name in feature_names],
+        'input_dtype': MODEL_INPUT_DTYPE,
+        'derived': {name: [list(term) for term in terms]
+                    for name, terms in DERIVED_FEATURES.items() if name in feature_names},
+        'calibration': dict(DEFAULT_CALIBRATION if calibration is None else calibration),
+        'training_data': training_data,
+    }
+
+
+def _training_data(data_fingerprint, rank_ids, rows):
+    return {
+        'data_fingerprint': data_fingerprint,
+        'rank_ids': sorted(int(r) for r in rank_ids) if rank_ids is not None else None,
+        'rows': rows,
+    }
+
+
+def training_data_info(X, data_dir="data", rank_ids=None):
+    """Fingerprint of the training data: source tables, rank filter and row count"""
+    from data_loader import DataLoader
+    return _training_data(DataLoader(data_dir).fingerprint(), rank_ids, int(len(X)))
+
+
+def schema_for_export(model, data_dir="data", rank_ids=None, engineer=None):
+    """
+    Schema with the training-data fingerprint for a model exported after the
+    fact (compact_forest.py __main__, build_exe.export_runtime_model).
+
+    Nothing is engineered: the fingerprint is DataLoader.fingerprint() of
+    data_dir with the rank filter the model was trained with, and the dtypes
+    are the engineer's OUTPUT_DTYPES. The row count comes from the feature
+    store when that matrix is cached, and is None otherwise.
+
+    Returns None, after saying so, when the source tables cannot be read or
+    the engineer's columns differ from the model's; the export then carries
+    no training-data fingerprint.
+
+    Args:
+        model: loaded RandomForestWinModel
+        rank_ids: RankFk values the model was trained on (None = all ranks)
+        engineer: engineer the model's features came from (default DefaultFeatureEngineer)
+    """
+    from data_loader import DataLoader
+    from feature_store import FeatureStore, feature_key, default_store_dir
+    if engineer is None:
+        from feature_engineer import DefaultFeatureEngineer
+        engineer = DefaultFeatureEngineer()
+
+    dtypes = engineer.OUTPUT_DTYPES
+    if model.feature_names is not None and list(dtypes) != list(model.feature_names):
+        print("Engineered columns differ from the model's: the export carries no training-data fingerprint")
+        return None
+    try:
+        fingerprint = DataLoader(data_dir).fingerprint()
+    except OSError as e:
+        print(f"Training data not available ({e}): the export carries no training-data fingerprint")
+        return None
+    rows = FeatureStore(default_store_dir(data_dir)).rows(feature_key(fingerprint, rank_ids, engineer))
+    return build_schema(list(dtypes), dtypes, model.calibration, _training_data(fingerprint, rank_ids, rows))
+
+
+def _check_calibration(calibration):
+    kind = calibration.get('kind')
+    if kind == 'piecewise_power':
+        values = [calibration[key] for key in ('baseline_raw', 'below_power', 'above_power', 'floor', 'ceiling')]
+        if not all(isinstance(v, (int, float)) for v in values):
+            raise ValueError("Calibration parameters must be numbers")
+        if not (0.0 < calibration['floor'] < calibration['baseline_raw'] < calibration['ceiling'] < 1.0):
+            raise ValueError("Calibration needs 0 < floor < baseline_raw < ceiling < 1")
+        if calibration['below_power'] <= 0 or calibration['above_power'] <= 0:
+            raise ValueError("Calibration powers must be positive")
+    elif kind == 'table':
+        CalibrationTable.from_dict(calibration)
+    else:
+        raise ValueError(f"Unknown calibration kind: {kind!r}")
+    return dict(calibration)
+
+
+class FeatureSchema:
+    """
+    A validated schema bound to its column positions.
+
+    Attributes:
+        features: feature names in model order
+        base_index: [(position, name)] of the features read from the input
+        derived: DerivedFeatures compiled for this column order
+        calibration: validated calibration parameters
+        training_data: as stored (may be None)
+    """
+
+    def __init__(self, schema):
+        if schema.get('version') != SCHEMA_VERSION:
+            raise ValueError(f"Unsupported model schema version: {schema.get('version')}")
+        if schema.get('input_dtype', MODEL_INPUT_DTYPE) != MODEL_INPUT_DTYPE:
+            raise ValueError(f"Unsupported model input dtype: {schema['input_dtype']}")
+
+        self.features = [f['name'] for f in schema['features']]
+        if len(set(self.features)) != len(self.features):
+            raise ValueError("Duplicate feature names in model schema")
+        self.dtypes = {}
+        for f in schema['features']:
+            dtype = np.dtype(f['dtype'])
+            if dtype.kind not in 'biuf':
+                raise ValueError(f"Feature {f['name']} has non-numeric dtype {dtype}")
+            self.dtypes[f['name']] = dtype
+
+        self.derived = DerivedFeatures(self.features, schema['derived'])
+        self.base_index = [(i, name) for i, name in enumerate(self.features) if name not in self.derived.names]
+        self.calibration = _check_calibration(schema['calibration'])
+        self.training_data = schema.get('training_data')
+        self.schema = schema
+
+    @classmethod
+    def for_features(cls, feature_names, calibration=None):
+        """Schema for a model that does not carry one (current code's registry)"""
+        return cls(build_schema(feature_names, calibration=calibration))
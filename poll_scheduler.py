@@ -0,0 +1,189 @@
+"""
+Adaptive in-game polling interval for LiveWinRatePredictor.
+
+A fixed 10 s interval is too slow right after a fight or an objective and
+wasted during quiet farming. PollScheduler picks the next interval from the
+events of the last polls (game time, from the live client's EventTime):
+
+    teamfight   teamfight_kills or more champion kills within the last
+                teamfight_window seconds       -> fast_interval
+    hot         a kill or objective within the last hot_window seconds
+                                               -> fast_interval
+    quiet       nothing for quiet_after seconds -> quiet_interval
+    normal      otherwise                      -> normal_interval
+
+Two budgets cap the rate whatever the mode:
+
+    cpu_budget               fraction of wall time the update thread may
+                             spend working (fetch + features + prediction)
+    max_requests_per_minute  requests to the live client in any 60 s
+
+stats() reports how many polls were made in each mode and how many of them
+actually changed the displayed prediction.
+"""
+import time
+from collections import deque
+
+# Events after which the prediction is likely to move
+KILL_EVENTS = {"ChampionKill"}
+HOT_EVENTS = KILL_EVENTS | {
+    "FirstBlood", "Multikill", "Ace", "FirstBrick", "TurretKilled", "InhibKilled",
+    "DragonKill", "BaronKill", "HeraldKill", "HordeKill",
+}
+
+MODES = ("teamfight", "hot", "normal", "quiet")
+
+
+class PollScheduler:
+    """
+    Chooses the in-game polling interval and keeps polling statistics.
+
+    Args:
+        fast_interval, normal_interval, quiet_interval: seconds between polls
+        hot_window: game seconds a kill/objective keeps polling fast
+        quiet_after: game seconds without one before polling slows down
+        teamfight_kills, teamfight_window: kills within that many game
+            seconds that count as a teamfight
+        cpu_budget: max fraction of wall time spent in polls (None: no limit)
+        max_requests_per_minute: live client requests allowed in any 60 s
+            (None: no limit)
+        change_threshold: win probability change counted as a changed prediction
+    """
+
+    def __init__(self, fast_interval=2.0, normal_interval=10.0, quiet_interval=20.0,
+                 hot_window=30.0, quiet_after=90.0, teamfight_kills=2, teamfight_window=15.0,
+                 cpu_budget=0.02, max_requests_per_minute=120, change_threshold=0.005):
+        self.intervals = {"teamfight": fast_interval, "hot": fast_interval,
+                          "normal": normal_interval, "quiet": quiet_interval}
+        self.hot_window = hot_window
+        self.quiet_after = quiet_after
+        self.teamfight_kills = teamfight_kills
+        self.teamfight_window = teamfight_window
+        self.cpu_budget = cpu_budget
+        self.max_requests_per_minute = max_requests_per_minute
+        self.change_threshold = change_threshold
+
+        self.polls = 0
+        self.prediction_changes = 0
+        self.polls_by_mode = dict.fromkeys(MODES, 0)
+        self.budget_limited = 0
+        self.cpu_per_poll = 0.0          # running average of CPU seconds per poll
+        self._requests = deque()         # (wall time, requests) of recent polls
+        self._requests_in_window = 0
+        self._last_requests = 0
+        self.game_key = None
+        self.reset_game()
+
+    def reset_game(self):
+        """Forget the activity of the previous game (statistics are kept)"""
+        self.game_time = 0.0
+        self.last_event_time = None
+        self.kill_times = deque()
+        self.last_prob = None
+
+    # ----------------------------
+    # OBSERVATION
+    # ----------------------------
+
+    def observe(self, events, game_time, win_prob, cpu_seconds=0.0, requests=0, now=None, game_key=None):
+        """
+        Record one in-game poll.
+
+        Args:
+            events: events new since the previous poll (ObjectiveTracker.new_events)
+            game_time: game clock of the poll
+            win_prob: prediction shown after the poll
+            cpu_seconds: CPU time the poll took
+            requests: live client requests it made
+            now: wall clock (time.monotonic() if None)
+            game_key: identity of the game (ObjectiveTracker.game, the roster
+                key); a different key starts a new game like a clock restart
+        """
+        now = time.monotonic() if now is None else now
+        if game_time < self.game_time or (game_key is not None and game_key != self.game_key):
+            self.reset_game()
+            self.game_key = game_key
+        self.polls += 1
+        self.polls_by_mode[self.mode()] += 1
+
+        for e in events:
+            name = e.get("EventName", "")
+            if name not in HOT_EVENTS:
+                continue
+            t = e.get("EventTime", game_time)
+            self.last_event_time = t if self.last_event_time is None else max(self.last_event_time, t)
+            if name in KILL_EVENTS:
+                self.kill_times.append(t)
+        self.game_time = game_time
+        while self.kill_times and self.kill_times[0] < game_time - self.teamfight_window:
+            self.kill_times.popleft()
+
+        if self.last_prob is None or abs(win_prob - self.last_prob) >= self.change_threshold:
+            self.prediction_changes += 1
+            self.last_prob = win_prob
+
+        self.cpu_per_poll = cpu_seconds if self.polls == 1 else 0.8 * self.cpu_per_poll + 0.2 * cpu_seconds
+        self._requests.append((now, requests))
+        self._requests_in_window += requests
+        self._last_requests = requests
+
+    def mode(self):
+        """Current activity level: teamfight, hot, normal or quiet"""
+        if len(self.kill_times) >= self.teamfight_kills:
+            return "teamfight"
+        since = self.game_time - (self.last_event_time if self.last_event_time is not None else 0.0)
+        if self.last_event_time is not None and since <= self.hot_window:
+            return "hot"
+        if since >= self.quiet_after:
+            return "quiet"
+        return "normal"
+
+    # ----------------------------
+    # SCHEDULING
+    # ----------------------------
+
+    def next_interval(self, now=None):
+        """Seconds until the next in-game poll"""
+        now = time.monotonic() if now is None else now
+        interval = wanted = self.intervals[self.mode()]
+
+        # CPU budget: work at most cpu_budget of the time
+        if self.cpu_budget:
+            interval = max(interval, self.cpu_per_poll / self.cpu_budget)
+
+        # Request budget: the next poll must fit in the last 60 s
+        if self.max_requests_per_minute:
+            while self._requests and self._requests[0][0] <= now - 60.0:
+                self._requests_in_window -= self._requests.popleft()[1]
+            excess = self._requests_in_window + self._last_requests - self.max_requests_per_minute
+            for t, n in self._requests:
+                if excess <= 0:
+                    break
+                # Wait until this poll leaves the window
+                interval = max(interval, t + 60.0 - now)
+                excess -= n
+
+        if interval > wanted:
+            self.budget_limited += 1
+        return interval
+
+    # ----------------------------
+    # STATISTICS
+    # ----------------------------
+
+    def stats(self):
+        """Polls made, how many changed the prediction, and polls per mode"""
+        return {
+            "polls": self.polls,
+            "prediction_changes": self.prediction_changes,
+            "change_rate": self.prediction_changes / self.polls if self.polls else 0.0,
+            "polls_by_mode": dict(self.polls_by_mode),
+            "budget_limited": self.budget_limited,
+            "cpu_per_poll": self.cpu_per_poll,
+        }
+
+    def summary(self):
+        s = self.stats()
+        modes = ", ".join(f"{mode} {count}" for mode, count in s["polls_by_mode"].items())
+        return (f"{s['polls']} polls, {s['prediction_changes']} changed the prediction "
+                f"({s['change_rate']*100:.0f}%); {modes}; {s['budget_limited']} budget-limited")
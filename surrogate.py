@@ -0,0 +1,268 @@
+"""
+Distilled surrogate for the random forest: a binned additive model.
+
+    logit(p) = intercept + sum over features j of table_j[bin_j(x_j)]
+
+Bins are quantiles of the training distribution (or the distinct values for
+features with few of them). The tables are fitted to the forest's raw
+probabilities (soft labels) by cyclic Newton steps on the logistic loss, so
+the surrogate learns the teacher, not the labels. Inference is a handful of
+array lookups and needs NumPy only.
+
+Usage:
+    python surrogate.py       # distill data/winprob_model.joblib -> data/winprob_surrogate.npz
+"""
+import os
+import json
+import numpy as np
+
+SURROGATE_FORMAT_VERSION = 1
+
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+def _logit(p, eps=1e-4):
+    p = np.clip(p, eps, 1.0 - eps)
+    return np.log(p / (1.0 - p))
+
+
+def bin_edges(values, max_bins=32):
+    """Split points for one feature: midpoints between distinct values, or quantiles"""
+    distinct = np.unique(values)
+    if len(distinct) <= max_bins:
+        return (distinct[:-1] + distinct[1:]) / 2.0
+    edges = np.quantile(values, np.linspace(0, 1, max_bins + 1)[1:-1])
+    return np.unique(edges)
+
+
+class BinnedAdditiveModel:
+    """Lookup-table additive model; see module docstring"""
+
+    def __init__(self, feature_names, edges, tables, intercept, calibration=None):
+        self.feature_names = list(feature_names)
+        # The teacher's fitted calibration (calibration.py), applied on top
+        self.calibration = calibration
+        self.edges = [np.asarray(e, dtype=np.float64) for e in edges]
+        self.tables = [np.asarray(t, dtype=np.float64) for t in tables]
+        self.intercept = float(intercept)
+
+        # Padded layout for single rows: bin = number of edges <= x
+        width = max(len(e) for e in self.edges) if self.edges else 0
+        self._padded_edges = np.full((len(self.edges), width), np.inf)
+        for j, e in enumerate(self.edges):
+            self._padded_edges[j, :len(e)] = e
+        self._offsets = np.cumsum([0] + [len(t) for t in self.tables[:-1]])
+        self._flat_tables = np.concatenate(self.tables) if self.tables else np.zeros(0)
+
+    def _bins(self, X):
+        return [np.searchsorted(e, X[:, j], side='right') for j, e in enumerate(self.edges)]
+
+    @classmethod
+    def fit(cls, X, teacher_probs, feature_names, max_bins=32, n_rounds=30, l2=1.0):
+        """
+        Fit to the teacher's probabilities on X (n, features).
+
+        Args:
+            max_bins: bins per feature
+            n_rounds: passes over all features
+            l2: ridge penalty per bin (keeps sparse bins close to 0)
+        """
+        X = np.asarray(X, dtype=np.float64)
+        p = np.clip(np.asarray(teacher_probs, dtype=np.float64), 0.0, 1.0)
+        edges = [bin_edges(X[:, j], max_bins) for j in range(X.shape[1])]
+        model = cls(feature_names, edges, [np.zeros(len(e) + 1) for e in edges], _logit(p.mean()))
+        bins = model._bins(X)
+
+        score = np.full(len(X), model.intercept)
+        for _ in range(n_rounds):
+            for j, table in enumerate(model.tables):
+                q = _sigmoid(score)
+                gradient = np.bincount(bins[j], weights=p - q, minlength=len(table))
+                hessian = np.bincount(bins[j], weights=q * (1.0 - q), minlength=len(table))
+                step = gradient / (hessian + l2)
+                table += step
+                score += step[bins[j]]
+            # Keep each table centered so the intercept carries the average
+            for table, b in zip(model.tables, bins):
+                shift = table[b].mean()
+                table -= shift
+                model.intercept += shift
+        return cls(feature_names, edges, model.tables, model.intercept)
+
+    def predict_proba(self, X):
+        """Probability for each row of X (n, features)"""
+        X = np.asarray(X, dtype=np.float64)
+        score = np.full(len(X), self.intercept)
+        for table, b in zip(self.tables, self._bins(X)):
+            score += table[b]
+        return _sigmoid(score)
+
+    def predict_one(self, x):
+        """Probability for one feature vector"""
+        bins = (self._padded_edges <= np.asarray(x, dtype=np.float64)[:, np.newaxis]).sum(axis=1)
+        return float(_sigmoid(self.intercept + self._flat_tables.take(self._offsets + bins).sum()))
+
+    def save(self, path):
+        meta = {'version': SURROGATE_FORMAT_VERSION, 'feature_names': self.feature_names,
+                'intercept': self.intercept, 'calibration': self.calibration}
+        np.savez_compressed(
+            path,
+            meta=json.dumps(meta),
+            edges=np.concatenate(self.edges), edge_counts=[len(e) for e in self.edges],
+            tables=self._flat_tables,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta['version'] != SURROGATE_FORMAT_VERSION:
+                raise ValueError(f"Unsupported surrogate version in {path}")
+            counts = data['edge_counts']
+            edges = np.split(data['edges'], np.cumsum(counts)[:-1])
+            tables = np.split(data['tables'], np.cumsum(counts + 1)[:-1])
+        return cls(meta['feature_names'], edges, tables, meta['intercept'], meta.get('calibration'))
+
+
+class SurrogateWinModel:
+    """Same prediction API as RandomForestWinModel, backed by a BinnedAdditiveModel"""
+
+    def __init__(self, model_path):
+        self.model_path = model_path
+        self.model = None
+
+    def load(self):
+        if os.path.exists(self.model_path):
+            self.model = BinnedAdditiveModel.load(self.model_path)
+            return True
+        return False
+
+    @property
+    def feature_names(self):
+        return self.model.feature_names
+
+    @property
+    def calibration(self):
+        return self.model.calibration
+
+    def predict_rows(self, X):
+        if self.model is None:
+            raise ValueError("Surrogate not loaded.")
+        return self.model.predict_proba(X)
+
+    def predict_row(self, x):
+        if self.model is None:
+            raise ValueError("Surrogate not loaded.")
+        return self.model.predict_one(x)
+
+
+def augment_game_states(X, feature_names, copies=2, seed=0):
+    """
+    Earlier-in-the-game versions of the training rows.
+
+    The training matrix holds end-of-game totals, but the overlay asks about
+    states throughout the game. Base features (and game_duration) are scaled
+    by a random fraction in [0.1, 1] and the derived features recomputed, so
+    the surrogate also learns the teacher where live queries land.
+    """
+    from derived_features import DerivedFeatures, DERIVED_FEATURE_NAMES
+
+    rng = np.random.default_rng(seed)
+    derived = DerivedFeatures(feature_names)
+    base = [j for j, name in enumerate(feature_names) if name not in DERIVED_FEATURE_NAMES]
+    blocks = [X]
+    for _ in range(copies):
+        block = X.copy()
+        block[:, base] *= rng.uniform(0.1, 1.0, (len(X), 1))
+        blocks.append(derived.fill_block(block))
+    return np.concatenate(blocks)
+
+
+def teacher_report(student_probs, teacher_probs, y=None, n_bins=10):
+    """Fidelity of the surrogate against the teacher (and the labels, if given)"""
+    errors = np.abs(student_probs - teacher_probs)
+    report = {
+        'mean_abs_error': float(errors.mean()),
+        'p99_abs_error': float(np.percentile(errors, 99)),
+        'max_abs_error': float(errors.max()),
+        'same_side_of_0.5': float(np.mean((student_probs > 0.5) == (teacher_probs > 0.5))),
+    }
+    # Calibration against the teacher: within each surrogate-probability bin,
+    # how far the average surrogate probability is from the average teacher one
+    bins = np.minimum((student_probs * n_bins).astype(int), n_bins - 1)
+    counts = np.bincount(bins, minlength=n_bins)
+    gap = np.abs(np.bincount(bins, student_probs - teacher_probs, minlength=n_bins))
+    report['calibration_error_vs_teacher'] = float(gap.sum() / counts.sum())
+    if y is not None:
+        y = np.asarray(y)
+        report['teacher_accuracy'] = float(np.mean((teacher_probs > 0.5) == y))
+        report['surrogate_accuracy'] = float(np.mean((student_probs > 0.5) == y))
+        report['surrogate_calibration_error_vs_labels'] = float(
+            np.abs(np.bincount(bins, student_probs - y, minlength=n_bins)).sum() / counts.sum())
+    return report
+
+
+def distill(teacher, X, y=None, feature_names=None, augment_copies=2, test_size=0.2, seed=42, **fit_args):
+    """
+    Train a surrogate on the teacher's outputs and report its fidelity.
+
+    Args:
+        teacher: object with predict_rows(X) -> probabilities (RandomForestWinModel)
+        X: training features, (n, features) array or DataFrame
+        y: true labels (optional, only used for the report)
+    Returns:
+        (surrogate, report) - the report is computed on a held-out split
+        of the original (non-augmented) rows
+    """
+    if feature_names is None:
+        feature_names = list(X.columns)
+    X = np.asarray(X, dtype=np.float64)
+    y = None if y is None else np.asarray(y)
+
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(X))
+    n_test = int(len(X) * test_size)
+    test, train = order[:n_test], order[n_test:]
+
+    X_train = augment_game_states(X[train], feature_names, augment_copies, seed)
+    surrogate = BinnedAdditiveModel.fit(X_train, teacher.predict_rows(X_train), feature_names, **fit_args)
+    surrogate.calibration = getattr(teacher, 'calibration', None)
+
+    teacher_test = teacher.predict_rows(X[test])
+    report = teacher_report(surrogate.predict_proba(X[test]), teacher_test,
+                            None if y is None else y[test])
+    augmented_test = augment_game_states(X[test], feature_names, 1, seed + 1)[n_test:]
+    report['augmented'] = teacher_report(surrogate.predict_proba(augmented_test),
+                                         teacher.predict_rows(augmented_test))
+    return surrogate, report
+
+
+def print_report(report, indent=""):
+    for key, value in report.items():
+        if isinstance(value, dict):
+            print(f"{indent}{key}:")
+            print_report(value, indent + "  ")
+        else:
+            print(f"{indent}{key:40s} {value:.4f}")
+
+
+if __name__ == "__main__":
+    from feature_store import load_features
+    from model import RandomForestWinModel, MODEL_PATH
+
+    teacher = RandomForestWinModel(MODEL_PATH)
+    if not teacher.load():
+        raise SystemExit(f"Model not found at {MODEL_PATH}")
+
+    print("Loading data...")
+    X, y = load_features("data")
+    print(f"Distilling {teacher.model.n_estimators}-tree forest into a binned additive model...")
+    surrogate, report = distill(teacher, X, y)
+
+    out_path = os.path.join(os.path.dirname(MODEL_PATH), "winprob_surrogate.npz")
+    surrogate.save(out_path)
+    print(f"\nSaved to {out_path} ({os.path.getsize(out_path) / 1024:.1f} KB)")
+    print("\nFidelity on held-out rows:")
+    print_report(report, "  ")
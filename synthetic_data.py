@@ -0,0 +1,100 @@
+"""
+Synthetic match tables with the same layout as the real data dump.
+Used by the test and benchmark scripts so they run without the full dataset.
+"""
+import os
+import numpy as np
+import pandas as pd
+
+QUEUE_TYPES = ['CLASSIC', 'CLASSIC', 'CLASSIC', 'ARAM', 'CHERRY']
+LANES = ['TOP', 'JUNGLE', 'MIDDLE', 'BOTTOM', 'UTILITY']
+
+
+def make_synthetic_tables(n_matches=1000, seed=0, players_per_match=(3, 10)):
+    """
+    Build MatchStatsTbl, TeamMatchTbl, MatchTbl and SummonerMatchTbl DataFrames.
+
+    Like the real dump, only a subset of the 10 players is observed per match
+    (between players_per_match[0] and players_per_match[1]).
+
+    Returns:
+        match_stats, team_stats, match_tbl, summoner_match (same order as DataLoader)
+    """
+    rng = np.random.default_rng(seed)
+    match_ids = np.arange(1, n_matches + 1)
+
+    match_tbl = pd.DataFrame({
+        'MatchId': match_ids,
+        'Patch': rng.choice([14.1, 14.2, 14.3], n_matches),
+        'QueueType': rng.choice(QUEUE_TYPES, n_matches),
+        'RankFk': rng.integers(0, 11, n_matches),
+        'GameDuration': rng.integers(900, 2700, n_matches),
+    })
+
+    # Ten distinct champions per match: first five blue, last five red
+    champs = np.argsort(rng.random((n_matches, 170)), axis=1)[:, :10] + 1
+    blue_win = rng.integers(0, 2, n_matches)
+    edge = np.where(blue_win == 1, 1, -1)
+
+    team_stats = pd.DataFrame({'TeamID': match_ids, 'MatchFk': match_ids})
+    for i in range(5):
+        team_stats[f'B{i + 1}Champ'] = champs[:, i]
+    for i in range(5):
+        team_stats[f'R{i + 1}Champ'] = champs[:, 5 + i]
+    for side, sign in (('Blue', 1), ('Red', -1)):
+        team_stats[f'{side}BaronKills'] = rng.poisson(np.clip(0.5 + 0.3 * sign * edge, 0.05, None))
+        team_stats[f'{side}RiftHeraldKills'] = rng.poisson(np.clip(0.6 + 0.3 * sign * edge, 0.05, None))
+        team_stats[f'{side}DragonKills'] = rng.poisson(np.clip(2.0 + 0.8 * sign * edge, 0.1, None))
+        team_stats[f'{side}TowerKills'] = rng.poisson(np.clip(5.0 + 2.5 * sign * edge, 0.1, None))
+        team_stats[f'{side}Kills'] = rng.poisson(np.clip(25 + 6 * sign * edge, 1, None))
+    team_stats['RedWin'] = 1 - blue_win
+    team_stats['BlueWin'] = blue_win
+
+    # Observed players per match
+    lo, hi = players_per_match
+    counts = rng.integers(lo, hi + 1, n_matches)
+    slots = [rng.permutation(10)[:c] for c in counts]
+    player_match = np.repeat(match_ids, counts)
+    player_slot = np.concatenate(slots) if slots else np.array([], dtype=int)
+    player_champ = champs[player_match - 1, player_slot]
+    player_blue = player_slot < 5
+    n_players = len(player_match)
+
+    summoner_match = pd.DataFrame({
+        'SummonerMatchId': np.arange(1, n_players + 1),
+        'SummonerFk': rng.integers(1, max(2, n_players // 3), n_players),
+        'MatchFk': player_match,
+        'ChampionFk': player_champ,
+    })
+
+    won = np.where(player_blue, blue_win[player_match - 1], 1 - blue_win[player_match - 1])
+    minutes = match_tbl['GameDuration'].to_numpy()[player_match - 1] / 60.0
+    match_stats = pd.DataFrame({
+        'MatchStatsId': np.arange(1, n_players + 1),
+        'SummonerMatchFk': summoner_match['SummonerMatchId'].to_numpy(),
+        'MinionsKilled': (minutes * rng.uniform(2, 8, n_players)).astype(int),
+        'DmgDealt': rng.integers(3000, 60000, n_players),
+        'DmgTaken': rng.integers(3000, 60000, n_players),
+        'TurretDmgDealt': rng.integers(0, 15000, n_players),
+        'TotalGold': (minutes * rng.uniform(300, 450, n_players) + won * 1500).astype(int),
+        'Lane': np.array(LANES)[player_slot % 5],
+        'Win': won,
+        'DragonKills': rng.poisson(0.4, n_players),
+        'BaronKills': rng.poisson(0.1, n_players),
+        'kills': rng.poisson(4 + won, n_players),
+        'deaths': rng.poisson(5 - won, n_players),
+        'assists': rng.poisson(7 + 2 * won, n_players),
+        'visionScore': rng.integers(5, 80, n_players),
+    })
+
+    return match_stats, team_stats, match_tbl, summoner_match
+
+
+def write_synthetic_csvs(data_dir, n_matches=1000, seed=0):
+    """Write the four synthetic tables as CSVs in data_dir (DataLoader layout)"""
+    os.makedirs(data_dir, exist_ok=True)
+    match_stats, team_stats, match_tbl, summoner_match = make_synthetic_tables(n_matches, seed)
+    match_stats.to_csv(os.path.join(data_dir, 'MatchStatsTbl.csv'), index=False)
+    team_stats.to_csv(os.path.join(data_dir, 'TeamMatchTbl.csv'), index=False)
+    match_tbl.to_csv(os.path.join(data_dir, 'MatchTbl.csv'), index=False)
+    summoner_match.to_csv(os.path.join(data_dir, 'SummonerMatchTbl.csv'), index=False)
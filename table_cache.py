@@ -0,0 +1,254 @@
+"""
+Columnar on-disk cache for the raw match tables.
+
+Each source CSV is converted once into a directory holding one raw binary
+file per column plus a manifest.json describing the columns and the source
+file it was built from. Later loads read the binary columns directly instead
+of parsing the CSV again.
+
+Tables can be written chunk by chunk (TableCacheWriter) while the CSV is
+streamed, and read back with a row mask so that only the selected rows are
+ever materialized (the column files are memory-mapped).
+
+A cache entry is valid while the source file has the same size and either the
+same modification time or (if it was only touched/copied) the same SHA-1.
+"""
+import os
+import json
+import shutil
+import hashlib
+import numpy as np
+import pandas as pd
+
+CACHE_FORMAT_VERSION = 2
+MANIFEST_NAME = "manifest.json"
+
+
+def file_sha1(path, block_size=1 << 20):
+    """SHA-1 of a file, read in 1 MB blocks"""
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+def file_fingerprint(path):
+    """Size, mtime and content hash of a source file"""
+    st = os.stat(path)
+    return {
+        'size': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+        'sha1': file_sha1(path),
+    }
+
+
+class TableCacheWriter:
+    """
+    Appends DataFrame chunks to a new cache entry.
+
+    Categorical and string columns are dictionary-encoded with one code table
+    shared by all chunks. Nothing is visible to readers until close().
+    """
+
+    def __init__(self, cache, name, source_path, key=""):
+        self.cache = cache
+        self.name = name
+        self.source_path = source_path
+        self.key = key
+        self.rows = 0
+        self.columns = None
+        self._codes = {}
+        self.tmp_dir = cache._table_dir(name) + ".tmp"
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        os.makedirs(self.tmp_dir)
+
+    def _encode(self, col, series):
+        """Map a chunk's categories onto the column's global code table"""
+        cat = series.cat if isinstance(series.dtype, pd.CategoricalDtype) else series.astype('category').cat
+        lookup = self._codes[col['name']]
+        mapping = np.empty(len(cat.categories) + 1, dtype=np.int32)
+        mapping[-1] = -1  # missing values keep code -1
+        for i, value in enumerate(cat.categories.tolist()):
+            if value not in lookup:
+                lookup[value] = len(lookup)
+                col['categories'].append(value)
+            mapping[i] = lookup[value]
+        return mapping[cat.codes.to_numpy()]
+
+    def _write(self, col, values):
+        path = os.path.join(self.tmp_dir, col['file'])
+        if col['dtype'] is None:
+            col['dtype'] = values.dtype.str
+        elif np.dtype(col['dtype']) != values.dtype:
+            # A later chunk needed a wider type: widen what is already on disk
+            wider = np.result_type(np.dtype(col['dtype']), values.dtype)
+            if wider != np.dtype(col['dtype']):
+                np.fromfile(path, dtype=col['dtype']).astype(wider).tofile(path)
+                col['dtype'] = wider.str
+            values = values.astype(wider)
+        with open(path, "ab") as f:
+            values.tofile(f)
+
+    def append(self, df):
+        if self.columns is None:
+            self.columns = []
+            for i, name in enumerate(df.columns):
+                series = df[name]
+                if isinstance(series.dtype, pd.CategoricalDtype):
+                    kind = 'category'
+                elif pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+                    kind = 'numeric'
+                else:
+                    kind = 'string'
+                col = {'name': str(name), 'file': f"c{i}.bin", 'kind': kind, 'dtype': None}
+                if kind != 'numeric':
+                    col['categories'] = []
+                    self._codes[col['name']] = {}
+                self.columns.append(col)
+
+        for col, name in zip(self.columns, df.columns):
+            series = df[name]
+            if col['kind'] == 'numeric':
+                self._write(col, np.ascontiguousarray(series.to_numpy()))
+            else:
+                self._write(col, self._encode(col, series))
+        self.rows += len(df)
+
+    def close(self):
+        """Write the manifest and atomically replace any previous entry"""
+        if self.columns is None:
+            raise ValueError(f"No data written for {self.name}")
+        with open(os.path.join(self.tmp_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump({
+                'version': CACHE_FORMAT_VERSION,
+                'key': self.key,
+                'source': file_fingerprint(self.source_path),
+                'rows': self.rows,
+                'columns': self.columns,
+            }, f, indent=1)
+
+        table_dir = self.cache._table_dir(self.name)
+        shutil.rmtree(table_dir, ignore_errors=True)
+        os.replace(self.tmp_dir, table_dir)
+
+    def abort(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+
+class TableCache:
+    """Stores DataFrames as per-column binary files keyed by their source CSV"""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def _table_dir(self, name):
+        return os.path.join(self.cache_dir, name)
+
+    def _read_manifest(self, name):
+        path = os.path.join(self._table_dir(name), MANIFEST_NAME)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_manifest(self, table_dir, manifest):
+        with open(os.path.join(table_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1)
+
+    def is_valid(self, name, source_path, key=""):
+        """
+        Check whether the cached copy of `name` still matches source_path.
+
+        A touched-but-unchanged source (different mtime, same size and hash)
+        is still valid; the manifest mtime is refreshed so the next check is cheap.
+        """
+        manifest = self._read_manifest(name)
+        if manifest is None:
+            return False
+        if manifest.get('version') != CACHE_FORMAT_VERSION or manifest.get('key') != key:
+            return False
+
+        source = manifest.get('source', {})
+        st = os.stat(source_path)
+        if st.st_size != source.get('size'):
+            return False
+        if st.st_mtime_ns == source.get('mtime_ns'):
+            return True
+
+        if file_sha1(source_path) != source.get('sha1'):
+            return False
+        source['mtime_ns'] = st.st_mtime_ns
+        self._write_manifest(self._table_dir(name), manifest)
+        return True
+
+    def source_sha1(self, name):
+        """SHA-1 of the source file the entry was built from (check is_valid first)"""
+        return self._read_manifest(name)['source']['sha1']
+
+    def columns(self, name):
+        """Column names of a cached table"""
+        return [c['name'] for c in self._read_manifest(name)['columns']]
+
+    def load(self, name, columns=None, rows=None):
+        """
+        Read a cached table back into a DataFrame.
+
+        Args:
+            columns: only read these columns (default: all)
+            rows: boolean mask or positions; only these rows are materialized
+        """
+        manifest = self._read_manifest(name)
+        if manifest is None:
+            raise FileNotFoundError(f"No cache entry for {name}")
+
+        table_dir = self._table_dir(name)
+        wanted = manifest['columns']
+        if columns is not None:
+            wanted = [c for c in wanted if c['name'] in columns]
+
+        data = {}
+        for col in wanted:
+            path = os.path.join(table_dir, col['file'])
+            if rows is None:
+                values = np.fromfile(path, dtype=col['dtype'])
+            elif manifest['rows'] == 0:
+                values = np.empty(0, dtype=col['dtype'])
+            else:
+                mapped = np.memmap(path, dtype=col['dtype'], mode='r', shape=(manifest['rows'],))
+                values = np.array(mapped[rows])
+                del mapped
+
+            if col['kind'] == 'numeric':
+                data[col['name']] = values
+            else:
+                cat = pd.Categorical.from_codes(values, categories=col['categories'])
+                data[col['name']] = cat if col['kind'] == 'category' else np.asarray(cat, dtype=object)
+        return pd.DataFrame(data, columns=[c['name'] for c in wanted])
+
+    def writer(self, name, source_path, key=""):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        return TableCacheWriter(self, name, source_path, key)
+
+    def store(self, name, source_path, df, key=""):
+        """Write df as the cache entry for source_path (atomically replaces any old entry)"""
+        writer = self.writer(name, source_path, key)
+        try:
+            writer.append(df)
+            writer.close()
+        except Exception:
+            writer.abort()
+            raise
+
+    def get_or_build(self, name, source_path, build_fn, key=""):
+        """Return the cached table if valid, otherwise build it with build_fn() and cache it"""
+        if self.is_valid(name, source_path, key):
+            return self.load(name)
+
+        df = build_fn()
+        try:
+            self.store(name, source_path, df, key)
+        except OSError as e:
+            print(f"Warning: could not write cache for {name}: {e}")
+        return df
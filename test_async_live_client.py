@@ -0,0 +1,145 @@
+import asyncio
+import json
+import socket
+import time
+from async_live_client import AsyncLiveClient, LiveClientError
+from live_client import LiveClientAPI
+
+def player(team, name, champion, kills=0, items=()):
+    return {"team": team, "summonerName": name, "riotId": f"{name}#EUW", "riotIdGameName": name,
+            "riotIdTagLine": "EUW", "championName": champion, "level": 6,
+            "scores": {"kills": kills, "deaths": 0, "assists": 1, "creepScore": 40, "wardScore": 3.0},
+            "items": [{"itemID": 1055, "price": price} for price in items]}
+
+def make_game(names, n_events, game_time):
+    players = [player("ORDER", names[0], "Ahri", 2, (450, 400)), player("ORDER", names[1], "Lee Sin", 1, (350,)),
+               player("CHAOS", names[2], "Jinx", 0, (1300,)), player("CHAOS", names[3], "Rakan", 1, ())]
+    killers = [p["riotId"] for p in players] + ["Minion_T100L0S0N0"]
+    events = [{"EventID": 0, "EventName": "GameStart"}]
+    kinds = ["TurretKilled", "DragonKill", "ChampionKill", "HordeKill", "InhibKilled", "BaronKill"]
+    for i in range(1, n_events):
+        events.append({"EventID": i, "EventName": kinds[i % len(kinds)], "KillerName": killers[i % len(killers)]})
+    return {"activePlayer": {"summonerName": players[2]["riotId"]}, "allPlayers": players,
+            "events": {"Events": events}, "gameData": {"gameTime": game_time}}
+
+class FakeLiveClient:
+    """Plain-HTTP stand-in for the live client serving one game's state"""
+
+    def __init__(self, game, delay=0.0, chunked=False):
+        self.game = game
+        self.delay = delay
+        self.chunked = chunked
+        self.requests = []
+        self.connections = 0
+
+    def respond(self, path):
+        events = self.game["events"]["Events"]
+        if path.startswith("/liveclientdata/eventdata"):
+            first = int(path.split("eventID=")[1])
+            return 200, {"Events": [e for e in events if e["EventID"] >= first]}
+        routes = {"/liveclientdata/playerlist": self.game["allPlayers"],
+                  "/liveclientdata/gamestats": self.game["gameData"],
+                  "/liveclientdata/activeplayername": self.game["activePlayer"]["summonerName"]}
+        if path in routes:
+            return 200, routes[path]
+        return 404, {"errorCode": "RESOURCE_NOT_FOUND"}
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            while (await reader.readline()) not in (b"\r\n", b""):
+                pass
+            path = request_line.split()[1].decode()
+            self.requests.append(path)
+            await asyncio.sleep(self.delay)
+            status, payload = self.respond(path)
+            body = json.dumps(payload).encode()
+            if self.chunked:
+                half = len(body) // 2
+                writer.write(f"HTTP/1.1 {status} X\r\nTransfer-Encoding: chunked\r\n\r\n".encode())
+                for part in (body[:half], body[half:]):
+                    writer.write(f"{len(part):x}\r\n".encode() + part + b"\r\n")
+                writer.write(b"0\r\n\r\n")
+            else:
+                writer.write(f"HTTP/1.1 {status} X\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+            await writer.drain()
+        writer.close()
+
+async def serve(fake):
+    server = await asyncio.start_server(fake.handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+def test_features_match_allgamedata_over_kept_alive_connections():
+    async def run():
+        game = make_game(["Blue A", "Blue B", "Red A", "Red B"], 60, 900.0)
+        fake = FakeLiveClient(game, delay=0.2)
+        server, port = await serve(fake)
+        client = AsyncLiveClient(host="127.0.0.1", port=port, use_ssl=False)
+
+        start = time.perf_counter()
+        features = await client.fetch_features()
+        elapsed = time.perf_counter() - start
+        # Four endpoints at 0.2 s each, fetched concurrently
+        assert elapsed < 0.6, elapsed
+        assert features == LiveClientAPI().extract_features(game)
+        assert features["player_team"] == "RED"
+
+        # Later ticks: only new events, no activeplayername, same connections
+        fake.delay = 0.0
+        for n_events in (60, 75, 90):
+            game["events"]["Events"] = make_game(["Blue A", "Blue B", "Red A", "Red B"], n_events, 0)["events"]["Events"]
+            game["gameData"]["gameTime"] += 10
+            assert await client.fetch_features() == LiveClientAPI().extract_features(game)
+        assert fake.requests[-3].endswith("eventdata?eventID=75")
+        assert fake.requests.count("/liveclientdata/activeplayername") == 1
+        assert client.connections_opened == fake.connections == 4
+
+        # New game: events refetched from the start
+        new_game = make_game(["Blue C", "Blue D", "Red C", "Red D"], 20, 30.0)
+        fake.game = new_game
+        assert await client.fetch_features() == LiveClientAPI().extract_features(new_game)
+        assert fake.requests[-2:] in (["/liveclientdata/eventdata?eventID=0", "/liveclientdata/activeplayername"],
+                                      ["/liveclientdata/activeplayername", "/liveclientdata/eventdata?eventID=0"])
+
+        # Chunked responses
+        fake.chunked = True
+        assert await client.fetch_features() == LiveClientAPI().extract_features(new_game)
+
+        await client.close()
+        server.close()
+        await server.wait_closed()
+    asyncio.run(run())
+
+def test_errors_report_status():
+    async def run():
+        fake = FakeLiveClient(make_game(["A", "B", "C", "D"], 5, 60.0))
+        server, port = await serve(fake)
+        client = AsyncLiveClient(host="127.0.0.1", port=port, use_ssl=False)
+        try:
+            await client.fetch_json("/allgamedata")
+            assert False, "expected a 404"
+        except LiveClientError as e:
+            assert e.status == 404
+        server.close()
+        await server.wait_closed()
+
+        # Nothing listening: not reachable, no status
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            free_port = s.getsockname()[1]
+        client = AsyncLiveClient(host="127.0.0.1", port=free_port, use_ssl=False)
+        try:
+            await client.fetch_features()
+            assert False, "expected a connection error"
+        except LiveClientError as e:
+            assert e.status is None
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    test_features_match_allgamedata_over_kept_alive_connections()
+    print("Features match allgamedata over kept-alive connections: OK")
+    test_errors_report_status()
+    print("Errors report their status: OK")
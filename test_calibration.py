@@ -0,0 +1,86 @@
+import os
+import tempfile
+import warnings
+import numpy as np
+import interface
+from calibration import CalibrationError, CalibrationTable, fit_calibration, fit_for_model
+from compact_forest import export
+from feature_engineer import DefaultFeatureEngineer
+from model import RandomForestWinModel
+from model_schema import DEFAULT_CALIBRATION, FeatureSchema
+from synthetic_data import make_synthetic_tables
+
+def test_fitted_table_is_monotone_and_centered():
+    rng = np.random.default_rng(0)
+    raw = rng.uniform(0, 1, 5000)
+    y = rng.uniform(0, 1, 5000) < raw ** 1.5
+    table = fit_calibration(raw, y, baseline_raw=0.45)
+    assert np.all(np.diff(table.calibrated) >= 0)
+    assert table.one(0.45) == 0.5
+    # Roughly follows the outcome rate on each side of the baseline
+    assert table.one(0.95) > 0.8 and table.one(0.05) < 0.2
+
+    points = np.concatenate([rng.uniform(-0.1, 1.1, 2000), table.raw])
+    batch = table.batch(points)
+    assert np.array_equal(np.array([table.one(p) for p in points]), batch)
+    assert CalibrationTable.from_dict(table.to_dict()).batch(points).tolist() == batch.tolist()
+
+def test_training_fits_and_ships_the_calibration():
+    match_stats, team_stats, match_tbl, summoner_match = make_synthetic_tables(3000, seed=61)
+    X, y = DefaultFeatureEngineer().fit_transform(match_stats, team_stats, summoner_match, match_tbl)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model = RandomForestWinModel(os.path.join(tmp, "model.joblib"))
+        model.train(X, y)
+        calibration = model.calibration
+        assert calibration['kind'] == 'table'
+        assert 0.0 < calibration['baseline_raw'] < 1.0
+        model.save()
+
+        compact_path = os.path.join(tmp, "model.npz")
+        export(model.model, compact_path)
+
+        old_paths = interface.MODEL_PATH, interface.COMPACT_PATH
+        interface.MODEL_PATH, interface.COMPACT_PATH = model.model_path, compact_path
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                forest = interface.WinProbabilityInterface()
+            compact = interface.WinProbabilityInterface(backend="compact")
+        finally:
+            interface.MODEL_PATH, interface.COMPACT_PATH = old_paths
+
+    table = CalibrationTable.from_dict(calibration)
+    for win in (forest, compact):
+        assert win.baseline_raw == calibration['baseline_raw']
+        assert win._calibrate(calibration['baseline_raw']) == 0.5
+        raw = model.predict_rows(win.feature_block(X.iloc[:200]).astype(np.float32))
+        assert np.array_equal(win._calibrate_batch(raw), table.batch(raw))
+    kwargs = {name: X.iloc[0][name] for name in interface.BASE_FEATURES}
+    assert forest.predict(**kwargs) == table.one(model.predict_row(forest._vector32))
+
+def test_single_class_held_out_falls_back_to_default():
+    raw = np.linspace(0.05, 0.95, 200)
+    try:
+        fit_calibration(raw, np.ones(200), baseline_raw=0.45)
+        assert False, "expected CalibrationError"
+    except CalibrationError:
+        pass
+
+    match_stats, team_stats, match_tbl, summoner_match = make_synthetic_tables(1500, seed=62)
+    X, y = DefaultFeatureEngineer().fit_transform(match_stats, team_stats, summoner_match, match_tbl)
+    with tempfile.TemporaryDirectory() as tmp:
+        model = RandomForestWinModel(os.path.join(tmp, "model.joblib"))
+        model.train(X, y)
+        # Held-out games that are all wins (e.g. a tiny rank-filtered set)
+        calibration = fit_for_model(model, X.iloc[:100], np.ones(100, dtype=int))
+    assert calibration == DEFAULT_CALIBRATION
+    assert FeatureSchema.for_features(list(X.columns), calibration).calibration['kind'] == 'piecewise_power'
+
+if __name__ == "__main__":
+    test_fitted_table_is_monotone_and_centered()
+    print("Fitted table is monotone and centered: OK")
+    test_training_fits_and_ships_the_calibration()
+    print("Training fits and ships the calibration: OK")
+    test_single_class_held_out_falls_back_to_default()
+    print("Single-class held-out set falls back to the default: OK")
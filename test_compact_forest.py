@@ -0,0 +1,116 @@
+import os
+import sys
+import subprocess
+import tempfile
+import numpy as np
+import interface
+from sklearn.ensemble import RandomForestClassifier
+from compact_forest import CompactWinModel, LEAF_LEVELS, export, fidelity_report, prune_redundant, load_compact
+from flat_forest import FlatForest
+from model import RandomForestWinModel
+
+def _data(n=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([
+        rng.integers(-10, 11, n),
+        rng.normal(0, 3000, n),
+        rng.integers(0, 3000, n),
+    ]).astype(np.float64)
+    y = (X[:, 0] / 10 + X[:, 1] / 3000 + rng.normal(0, 0.5, n) > 0).astype(int)
+    return X, y
+
+def test_compact_roundtrip_and_pruning():
+    X, y = _data()
+    X[::7, 1] = np.nan  # keep missing-value directions in the artifact
+    forest = RandomForestClassifier(n_estimators=20, max_depth=10, min_samples_leaf=5,
+                                    random_state=0, n_jobs=1).fit(X, y)
+    X_test, _ = _data(seed=1)
+    X_test[::5, 1] = np.nan
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "compact.npz")
+
+        # No pruning: same tree walks, leaf values within the uint16 step
+        full, loaded = export(forest, path)
+        assert np.array_equal(loaded.leaves(X_test), full.leaves(X_test))
+        report = fidelity_report(loaded, full, X_test)
+        assert report['max_abs_error'] <= 0.5 / LEAF_LEVELS
+        assert report['nodes_kept'] == 1.0
+        assert loaded.predict_one(X_test[0]) == loaded.predict_proba(X_test[:1])[0]
+
+        _, loaded32 = export(forest, path, leaf_dtype='float32')
+        assert np.allclose(loaded32.predict_proba(X_test), full.predict_proba(X_test), rtol=0, atol=1e-7)
+
+        # Pruning moves the forest output by at most the tolerance
+        for tolerance in (0.02, 0.1):
+            _, pruned = export(forest, path, prune_tolerance=tolerance, leaf_dtype='float32')
+            report = fidelity_report(pruned, full, X_test)
+            assert report['nodes_kept'] < 1.0
+            assert report['max_abs_error'] <= tolerance + 1e-6
+
+        # Loadable through the model class, prediction only
+        model = RandomForestWinModel(path)
+        assert model.load()
+        assert model.model is None and model.feature_names is None
+        assert np.array_equal(model.predict(X_test), pruned.predict_proba(X_test))
+        assert model.predict_row(X_test[3].astype(np.float32)) == pruned.predict_one(X_test[3])
+        assert load_compact(path)[1]['prune_tolerance'] == 0.1
+
+def test_pruning_nothing_keeps_the_forest():
+    X, y = _data(seed=2)
+    forest = FlatForest.from_sklearn(
+        RandomForestClassifier(n_estimators=5, max_depth=6, random_state=1, n_jobs=1).fit(X, y))
+    pruned = prune_redundant(forest, -1.0)
+    assert np.array_equal(pruned.predict_proba(X), forest.predict_proba(X))
+    assert len(pruned.value) == len(forest.value)
+
+def test_compact_anytime_stops_early():
+    X, y = _data(seed=3)
+    forest = RandomForestClassifier(n_estimators=200, max_depth=8, random_state=2, n_jobs=1).fit(X, y)
+    X_test = _data(seed=4)[0][:50].astype(np.float32)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "compact.npz")
+        export(forest, path, leaf_dtype='float32')
+        model = CompactWinModel(path)
+        assert model.load()
+        exact = [model.predict_row(x) for x in X_test]
+
+        model.anytime_tolerance = 0.05
+        early = [model.predict_row(x) for x in X_test]
+        stats = model.anytime_stats
+        assert stats['predictions'] == 50
+        assert stats['trees_used'] < stats['trees_total']
+        assert np.max(np.abs(np.array(early) - exact)) < 0.2
+
+    # Set on both forest backends, refused by the others
+    win = interface.WinProbabilityInterface(backend="compact", anytime_tolerance=0.05)
+    assert win.model.anytime_tolerance == 0.05
+    for backend in ("surrogate", "surface"):
+        try:
+            interface.WinProbabilityInterface(backend=backend, anytime_tolerance=0.05)
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+def test_runtime_does_not_import_training_stack():
+    # The overlay/exe path: interface + compact model on NumPy alone
+    code = (
+        "import sys\n"
+        "from interface import WinProbabilityInterface\n"
+        "win = WinProbabilityInterface(backend='compact')\n"
+        "assert 0.0 <= win.predict(gold_diff=1500, game_duration=900) <= 1.0\n"
+        "print(sorted(m for m in ('pandas', 'sklearn', 'scipy', 'joblib') if m in sys.modules))\n"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout
+    assert output.strip().splitlines()[-1] == "[]"
+
+if __name__ == "__main__":
+    test_compact_roundtrip_and_pruning()
+    print("Compact round trip and pruning: OK")
+    test_pruning_nothing_keeps_the_forest()
+    print("Pruning with nothing to prune: OK")
+    test_compact_anytime_stops_early()
+    print("Compact anytime stops early: OK")
+    test_runtime_does_not_import_training_stack()
+    print("Runtime imports NumPy only: OK")
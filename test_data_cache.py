@@ -0,0 +1,85 @@
+import os
+import time
+import tempfile
+import pandas as pd
+import data_loader
+from data_loader import DataLoader, schema_key
+from synthetic_data import write_synthetic_csvs
+
+def _load_all(loader, rank_ids=None):
+    return loader.load_match_stats(rank_ids=rank_ids)
+
+def test_cache_roundtrip():
+    """Cached loads must return exactly what a fresh CSV parse returns"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_synthetic_csvs(data_dir, n_matches=500, seed=1)
+
+        fresh = _load_all(DataLoader(data_dir, use_cache=False), rank_ids=[3, 4, 5])
+        cold = _load_all(DataLoader(data_dir), rank_ids=[3, 4, 5])
+        assert os.path.exists(os.path.join(data_dir, '.cache', 'MatchTbl', 'manifest.json'))
+        warm = _load_all(DataLoader(data_dir), rank_ids=[3, 4, 5])
+
+        for a, b, c in zip(fresh, cold, warm):
+            pd.testing.assert_frame_equal(a.reset_index(drop=True), b.reset_index(drop=True), check_dtype=False)
+            pd.testing.assert_frame_equal(a.reset_index(drop=True), c.reset_index(drop=True), check_dtype=False)
+
+def test_cache_invalidation():
+    """Changing a CSV rebuilds its cache; touching it without changes does not"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_synthetic_csvs(data_dir, n_matches=200, seed=2)
+        loader = DataLoader(data_dir)
+        _load_all(loader)
+
+        # Touch: same content, new mtime -> still served from cache
+        path = os.path.join(data_dir, 'MatchTbl.csv')
+        later = time.time() + 10
+        os.utime(path, (later, later))
+        assert loader.cache.is_valid('MatchTbl', path, schema_key('MatchTbl'))
+
+        # Rewrite with different content -> cache is stale and gets rebuilt
+        match_tbl = pd.read_csv(path)
+        match_tbl['QueueType'] = 'CLASSIC'
+        match_tbl.to_csv(path, index=False)
+        assert not loader.cache.is_valid('MatchTbl', path, schema_key('MatchTbl'))
+
+        _, _, reloaded, _ = _load_all(loader)
+        assert len(reloaded) == 200
+        assert loader.cache.is_valid('MatchTbl', path, schema_key('MatchTbl'))
+
+def _reference_load(data_dir, rank_ids):
+    """Unchunked read-everything-then-filter, as DataLoader used to do it"""
+    read = lambda name: pd.read_csv(os.path.join(data_dir, f'{name}.csv'))
+    match_tbl = read('MatchTbl')
+    match_tbl = match_tbl[(match_tbl['QueueType'] == 'CLASSIC') & match_tbl['RankFk'].isin(rank_ids)]
+    team_stats = read('TeamMatchTbl')
+    team_stats = team_stats[team_stats['MatchFk'].isin(match_tbl['MatchId'])]
+    summoner_match = read('SummonerMatchTbl')
+    summoner_match = summoner_match[summoner_match['MatchFk'].isin(match_tbl['MatchId'])]
+    match_stats = read('MatchStatsTbl')
+    match_stats = match_stats[match_stats['SummonerMatchFk'].isin(summoner_match['SummonerMatchId'])]
+    return match_stats, team_stats, match_tbl, summoner_match
+
+def test_chunked_filter_pushdown():
+    """Streaming chunks through the filters keeps exactly the rows a full read would"""
+    old_chunk_rows = data_loader.READ_CHUNK_ROWS
+    data_loader.READ_CHUNK_ROWS = 700
+    try:
+        with tempfile.TemporaryDirectory() as data_dir:
+            write_synthetic_csvs(data_dir, n_matches=1500, seed=7)
+            expected = _reference_load(data_dir, [4, 5])
+            for use_cache in (False, True, True):  # no cache, cold cache, warm cache
+                actual = DataLoader(data_dir, use_cache=use_cache).load_match_stats(rank_ids=[4, 5])
+                for a, b in zip(expected, actual):
+                    b = b.astype({c: object for c in b.select_dtypes('category').columns})
+                    pd.testing.assert_frame_equal(a.reset_index(drop=True), b.reset_index(drop=True),
+                                                  check_dtype=False)
+    finally:
+        data_loader.READ_CHUNK_ROWS = old_chunk_rows
+
+if __name__ == "__main__":
+    test_cache_roundtrip()
+    print("Cache round trip: OK")
+    test_cache_invalidation()
+    print("Cache invalidation: OK")
+    test_chunked_filter_pushdown()
+    print("Chunked filter pushdown: OK")
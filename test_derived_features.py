@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+from derived_features import DerivedFeatures, add_derived_features, DERIVED_FEATURE_NAMES
+from interface import FEATURES
+
+BASE = [f for f in FEATURES if f not in DERIVED_FEATURE_NAMES]
+
+def _reference(d):
+    """The formulas as originally written out in fit_transform"""
+    out = {}
+    out['combat_power'] = (d['kill_diff'] / 10.0 + d['gold_diff'] / 3000.0 + d['level_diff'] / 10.0 +
+                           d['baron_diff'] * 3.0 + d['dragon_diff'] * 0.5)
+    out['tower_combat_mismatch'] = d['tower_diff'] - out['combat_power']
+    out['push_capability'] = out['combat_power'] + d['baron_diff'] * 2.0 + d['herald_diff'] * 1.0
+    out['economic_advantage'] = d['gold_diff'] / 1000.0 + d['cs_diff'] / 50.0
+    out['objective_control'] = (d['dragon_diff'] * 1.0 + d['baron_diff'] * 3.0 + d['tower_diff'] * 2.0 +
+                                d['herald_diff'] * 1.5 + d['inhib_diff'] * 4.0)
+    return out
+
+def _random_base(n, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({f: rng.integers(-20, 21, n) for f in BASE})
+    df['gold_diff'] = rng.integers(-15000, 15000, n)
+    df['assist_diff'] = rng.normal(0, 8, n)  # scaled estimates are floats
+    return df
+
+def test_dataframe_matches_formulas():
+    df = _random_base(2000)
+    expected = _reference(df)
+    add_derived_features(df)
+    for name in DERIVED_FEATURE_NAMES:
+        pd.testing.assert_series_equal(df[name], expected[name], check_names=False)
+
+def test_block_and_vector_match_dataframe():
+    """All three evaluation paths give bit-identical values"""
+    df = _random_base(500, seed=1)
+    add_derived_features(df)
+    derived = DerivedFeatures(FEATURES)
+
+    block = df.reindex(columns=FEATURES).to_numpy(dtype=np.float64)
+    block[:, derived.outputs] = 0
+    derived.fill_block(block)
+    assert np.array_equal(block, df[FEATURES].to_numpy(dtype=np.float64))
+
+    vector = np.zeros(len(FEATURES))
+    for row, expected in zip(df[BASE].itertuples(index=False), block):
+        vector[:] = 0
+        vector[[FEATURES.index(f) for f in BASE]] = row
+        derived.fill_vector(vector)
+        assert np.array_equal(vector, expected)
+
+def test_missing_columns_rejected():
+    try:
+        DerivedFeatures([f for f in FEATURES if f != 'herald_diff'])
+    except ValueError as e:
+        assert 'herald_diff' in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+
+if __name__ == "__main__":
+    test_dataframe_matches_formulas()
+    print("DataFrame path matches formulas: OK")
+    test_block_and_vector_match_dataframe()
+    print("Block and vector paths match: OK")
+    test_missing_columns_rejected()
+    print("Missing columns rejected: OK")
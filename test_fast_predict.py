@@ -0,0 +1,62 @@
+import warnings
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from feature_engineer import DefaultFeatureEngineer
+from model import RandomForestWinModel
+from interface import WinProbabilityInterface, FEATURES
+from synthetic_data import make_synthetic_tables
+from benchmark_predict import dataframe_predict, random_states
+
+def _trained_model():
+    match_stats, team_stats, match_tbl, summoner_match = make_synthetic_tables(2000, seed=21)
+    X, y = DefaultFeatureEngineer().fit_transform(match_stats, team_stats, summoner_match, match_tbl)
+    model = RandomForestWinModel("unused.joblib")
+    # n_jobs=1: with threads predict_proba sums the trees in completion order
+    model.model = RandomForestClassifier(n_estimators=20, max_depth=8, min_samples_leaf=5,
+                                         random_state=0, n_jobs=1).fit(X, y)
+    return model, X
+
+def test_predict_row_matches_predict_proba():
+    model, X = _trained_model()
+    expected = model.predict(X)
+    rows = X.to_numpy(dtype=np.float32)
+    actual = np.array([model.predict_row(row) for row in rows])
+    assert np.array_equal(actual, expected)
+
+def _interface():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # model pickled with another sklearn version
+        interface = WinProbabilityInterface()
+    interface.model.model.n_jobs = 1
+    return interface
+
+def test_interface_matches_dataframe_path():
+    interface = _interface()
+    for kwargs in random_states(300, seed=3):
+        assert interface.predict(**kwargs) == dataframe_predict(interface, **kwargs)
+
+def test_predict_batch_matches_predict():
+    interface = _interface()
+    states = list(random_states(500, seed=4))
+    expected = np.array([interface.predict(**kwargs) for kwargs in states])
+
+    frame = pd.DataFrame(states)
+    base = frame[[f for f in FEATURES if f in frame.columns]].to_numpy()
+    for features in (frame, base, interface.feature_block(frame)):
+        actual = interface.predict_batch(features)
+        assert actual.shape == expected.shape
+        # Only the power curves may round differently (last bit)
+        assert np.allclose(actual, expected, rtol=0, atol=1e-15)
+
+    raw = np.linspace(0, 1, 10001)
+    expected = [max(0.0, min(1.0, interface._calibrate(r))) for r in raw]
+    assert np.allclose(interface._calibrate_batch(raw), expected, rtol=0, atol=1e-15)
+
+if __name__ == "__main__":
+    test_predict_row_matches_predict_proba()
+    print("predict_row matches predict_proba: OK")
+    test_interface_matches_dataframe_path()
+    print("Interface fast path matches DataFrame path: OK")
+    test_predict_batch_matches_predict()
+    print("predict_batch matches predict: OK")
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+from feature_engineer import DefaultFeatureEngineer, blue_side_mask, side_labels, BLUE_CHAMP_COLS
+from synthetic_data import make_synthetic_tables
+
+def _assign_team_rowwise(row):
+    """The original per-row rule"""
+    if row['ChampionFk'] in [row['B1Champ'], row['B2Champ'], row['B3Champ'], row['B4Champ'], row['B5Champ']]:
+        return 'BLUE'
+    return 'RED'
+
+def test_side_assignment_matches_rowwise_rule():
+    rows = pd.DataFrame({
+        'ChampionFk': [1, 6, 3, np.nan, 7],
+        'B1Champ': [1, 1, 1, 1, np.nan],
+        'B2Champ': [2, 2, 2, 2, np.nan],
+        'B3Champ': [3, 3, 9, 3, np.nan],
+        'B4Champ': [4, 4, 4, 4, np.nan],
+        'B5Champ': [5, 5, 5, 5, np.nan],
+    })
+    expected = rows.apply(_assign_team_rowwise, axis=1).tolist()
+    sides = side_labels(blue_side_mask(rows['ChampionFk'].to_numpy(), rows[BLUE_CHAMP_COLS].to_numpy()))
+    assert sides.tolist() == expected == ['BLUE', 'RED', 'RED', 'RED', 'RED']
+
+def test_fit_transform_on_synthetic_data():
+    match_stats, team_stats, match_tbl, summoner_match = make_synthetic_tables(500, seed=11)
+    X, y = DefaultFeatureEngineer().fit_transform(match_stats, team_stats, summoner_match, match_tbl)
+    assert len(X) == len(y) > 0
+    assert not X.isna().any().any()
+    assert X.index.is_monotonic_increasing
+    # Columns and dtypes as declared (model_schema.schema_for_export relies on it)
+    assert X.dtypes.astype(str).to_dict() == DefaultFeatureEngineer.OUTPUT_DTYPES
+
+def test_partitioned_matches_serial():
+    """Sharded multiprocess output is identical to the serial path"""
+    match_stats, team_stats, match_tbl, summoner_match = make_synthetic_tables(3000, seed=12)
+    # Unsorted input and players without a SummonerMatch row
+    match_stats = match_stats.sample(frac=1, random_state=0)
+    team_stats = team_stats.sample(frac=1, random_state=1)
+    summoner_match = summoner_match.sample(frac=0.95, random_state=2)
+    tables = (match_stats, team_stats, summoner_match, match_tbl)
+
+    X, y = DefaultFeatureEngineer().fit_transform(*tables)
+    X_par, y_par = DefaultFeatureEngineer(n_jobs=2, n_shards=5).fit_transform(*tables)
+    pd.testing.assert_frame_equal(X, X_par)
+    pd.testing.assert_series_equal(y, y_par)
+
+if __name__ == "__main__":
+    test_side_assignment_matches_rowwise_rule()
+    test_fit_transform_on_synthetic_data()
+    test_partitioned_matches_serial()
+    print("Feature engineer tests: OK")
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import pandas as pd
+from feature_engineer import DefaultFeatureEngineer
+from feature_store import FeatureStore, MANIFEST_NAME, feature_key, load_features
+from data_loader import DataLoader
+from synthetic_data import write_synthetic_csvs
+
+class CountingEngineer(DefaultFeatureEngineer):
+    """Counts fit_transform calls so the tests can tell cache hits from rebuilds"""
+    calls = 0
+
+    def fit_transform(self, *tables):
+        CountingEngineer.calls += 1
+        return super().fit_transform(*tables)
+
+def test_store_roundtrip():
+    """A stored matrix loads back with identical values, dtypes and index"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_synthetic_csvs(data_dir, n_matches=400, seed=3)
+        X, y = load_features(data_dir, use_store=False)
+        X_cold, y_cold = load_features(data_dir)
+        X_warm, y_warm = load_features(data_dir)
+        for X_other, y_other in ((X_cold, y_cold), (X_warm, y_warm)):
+            pd.testing.assert_frame_equal(X, X_other)
+            pd.testing.assert_series_equal(y, y_other)
+
+def test_store_invalidation():
+    """Rank filter, data and engineer changes each build a new matrix"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_synthetic_csvs(data_dir, n_matches=300, seed=4)
+        engineer = CountingEngineer()
+        CountingEngineer.calls = 0
+
+        load_features(data_dir, engineer=engineer)
+        load_features(data_dir, engineer=engineer)
+        assert CountingEngineer.calls == 1
+
+        X_ranks, _ = load_features(data_dir, rank_ids=[2, 3], engineer=engineer)
+        assert CountingEngineer.calls == 2
+        load_features(data_dir, rank_ids=[3, 2], engineer=engineer)
+        assert CountingEngineer.calls == 2
+
+        # Changed data
+        path = os.path.join(data_dir, 'TeamMatchTbl.csv')
+        team_stats = pd.read_csv(path)
+        team_stats['BlueKills'] += 1
+        team_stats.to_csv(path, index=False)
+        X_new, _ = load_features(data_dir, rank_ids=[2, 3], engineer=engineer)
+        assert CountingEngineer.calls == 3
+        assert (X_new['kill_diff'] == X_ranks['kill_diff'] + 1).all()
+
+        # Changed engineer version
+        fingerprint = DataLoader(data_dir).fingerprint()
+        key = feature_key(fingerprint, [2, 3], engineer)
+        engineer.VERSION = DefaultFeatureEngineer.VERSION + 1
+        assert feature_key(fingerprint, [2, 3], engineer) != key
+        load_features(data_dir, rank_ids=[2, 3], engineer=engineer)
+        assert CountingEngineer.calls == 4
+
+def test_store_pruning():
+    """Only the most recently used max_entries matrices are kept"""
+    with tempfile.TemporaryDirectory() as store_dir:
+        store = FeatureStore(store_dir, max_entries=2)
+        X = pd.DataFrame({'a': [1.0, 2.0]}, index=pd.Index([5, 6], name='MatchFk'))
+        y = pd.Series([0, 1], index=X.index, name='blue_win')
+
+        def last_used(key, t):
+            # Explicit manifest mtimes: entries saved within one mtime tick would
+            # otherwise be ordered by key name
+            os.utime(os.path.join(store_dir, key, MANIFEST_NAME), (t, t))
+
+        store.save('k3', X, y)
+        last_used('k3', 1000.0)
+        store.save('k2', X, y)
+        last_used('k2', 2000.0)
+        # Loading marks k3 as used now, so k2 is the least recently used
+        store.load('k3')
+        store.save('k1', X, y)
+        assert not store.contains('k2')
+        assert store.contains('k1') and store.contains('k3')
+
+if __name__ == "__main__":
+    test_store_roundtrip()
+    print("Feature store round trip: OK")
+    test_store_invalidation()
+    print("Feature store invalidation: OK")
+    test_store_pruning()
+    print("Feature store pruning: OK")
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from flat_forest import FlatForest, float32_at_most
+
+def _data(n=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([
+        rng.integers(-10, 11, n),               # integer valued, like kill_diff
+        rng.normal(0, 3000, n),                 # like gold_diff
+        rng.normal(0, 1, n) * 1e-3,             # tiny values near thresholds
+        rng.integers(0, 3000, n),
+    ]).astype(np.float64)
+    y = (X[:, 0] / 10 + X[:, 1] / 3000 + rng.normal(0, 0.5, n) > 0).astype(int)
+    return X, y
+
+def _assert_identical(forest, X):
+    flat = FlatForest.from_sklearn(forest)
+    expected = forest.predict_proba(X)[:, 1]
+    assert np.array_equal(flat.predict_proba(X), expected)
+    for row, value in zip(X[:300], expected[:300]):
+        assert flat.predict_one(row) == value
+    return flat
+
+def test_bit_identical_to_sklearn():
+    X, y = _data()
+    forest = RandomForestClassifier(n_estimators=30, max_depth=10, min_samples_leaf=5,
+                                    random_state=0, n_jobs=1).fit(X, y)
+    X_test, _ = _data(seed=1)
+    _assert_identical(forest, X_test)
+    # Unbounded depth and class weights
+    forest = RandomForestClassifier(n_estimators=10, class_weight='balanced', random_state=1, n_jobs=1).fit(X, y)
+    _assert_identical(forest, X_test)
+
+def test_parallel_forest_within_rounding():
+    # n_jobs=-1 (as RandomForestWinModel trains): sklearn sums tree outputs
+    # across threads in no fixed order, so only the last bits may differ
+    X, y = _data()
+    forest = RandomForestClassifier(n_estimators=40, max_depth=10, random_state=4, n_jobs=-1).fit(X, y)
+    X_test, _ = _data(seed=6)
+    flat = FlatForest.from_sklearn(forest)
+    expected = forest.predict_proba(X_test)[:, 1]
+    assert np.allclose(flat.predict_proba(X_test), expected, rtol=0, atol=1e-12)
+    assert np.allclose([flat.predict_one(row) for row in X_test[:300]], expected[:300], rtol=0, atol=1e-12)
+
+def test_missing_values_follow_sklearn():
+    X, y = _data()
+    X[::5, 1] = np.nan  # trained with NaN: nodes learn a missing-value direction
+    forest = RandomForestClassifier(n_estimators=20, max_depth=8, random_state=2, n_jobs=1).fit(X, y)
+    X_test, _ = _data(seed=3)
+    X_test[::3, 1] = np.nan
+    _assert_identical(forest, X_test)
+
+def test_save_load_roundtrip():
+    X, y = _data()
+    forest = RandomForestClassifier(n_estimators=15, max_depth=6, random_state=3, n_jobs=1).fit(X, y)
+    flat = FlatForest.from_sklearn(forest)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "forest.npz")
+        flat.save(path)
+        loaded = FlatForest.load(path)
+    assert np.array_equal(loaded.predict_proba(X), forest.predict_proba(X)[:, 1])
+
+def test_float32_thresholds_are_exact():
+    rng = np.random.default_rng(5)
+    thresholds = rng.normal(0, 1000, 20000)
+    t32 = float32_at_most(thresholds)
+    assert (t32.astype(np.float64) <= thresholds).all()
+    # The next float32 up is already above the float64 threshold
+    assert (np.nextafter(t32, np.float32(np.inf)).astype(np.float64) > thresholds).all()
+
+def test_anytime_early_exit():
+    X, y = _data(4000, seed=6)
+    forest = RandomForestClassifier(n_estimators=300, max_depth=10, min_samples_leaf=5,
+                                    random_state=4, n_jobs=1).fit(X, y)
+    flat = FlatForest.from_sklearn(forest)
+    X_test, _ = _data(400, seed=7)
+    full = flat.predict_proba(X_test)
+
+    # Zero tolerance never stops early and matches the full evaluation exactly
+    for row, expected in zip(X_test[:50], full[:50]):
+        assert flat.predict_one_anytime(row, tolerance=0.0) == (expected, 300)
+
+    results = [flat.predict_one_anytime(row, tolerance=0.02) for row in X_test]
+    errors = np.abs(np.array([p for p, _ in results]) - full)
+    used = np.array([n for _, n in results])
+    assert used.min() >= 32 and used.mean() < 300
+    assert np.mean(errors > 0.02) < 0.05
+
+if __name__ == "__main__":
+    test_bit_identical_to_sklearn()
+    print("Bit-identical to sklearn: OK")
+    test_parallel_forest_within_rounding()
+    print("Parallel forest within rounding: OK")
+    test_missing_values_follow_sklearn()
+    print("Missing values: OK")
+    test_save_load_roundtrip()
+    print("Save/load: OK")
+    test_float32_thresholds_are_exact()
+    print("float32 thresholds: OK")
+    test_anytime_early_exit()
+    print("Anytime early exit: OK")
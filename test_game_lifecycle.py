@@ -0,0 +1,90 @@
+import asyncio
+from async_live_client import LiveClientError
+from game_lifecycle import GameLifecycle, NO_CLIENT, LOADING, IN_GAME
+
+class ScriptedClient:
+    """Answers like the live client in a given phase: 'down', 'loading' or 'game'"""
+
+    def __init__(self):
+        self.phase = "down"
+        self.requests = []
+
+    async def fetch_json(self, path):
+        self.requests.append(path)
+        if self.phase == "down":
+            raise LiveClientError("unreachable")
+        if self.phase == "loading":
+            raise LiveClientError("not found", 404)
+        return {"gameTime": 120.0}
+
+    async def fetch_features(self):
+        self.requests.append("features")
+        await self.fetch_json("/gamestats")
+        return {"game_duration": 120.0}
+
+def run_ticks(lifecycle, client, n, interval=10.0):
+    delays = []
+    for _ in range(n):
+        asyncio.run(lifecycle.tick(client))
+        delays.append(lifecycle.next_delay(interval))
+    return delays
+
+def test_backs_off_while_no_client():
+    lifecycle = GameLifecycle(min_backoff=1.0, max_backoff=30.0)
+    client = ScriptedClient()
+    delays = run_ticks(lifecycle, client, 8)
+    assert delays == [2.0, 4.0, 8.0, 16.0, 30.0, 30.0, 30.0, 30.0]
+    assert lifecycle.state == NO_CLIENT
+    # Only the probe, never game data
+    assert client.requests == ["/gamestats"] * 8
+
+def test_loading_then_in_game_with_one_round_per_tick():
+    lifecycle = GameLifecycle(loading_interval=2.0)
+    client = ScriptedClient()
+    client.phase = "loading"
+    assert run_ticks(lifecycle, client, 3) == [2.0, 2.0, 2.0]
+    assert lifecycle.state == LOADING
+
+    client.phase = "game"
+    assert asyncio.run(lifecycle.tick(client)) == {"game_duration": 120.0}
+    assert lifecycle.state == IN_GAME and lifecycle.next_delay(10.0) == 10.0
+
+    # In game: no probe, just the data fetch
+    client.requests.clear()
+    run_ticks(lifecycle, client, 5)
+    assert client.requests == ["features", "/gamestats"] * 5
+    assert lifecycle.probes == 4 and lifecycle.fetches == 6
+
+def test_failed_fetches_count_as_liveness_signals():
+    lifecycle = GameLifecycle(max_failures=3)
+    client = ScriptedClient()
+    client.phase = "game"
+    asyncio.run(lifecycle.tick(client))
+    assert lifecycle.state == IN_GAME
+
+    # A single failure keeps the game state
+    client.phase = "down"
+    run_ticks(lifecycle, client, 2)
+    assert lifecycle.state == IN_GAME and lifecycle.failures == 2
+    client.phase = "game"
+    run_ticks(lifecycle, client, 1)
+    assert lifecycle.failures == 0
+
+    # max_failures in a row: back to loading (HTTP errors) or no client
+    client.phase = "loading"
+    run_ticks(lifecycle, client, 3)
+    assert lifecycle.state == LOADING
+    client.phase = "game"
+    run_ticks(lifecycle, client, 1)
+    client.phase = "down"
+    run_ticks(lifecycle, client, 3)
+    assert lifecycle.state == NO_CLIENT and lifecycle.backoff == lifecycle.min_backoff
+    assert lifecycle.status_text() == "No game running"
+
+if __name__ == "__main__":
+    test_backs_off_while_no_client()
+    print("Backs off while no client: OK")
+    test_loading_then_in_game_with_one_round_per_tick()
+    print("Loading, then one round per tick in game: OK")
+    test_failed_fetches_count_as_liveness_signals()
+    print("Failed fetches count as liveness signals: OK")
@@ -0,0 +1,106 @@
+import random
+from live_state import ObjectiveTracker, RosterIndex, OBJECTIVE_EVENTS, OBJECTIVES, normalize_name, player_aliases, roster_key
+
+BLUE = {"blueone", "bluetwo"}
+RED = {"redone", "redtwo"}
+
+def sides_of(raw_name):
+    name = raw_name.lower().replace(" ", "")
+    return [side for side, names in (("ORDER", BLUE), ("CHAOS", RED)) if name in names]
+
+def make_events(n, seed=0):
+    rng = random.Random(seed)
+    names = list(OBJECTIVE_EVENTS) + ["ChampionKill", "FirstBlood", "Multikill"]
+    killers = ["Blue One", "Blue Two", "Red One", "Red Two", "Minion_T100L0S0N0", "Turret_T2_L_03_A"]
+    events = [{"EventID": 0, "EventName": "GameStart", "EventTime": 0.0}]
+    for i in range(1, n):
+        e = {"EventID": i, "EventName": rng.choice(names), "KillerName": rng.choice(killers)}
+        if e["EventName"] == "FirstBlood":
+            e["Recipient"] = e.pop("KillerName")
+        events.append(e)
+    return events
+
+def full_count(events):
+    tracker = ObjectiveTracker()
+    tracker.update(events, 0.0, sides_of)
+    return tracker
+
+def test_incremental_matches_full_recount():
+    events = make_events(400, seed=1)
+    game = roster_key([{"team": "ORDER", "summonerName": "Blue One"}])
+    tracker = ObjectiveTracker()
+    seen = 0
+    for tick, end in enumerate(list(range(0, len(events), 7)) + [len(events)]):
+        folded = tracker.update(events[:end], float(tick), sides_of, game)
+        assert folded == end - seen
+        seen = end
+        reference = full_count(events[:end])
+        assert tracker.counts == reference.counts
+        assert tracker.first_blood == reference.first_blood
+    assert tracker.update(events, float(tick), sides_of, game) == 0
+    assert sum(tracker.counts["ORDER"][o] + tracker.counts["CHAOS"][o] for o in OBJECTIVES) > 0
+
+    # Only the newest part of the log (as /eventdata?eventID=N returns it)
+    tail_tracker = ObjectiveTracker()
+    for start in range(0, len(events), 50):
+        tail_tracker.update(events[start:start + 50], 1.0, sides_of, game)
+    assert tail_tracker.counts == tracker.counts
+
+def test_new_game_resets_counters():
+    events = make_events(100, seed=2)
+    tracker = ObjectiveTracker()
+    tracker.update(events, 1200.0, sides_of, "game one")
+    assert tracker.last_event_id == 99
+
+    # Clock restarts: new game even with the same roster
+    fresh = make_events(10, seed=3)
+    tracker.update(fresh, 30.0, sides_of, "game one")
+    assert tracker.counts == full_count(fresh).counts and tracker.last_event_id == 9
+
+    # Different roster
+    tracker.update(events[:20], 45.0, sides_of, "game two")
+    assert tracker.counts == full_count(events[:20]).counts
+
+    # Log without ids is recounted each time
+    no_ids = [{k: v for k, v in e.items() if k != "EventID"} for e in events[:30]]
+    tracker.update(no_ids, 50.0, sides_of, "game two")
+    tracker.update(no_ids, 55.0, sides_of, "game two")
+    assert tracker.counts == full_count(events[:30]).counts
+
+PLAYERS = [
+    {"team": "ORDER", "summonerName": "Blue One", "riotIdGameName": "Blue One", "riotIdTagLine": "EUW",
+     "riotId": "Blue One#EUW", "championName": "Lee Sin", "rawChampionName": "game_character_displayname_LeeSin"},
+    {"team": "ORDER", "summonerName": "Ahri Bot", "championName": "Ahri"},
+    {"team": "CHAOS", "summonerName": "Red.One", "riotIdGameName": "Red.One", "riotIdTagLine": "NA1",
+     "riotId": "Red.One#NA1", "championName": "Ahri"},
+    {"team": "CHAOS", "summonerName": "Jinx Bot", "championName": "Jinx"},
+]
+
+def test_roster_index_matches_team_name_sets():
+    index = RosterIndex(PLAYERS)
+    blue = set().union(*(player_aliases(p) for p in PLAYERS if p["team"] == "ORDER"))
+    red = set().union(*(player_aliases(p) for p in PLAYERS if p["team"] == "CHAOS"))
+
+    raw_names = ["Blue One", "blue one#euw", "BlueOne-EUW", "Lee Sin", "LeeSin", "Red.One", "redone#NA1",
+                 "Ahri", "Jinx Bot", "Minion_T100L0S0N0", "Turret_T2_L_03_A", "", None]
+    for raw in raw_names * 2:
+        expected = tuple(side for side, names in (("ORDER", blue), ("CHAOS", red))
+                         if raw and normalize_name(raw) in names)
+        assert index.sides_of(raw) == expected, raw
+    # Each distinct raw name is normalized once
+    assert set(index._resolved) == set(raw_names)
+    # Same champion on both teams counts for both, like the per-team sets
+    assert index.sides_of("Ahri") == ("ORDER", "CHAOS")
+    assert index.sides_of("BLUE ONE #EUW") == ("ORDER",)
+
+    # Key ignores player order, changes with the roster
+    assert RosterIndex(PLAYERS[::-1]).key == index.key
+    assert roster_key(PLAYERS[:3]) != index.key
+
+if __name__ == "__main__":
+    test_incremental_matches_full_recount()
+    print("Incremental counts match a full recount: OK")
+    test_new_game_resets_counters()
+    print("New game resets the counters: OK")
+    test_roster_index_matches_team_name_sets()
+    print("Roster index matches the team name sets: OK")
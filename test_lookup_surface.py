@@ -0,0 +1,73 @@
+import os
+import tempfile
+import warnings
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+import interface
+from feature_engineer import DefaultFeatureEngineer
+from lookup_surface import LookupSurface, QUANT_LEVELS, error_report
+from model import RandomForestWinModel
+from synthetic_data import make_synthetic_tables
+
+AXES = {
+    'gold_diff': np.arange(-6000, 6001, 1000),
+    'kill_diff': np.arange(-6, 7),
+    'tower_diff': np.arange(-4, 5),
+    'game_duration': np.arange(0, 2401, 600),
+}
+
+def _interface():
+    match_stats, team_stats, match_tbl, summoner_match = make_synthetic_tables(2000, seed=41)
+    X, y = DefaultFeatureEngineer().fit_transform(match_stats, team_stats, summoner_match, match_tbl)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # shipped model pickled with another sklearn version
+        win = interface.WinProbabilityInterface()
+    win.model = RandomForestWinModel("unused.joblib")
+    win.model.model = RandomForestClassifier(n_estimators=20, max_depth=8, min_samples_leaf=5,
+                                             random_state=0, n_jobs=1).fit(X, y)
+    return win, X
+
+def test_surface_reproduces_model_on_grid():
+    win, X = _interface()
+    surface = LookupSurface.build(win, AXES)
+    assert surface.table.shape == tuple(len(a) for a in AXES.values())
+
+    # Grid points are exact up to the uint16 quantization
+    mesh = np.meshgrid(*AXES.values(), indexing='ij')
+    points = np.zeros((mesh[0].size, len(interface.FEATURES)))
+    for name, values in zip(AXES, mesh):
+        points[:, interface.FEATURES.index(name)] = values.ravel()
+    points = win.feature_block(points)
+    assert np.abs(surface.lookup_batch(points) - win.predict_batch(points)).max() <= 0.5 / QUANT_LEVELS
+
+    # Single-row and batch lookups agree, including clamped rows off the grid
+    rows = win.feature_block(X.to_numpy(dtype=np.float64)[:300])
+    rows[:50, interface.FEATURES.index('gold_diff')] *= 10
+    batch = surface.lookup_batch(rows)
+    assert np.allclose([surface.lookup_one(row) for row in rows], batch, rtol=0, atol=1e-12)
+    assert ((batch >= 0) & (batch <= 1)).all()
+
+    report = error_report(surface, win, X.to_numpy(dtype=np.float64), n_samples=2000)
+    assert report['in_grid']['max_abs_error'] <= 1.0
+    assert 0.0 < report['realistic']['outside_grid'] <= 1.0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "surface.npz")
+        surface.save(path)
+        loaded = LookupSurface.load(path)
+        assert np.array_equal(loaded.lookup_batch(rows), batch)
+
+        # Selectable as an interface backend; values are used without recalibrating
+        old_path = interface.SURFACE_PATH
+        interface.SURFACE_PATH = path
+        try:
+            fast = interface.WinProbabilityInterface(backend="surface")
+        finally:
+            interface.SURFACE_PATH = old_path
+        assert fast.predict(gold_diff=2500, kill_diff=3, game_duration=900) == \
+            surface.lookup_one(fast.feature_block(np.array([[3, 0, 2500, 0, 0, 0, 0, 0, 0, 0, 0, 900]]))[0])
+        assert np.allclose(fast.predict_batch(rows), batch, rtol=0, atol=1e-7)
+
+if __name__ == "__main__":
+    test_surface_reproduces_model_on_grid()
+    print("Lookup surface: OK")
@@ -0,0 +1,36 @@
+import tempfile
+import numpy as np
+import pandas as pd
+from data_loader import DataLoader
+from synthetic_data import write_synthetic_csvs
+
+KEYS = ['MatchStatsId', 'TeamID', 'MatchId', 'SummonerMatchId']
+
+def test_windows_match_load_match_stats():
+    """Every rank window must hold the same rows as a filtered load_match_stats"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_synthetic_csvs(data_dir, n_matches=2000, seed=3)
+        loader = DataLoader(data_dir)
+        dataset = loader.load_dataset()
+
+        for rank_ids in [None, [1, 2], [3, 4, 5], [9, 10], [2, 7]]:
+            expected = loader.load_match_stats(rank_ids=rank_ids)
+            actual = dataset.window(rank_ids=rank_ids)
+            for a, b, key in zip(expected, actual, KEYS):
+                a = a.sort_values(key).reset_index(drop=True)
+                b = b.sort_values(key).reset_index(drop=True)
+                pd.testing.assert_frame_equal(a, b)
+
+def test_contiguous_window_is_a_view():
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_synthetic_csvs(data_dir, n_matches=500, seed=4)
+        dataset = DataLoader(data_dir, use_cache=False).load_dataset()
+        match_stats = dataset.window(rank_ids=[3, 4, 5])[0]
+        assert np.shares_memory(match_stats['TotalGold'].to_numpy(),
+                                dataset.match_stats['TotalGold'].to_numpy())
+
+if __name__ == "__main__":
+    test_windows_match_load_match_stats()
+    print("Rank windows match load_match_stats: OK")
+    test_contiguous_window_is_a_view()
+    print("Contiguous window is zero-copy: OK")
@@ -0,0 +1,122 @@
+import os
+import copy
+import tempfile
+import warnings
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+import interface
+from compact_forest import export
+from feature_engineer import DefaultFeatureEngineer
+from feature_store import load_features
+from model import RandomForestWinModel
+from model_schema import FeatureSchema, build_schema, schema_for_export, training_data_info
+from synthetic_data import make_synthetic_tables, write_synthetic_csvs
+
+def _training_data():
+    match_stats, team_stats, match_tbl, summoner_match = make_synthetic_tables(2000, seed=51)
+    return DefaultFeatureEngineer().fit_transform(match_stats, team_stats, summoner_match, match_tbl)
+
+def _interface_for(path):
+    old_path = interface.COMPACT_PATH
+    interface.COMPACT_PATH = path
+    try:
+        return interface.WinProbabilityInterface(backend="compact")
+    finally:
+        interface.COMPACT_PATH = old_path
+
+def test_interface_binds_the_stored_schema():
+    X, y = _training_data()
+    # A model trained on a different column order than interface.FEATURES
+    columns = list(X.columns[::-1])
+    X = X[columns]
+    forest = RandomForestClassifier(n_estimators=10, max_depth=6, random_state=0, n_jobs=1).fit(X, y)
+    calibration = dict(build_schema(columns)['calibration'], baseline_raw=0.5)
+    schema = build_schema(columns, X.dtypes, calibration, training_data={'rows': len(X)})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.npz")
+        export(forest, path, schema=schema)
+        win = _interface_for(path)
+
+    assert win.features == columns
+    assert win.baseline_raw == 0.5
+    assert win.schema.training_data == {'rows': len(X)}
+    row = X.iloc[7]
+    kwargs = {name: row[name] for name in interface.BASE_FEATURES}
+    raw = forest.predict_proba(X.iloc[[7]])[0, 1]
+    assert abs(win.predict(**kwargs) - win._calibrate(raw)) < 1e-5  # uint16 leaf values
+    assert np.allclose(win.predict_batch(X.iloc[:100]),
+                       win._calibrate_batch(forest.predict_proba(X.iloc[:100])[:, 1]), rtol=0, atol=1e-5)
+
+def test_invalid_schemas_are_rejected():
+    schema = build_schema(interface.FEATURES)
+    FeatureSchema(schema)
+
+    def broken(change):
+        bad = copy.deepcopy(schema)
+        change(bad)
+        try:
+            FeatureSchema(bad)
+        except ValueError:
+            return True
+        return False
+
+    assert broken(lambda s: s.update(version=99))
+    assert broken(lambda s: s['derived']['combat_power'].append(['+', 'kill_diff', '**', 2.0]))
+    assert broken(lambda s: s['derived']['combat_power'].append(['+', 'not_a_feature', '*', 2.0]))
+    assert broken(lambda s: s['calibration'].update(kind='isotonic_magic'))
+    assert broken(lambda s: s['calibration'].update(baseline_raw=1.5))
+    assert broken(lambda s: s['features'][0].update(dtype='object'))
+    assert broken(lambda s: s['features'].append(dict(s['features'][0])))
+
+def test_unknown_inputs_are_rejected():
+    X, y = _training_data()
+    X = X.assign(mystery_diff=0.0)
+    forest = RandomForestClassifier(n_estimators=3, max_depth=3, random_state=0, n_jobs=1).fit(X, y)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.npz")
+        export(forest, path)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            try:
+                _interface_for(path)
+            except ValueError as e:
+                assert 'mystery_diff' in str(e)
+            else:
+                raise AssertionError("Unknown input feature was accepted")
+
+def test_export_schema_carries_the_training_fingerprint():
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_synthetic_csvs(data_dir, n_matches=400, seed=8)
+        X, y = load_features(data_dir)
+        model = RandomForestWinModel(os.path.join(data_dir, "model.joblib"))
+        model.model = RandomForestClassifier(n_estimators=5, max_depth=4, random_state=0, n_jobs=1).fit(X, y)
+
+        schema = schema_for_export(model, data_dir)
+        # Same as a schema built from X at training time, without engineering it again
+        assert schema == build_schema(X.columns, X.dtypes, model.calibration, training_data_info(X, data_dir))
+        assert schema['training_data']['data_fingerprint']
+        assert FeatureSchema(schema).features == list(X.columns)
+
+        # Rank filter of the caller; that matrix is not in the store, so no row count
+        ranked = schema_for_export(model, data_dir, rank_ids=[3, 1])
+        assert ranked['training_data']['rank_ids'] == [1, 3] and ranked['training_data']['rows'] is None
+
+        path = os.path.join(data_dir, "model.npz")
+        export(model.model, path, schema=schema)
+        compact = RandomForestWinModel(path)
+        assert compact.load() and compact.schema['training_data'] == schema['training_data']
+
+    # No data to fingerprint: no schema, export() falls back to its own
+    with tempfile.TemporaryDirectory() as empty_dir:
+        assert schema_for_export(model, empty_dir) is None
+
+if __name__ == "__main__":
+    test_interface_binds_the_stored_schema()
+    print("Interface binds the stored schema: OK")
+    test_invalid_schemas_are_rejected()
+    print("Invalid schemas rejected: OK")
+    test_unknown_inputs_are_rejected()
+    print("Unknown inputs rejected: OK")
+    test_export_schema_carries_the_training_fingerprint()
+    print("Export schema carries the training fingerprint: OK")
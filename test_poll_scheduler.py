@@ -0,0 +1,86 @@
+from poll_scheduler import PollScheduler
+
+def kill(t):
+    return {"EventName": "ChampionKill", "EventTime": t}
+
+def test_interval_follows_game_activity():
+    scheduler = PollScheduler(fast_interval=2.0, normal_interval=10.0, quiet_interval=20.0,
+                              hot_window=30.0, quiet_after=90.0, cpu_budget=None, max_requests_per_minute=None)
+    scheduler.observe([], 60.0, 0.5)
+    assert scheduler.mode() == "normal" and scheduler.next_interval() == 10.0
+
+    # Farming since the start of the game
+    scheduler.observe([{"EventName": "MinionsSpawning", "EventTime": 65.0}], 100.0, 0.5)
+    assert scheduler.mode() == "quiet" and scheduler.next_interval() == 20.0
+
+    # A kill: fast for hot_window game seconds
+    scheduler.observe([kill(110.0)], 112.0, 0.55)
+    assert scheduler.mode() == "hot" and scheduler.next_interval() == 2.0
+    scheduler.observe([], 140.0, 0.55)
+    assert scheduler.mode() == "hot"
+    scheduler.observe([], 141.0, 0.55)
+    assert scheduler.mode() == "normal"
+
+    # Two kills within the teamfight window
+    scheduler.observe([kill(150.0), kill(158.0)], 160.0, 0.6)
+    assert scheduler.mode() == "teamfight" and scheduler.next_interval() == 2.0
+    scheduler.observe([], 174.0, 0.6)
+    assert scheduler.mode() == "hot"
+
+    # Objectives count too
+    scheduler.observe([{"EventName": "DragonKill", "EventTime": 300.0}], 301.0, 0.62)
+    assert scheduler.mode() == "hot"
+    scheduler.observe([], 400.0, 0.62)
+    assert scheduler.mode() == "quiet"
+
+    # New game (clock went back)
+    scheduler.observe([], 30.0, 0.5)
+    assert scheduler.mode() == "normal" and scheduler.last_event_time is None
+
+    # New game reported before the old clock is reached: the roster key changes
+    scheduler.observe([kill(50.0), kill(55.0)], 60.0, 0.5, game_key="game one")
+    assert scheduler.mode() == "teamfight"
+    scheduler.observe([], 62.0, 0.5, game_key="game two")
+    assert scheduler.mode() == "normal" and scheduler.last_event_time is None and not scheduler.kill_times
+    scheduler.observe([], 64.0, 0.5, game_key="game two")
+    assert scheduler.game_key == "game two"
+
+def test_request_and_cpu_budgets():
+    scheduler = PollScheduler(fast_interval=1.0, max_requests_per_minute=30, cpu_budget=None)
+    now, polls = 0.0, []
+    game_time = 100.0
+    for _ in range(200):
+        polls.append(now)
+        # Fight all along
+        scheduler.observe([kill(game_time - 1), kill(game_time)], game_time, 0.5, requests=3, now=now)
+        interval = scheduler.next_interval(now=now)
+        now += interval
+        game_time += interval
+    # Never more than 30 requests (10 polls) in any 60 s window
+    assert all(sum(1 for t in polls if start <= t < start + 60.0) <= 10 for start in polls)
+    assert scheduler.budget_limited > 0
+    assert scheduler.stats()["polls_by_mode"]["teamfight"] == 199
+
+    scheduler = PollScheduler(fast_interval=1.0, cpu_budget=0.02, max_requests_per_minute=None)
+    scheduler.observe([kill(10.0)], 10.0, 0.5, cpu_seconds=0.1)
+    # 0.1 s of work may use at most 2% of the time
+    assert abs(scheduler.next_interval() - 5.0) < 1e-9
+
+def test_stats_count_prediction_changes():
+    scheduler = PollScheduler(change_threshold=0.01)
+    for t, prob in enumerate([0.50, 0.505, 0.509, 0.52, 0.52, 0.40]):
+        scheduler.observe([], 100.0 + t, prob)
+    stats = scheduler.stats()
+    assert stats["polls"] == 6
+    # 0.50 (first), 0.52, 0.40
+    assert stats["prediction_changes"] == 3
+    assert abs(stats["change_rate"] - 0.5) < 1e-9
+    assert "6 polls, 3 changed the prediction" in scheduler.summary()
+
+if __name__ == "__main__":
+    test_interval_follows_game_activity()
+    print("Interval follows game activity: OK")
+    test_request_and_cpu_budgets()
+    print("Request and CPU budgets: OK")
+    test_stats_count_prediction_changes()
+    print("Stats count prediction changes: OK")
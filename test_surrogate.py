@@ -0,0 +1,55 @@
+import os
+import tempfile
+import warnings
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+import interface
+from feature_engineer import DefaultFeatureEngineer
+from model import RandomForestWinModel
+from surrogate import BinnedAdditiveModel, distill
+from synthetic_data import make_synthetic_tables
+
+def _teacher():
+    match_stats, team_stats, match_tbl, summoner_match = make_synthetic_tables(6000, seed=31)
+    X, y = DefaultFeatureEngineer().fit_transform(match_stats, team_stats, summoner_match, match_tbl)
+    teacher = RandomForestWinModel("unused.joblib")
+    teacher.model = RandomForestClassifier(n_estimators=20, max_depth=8, min_samples_leaf=10,
+                                           random_state=0, n_jobs=1).fit(X, y)
+    return teacher, X, y
+
+def test_distilled_surrogate_tracks_teacher():
+    teacher, X, y = _teacher()
+    surrogate, report = distill(teacher, X, y)
+    assert report['mean_abs_error'] < 0.03
+    assert report['same_side_of_0.5'] > 0.97
+    assert report['calibration_error_vs_teacher'] < 0.02
+    assert report['augmented']['mean_abs_error'] < 0.05
+
+    rows = X.to_numpy(dtype=np.float64)[:200]
+    batch = surrogate.predict_proba(rows)
+    assert np.allclose([surrogate.predict_one(row) for row in rows], batch, rtol=0, atol=1e-12)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "surrogate.npz")
+        surrogate.save(path)
+        loaded = BinnedAdditiveModel.load(path)
+        assert np.array_equal(loaded.predict_proba(rows), batch)
+
+        # Selectable as an interface backend
+        old_path = interface.SURROGATE_PATH
+        interface.SURROGATE_PATH = path
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                win = interface.WinProbabilityInterface(backend="surrogate")
+        finally:
+            interface.SURROGATE_PATH = old_path
+        kwargs = {name: X.iloc[0][name] for name in X.columns}
+        raw = surrogate.predict_one(win.feature_block(X.iloc[[0]])[0])
+        assert win.predict(**kwargs) == max(0.0, min(1.0, win._calibrate(raw)))
+        assert np.allclose(win.predict_batch(X.iloc[:50]),
+                           win._calibrate_batch(surrogate.predict_proba(rows[:50])))
+
+if __name__ == "__main__":
+    test_distilled_surrogate_tracks_teacher()
+    print("Distilled surrogate: OK")
@@ -37,13 +37,9 @@ def test_predictions():
     print(f"   {'Gold Diff':>10} | {'Win%':>8} | Balance")
     print(f"   {'-'*10}-+-{'-'*8}-+--------")
     
-    for gold in gold_values:
-        pred = interface.predict(
-            kill_diff=0, assist_diff=0, gold_diff=gold, cs_diff=0,
-            ward_score_diff=0, level_diff=0,
-            dragon_diff=0, baron_diff=0, tower_diff=0, herald_diff=0, inhib_diff=0,
-            game_duration=600
-        )
+    # All other features are 0
+    preds = interface.predict_batch(pd.DataFrame({'gold_diff': gold_values, 'game_duration': 600}))
+    for gold, pred in zip(gold_values, preds):
         balance = "BALANCED" if abs(pred - 0.5) < 0.02 else ("FAVORED" if pred > 0.5 else "BEHIND")
         print(f"   {gold:>10} | {pred*100:>7.2f}% | {balance}")
     
@@ -91,13 +87,9 @@ def test_predictions():
     
     # Test 6: Check data for potential class imbalance
     print("\n6. CHECKING TRAINED MODEL STATISTICS:")
-    from data_loader import DataLoader
-    from feature_engineer import DefaultFeatureEngineer
+    from feature_store import load_features
     
-    loader = DataLoader("data")
-    match_stats, team_stats, match_tbl, summoner_match = loader.load_match_stats()
-    engineer = DefaultFeatureEngineer()
-    X, y = engineer.fit_transform(match_stats, team_stats, summoner_match, match_tbl)
+    X, y = load_features("data")
     
     blue_wins = y.sum()
     total_games = len(y)
@@ -0,0 +1,45 @@
+import io
+import tempfile
+import pandas as pd
+from data_loader import DataLoader, read_table_csv, TABLE_SCHEMAS
+from synthetic_data import write_synthetic_csvs
+
+def test_declared_dtypes_applied():
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_synthetic_csvs(data_dir, n_matches=300, seed=5)
+        tables = DataLoader(data_dir).load_match_stats()
+        names = ['MatchStatsTbl', 'TeamMatchTbl', 'MatchTbl', 'SummonerMatchTbl']
+        for name, df in zip(names, tables):
+            for col, dtype in TABLE_SCHEMAS[name].items():
+                if col in df.columns:
+                    assert str(df[col].dtype) == dtype, (name, col, df[col].dtype)
+
+def test_out_of_range_values_are_widened():
+    """Values that do not fit the declared type must never be truncated"""
+    csv = io.StringIO("a,b,c\n1,2,x\n200000,,y\n")
+    df = read_table_csv(csv, {'a': 'int16', 'b': 'int8', 'c': 'category'})
+    assert df['a'].tolist() == [1, 200000]
+    assert str(df['a'].dtype) == 'int32'
+    assert str(df['b'].dtype) == 'float32'
+    assert isinstance(df['c'].dtype, pd.CategoricalDtype)
+
+def test_patch_round_trips_exactly():
+    patches = [14.1, 14.2, 14.23, 13.24]
+    csv = io.StringIO("MatchId,Patch\n" + "".join(f"{i},{p}\n" for i, p in enumerate(patches)))
+    df = read_table_csv(csv, TABLE_SCHEMAS['MatchTbl'])
+    # Same values as the plain float64 read, so Patch == 14.23 still matches
+    assert df['Patch'].tolist() == patches
+    assert (df['Patch'] == 14.23).sum() == 1
+
+def test_categories_merge_across_chunks():
+    csv = io.StringIO("q\n" + "CLASSIC\n" * 3 + "ARAM\n" * 3)
+    df = read_table_csv(csv, {'q': 'category'}, chunksize=2)
+    assert df['q'].tolist() == ['CLASSIC'] * 3 + ['ARAM'] * 3
+    assert isinstance(df['q'].dtype, pd.CategoricalDtype)
+
+if __name__ == "__main__":
+    test_declared_dtypes_applied()
+    test_out_of_range_values_are_widened()
+    test_patch_round_trips_exactly()
+    test_categories_merge_across_chunks()
+    print("Schema tests: OK")